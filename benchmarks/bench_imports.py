@@ -0,0 +1,68 @@
+"""
+Measures the import time of ROBUST.
+
+    python benchmarks/bench_imports.py [--repeat 5]
+
+Imports the packages in fresh interpreters (python -X importtime) and prints the median
+total import time and the slowest imported packages. That a plain run does not load the
+plotting stack is tested by tests/test_imports.py.
+"""
+import argparse
+import collections
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODULES = ["pcst_approach.utils", "pcst_approach.utils.pipeline"]
+
+
+def _import_times(module: str) -> collections.OrderedDict:
+    """
+    The cumulative import times in seconds of the packages imported directly by importing
+    module in a fresh interpreter (by -X importtime), the module itself last.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = collections.OrderedDict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Packages imported directly (by module or the interpreter) are indented once.
+        if name.startswith(" ") and not name.startswith("  "):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def time_imports(args):
+    for module in MODULES:
+        runs = [_import_times(module) for _ in range(args.repeat)]
+        totals = [run[module] for run in runs]
+        print(f"{module}: {statistics.median(totals) * 1000:.0f} ms (median of "
+              f"{args.repeat}, min {min(totals) * 1000:.0f} ms)")
+    # The slowest dependencies of the main package, from all of its imports.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                             f"import {MODULES[0]}"], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    packages = collections.defaultdict(float)
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            package = name.strip().split(".")[0]
+            if package == "pcst_approach":
+                continue
+            packages[package] = max(packages[package], int(cumulative) / 1e6)
+    print("Slowest packages (cumulative):")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {seconds * 1000:7.0f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures the import time of ROBUST.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of slowest packages to show")
+    time_imports(parser.parse_args())
@@ -0,0 +1,332 @@
+"""
+Benchmarks the stages of ROBUST on the shipped data and keeps a history of the results.
+
+    python benchmarks/bench_robust.py run [--sample 5] [--trees 30] [--repeat 3]
+    python benchmarks/bench_robust.py compare [--base -2] [--tolerance 0.1]
+    python benchmarks/bench_robust.py solvers [--sample 5] [--trees 30]
+
+run times every stage separately (loading, diameter estimate, instance building, every
+pcst_fast call, prize updates, aggregation and writers) for ms_seeds.txt and a seeded
+sample of data/all-seeds, measures the peak memory per stage (tracemalloc, in a separate
+pass because tracing slows everything down) and the peak RSS, and appends one JSON record
+to the history (benchmarks/history.jsonl, not tracked by git). compare compares the last record with an earlier
+one and exits with 1 if a stage got slower than the tolerance allows. solvers runs the
+diversification with every PcstSolver on the same seed sets and compares the time per
+solve and the quality of the trees (cost, fraction of the seeds in the tree).
+"""
+import argparse
+import collections
+import contextlib
+import datetime
+import glob
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pcst_approach.utils.pcst import PcstInstance, SOLVERS
+from pcst_approach.utils.ppi import (PpiInstance, UnitEdgeWeight, load_network, read_ppi,
+                                     read_terminals)
+from pcst_approach.utils.steinerdiv import (ExpMinMaxDiverseSteinerTreeComputer,
+                                            SolutionSet, write_solution_set)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+NETWORK = os.path.join(ROOT, "data", "human_annotated_PPIs_brain.txt")
+MS_SEEDS = os.path.join(ROOT, "data", "ms_seeds.txt")
+ALL_SEEDS = os.path.join(ROOT, "data", "all-seeds")
+HISTORY = os.path.join(ROOT, "benchmarks", "history.jsonl")
+
+
+class Stages:
+    """
+    Collects the durations (and optionally the peak traced memory) of named stages.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = collections.defaultdict(list)
+        self.peak_bytes = collections.defaultdict(int)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = timer()
+        yield
+        self.seconds[name].append(timer() - start)
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] - before
+            self.peak_bytes[name] = max(self.peak_bytes[name], peak)
+
+
+def _meta(network) -> dict:
+    """
+    The meta of the instances, with the diameter the command line interface uses (see
+    PpiInstance), saved with the compiled network once it is estimated.
+    """
+    return {"graph_diameter": network.diameter_bounds()[1]}
+
+
+def _run_seed_set(stages: Stages, network, pcst_graph, seeds, args, out_dir):
+    terminals = list(set(seeds).intersection(network.label_to_id()))
+    if not terminals:
+        return 0
+    with stages.stage("ppi_instance"):
+        ppi_instance = PpiInstance.from_network(network, terminals, UnitEdgeWeight(),
+                                                meta=_meta(network))
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=args.initial_fraction,
+                                                 reduction_factor=args.reduction_factor)
+    # The loop of ExpMinMaxDiverseSteinerTreeComputer, split into its stages.
+    with stages.stage("initial_prizes"):
+        data = {"ppi_instance": ppi_instance, "pcst_graph": pcst_graph,
+                "min_edge_cost": np.min(pcst_graph.costs),
+                "max_edge_cost": np.max(pcst_graph.costs)}
+        engine._set_initial_prizes(data)
+    solution_set = SolutionSet(ppi_instance, pcst_graph)
+    while len(solution_set) < args.trees:
+        with stages.stage("pcst_fast"):
+            tree = engine._compute_steiner_tree(data)
+        with stages.stage("solution_set_append"):
+            if tree in solution_set:
+                break
+            solution_set.append(tree)
+        with stages.stage("prize_update"):
+            engine._reduce_prizes_of_used_steiner_vertices(data, tree)
+    with stages.stage("get_occurrences"):
+        solution_set.get_occurrences(include_terminals=True)
+    with stages.stage("get_subgraph"):
+        solution_set.get_subgraph(args.threshold)
+    for name, suffix in [("write_csv", ".csv"), ("write_graphml", ".graphml"),
+                         ("write_edgelist", ".txt")]:
+        with stages.stage(name):
+            write_solution_set(solution_set, os.path.join(out_dir, "module" + suffix),
+                               args.threshold)
+    return len(solution_set)
+
+
+def _run_once(args, seed_sets, trace_memory=False) -> Stages:
+    stages = Stages(trace_memory)
+    with tempfile.TemporaryDirectory() as directory:
+        with stages.stage("read_ppi"):
+            read_ppi(NETWORK)
+        with stages.stage("compile_network"):
+            load_network(NETWORK, cache_dir=os.path.join(directory, "cache"))
+        with stages.stage("load_network"):
+            network = load_network(NETWORK, cache_dir=os.path.join(directory, "cache"))
+        with stages.stage("diameter"):
+            meta = _meta(network)
+        with stages.stage("pcst_instance"):
+            template = PpiInstance.from_network(network, [], UnitEdgeWeight(), meta=meta)
+            pcst_graph = PcstInstance(template)
+        stages.trees = sum(_run_seed_set(stages, network, pcst_graph, seeds, args,
+                                         directory) for seeds in seed_sets)
+    return stages
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    seed_files = sorted(glob.glob(os.path.join(ALL_SEEDS, "*.txt")))
+    sample = random.Random(args.seed).sample(seed_files, min(args.sample, len(seed_files)))
+    seed_sets = [read_terminals(path) for path in [MS_SEEDS] + sample]
+
+    runs = []
+    for i in range(args.repeat):
+        runs.append(_run_once(args, seed_sets))
+        print(f"Run {i + 1}/{args.repeat}: {len(runs[-1].seconds['pcst_fast'])} solves, "
+              f"{sum(map(sum, runs[-1].seconds.values())):.1f}s", file=sys.stderr)
+    memory = None
+    if args.memory:
+        tracemalloc.start()
+        memory = _run_once(args, seed_sets, trace_memory=True)
+        tracemalloc.stop()
+
+    stages = {}
+    for name in runs[0].seconds:
+        totals = [sum(r.seconds[name]) for r in runs]
+        best = runs[int(np.argmin(totals))].seconds[name]
+        stages[name] = {"seconds": min(totals), "calls": len(best),
+                        "mean_call": min(totals) / len(best), "max_call": max(best)}
+        if memory is not None:
+            stages[name]["peak_bytes"] = memory.peak_bytes[name]
+    record = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "label": args.label,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.node(),
+        "parameters": {"seed_sets": [os.path.basename(p) for p in [MS_SEEDS] + sample],
+                       "trees": args.trees, "initial_fraction": args.initial_fraction,
+                       "reduction_factor": args.reduction_factor,
+                       "threshold": args.threshold, "repeat": args.repeat},
+        "trees": runs[0].trees,
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss *
+                          (1 if sys.platform == "darwin" else 1024),
+        "stages": stages,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+    print(f"{'stage':<20} {'seconds':>9} {'calls':>6} {'mean':>9} {'max':>9}"
+          f"{' peak MiB' if args.memory else ''}")
+    for name, s in stages.items():
+        memory_column = f" {s['peak_bytes'] / 2 ** 20:8.1f}" if args.memory else ""
+        print(f"{name:<20} {s['seconds']:9.4f} {s['calls']:6d} {s['mean_call']:9.4f} "
+              f"{s['max_call']:9.4f}{memory_column}")
+    print(f"peak RSS: {record['peak_rss_bytes'] / 2 ** 20:.0f} MiB, "
+          f"{record['trees']} trees; appended to {args.history}")
+
+
+def solvers(args):
+    seed_files = sorted(glob.glob(os.path.join(ALL_SEEDS, "*.txt")))
+    sample = random.Random(args.seed).sample(seed_files, min(args.sample, len(seed_files)))
+    network = load_network(NETWORK)
+    template = PpiInstance.from_network(network, [], UnitEdgeWeight(),
+                                        meta=_meta(network))
+    pcst_graph = PcstInstance(template)
+    label_to_id = network.label_to_id()
+
+    print(f"{'seed set':<28} {'seeds':>5} {'solver':<14} {'s/solve':>8} {'trees':>5} "
+          f"{'cost':>8} {'coverage':>8} {'module':>6}")
+    totals = collections.defaultdict(lambda: collections.defaultdict(float))
+    for path in [MS_SEEDS] + sample:
+        terminals = list(set(read_terminals(path)).intersection(label_to_id))
+        if not terminals:
+            continue
+        ppi_instance = PpiInstance.from_network(network, terminals, UnitEdgeWeight(),
+                                                meta=template.meta)
+        terminal_ids = np.array([label_to_id[t] for t in terminals])
+        for name, solver in SOLVERS.items():
+            engine = ExpMinMaxDiverseSteinerTreeComputer(
+                initial_fraction=args.initial_fraction,
+                reduction_factor=args.reduction_factor, solver=solver())
+            start = timer()
+            solution_set = engine(ppi_instance, n=args.trees, pcst_graph=pcst_graph)
+            seconds = (timer() - start) / max(solution_set.n_solves, 1)
+            # The costs of the pcst-graph are not changed by the computation.
+            cost = np.mean([pcst_graph.costs[t.edge_ids].sum() for t in solution_set])
+            coverage = np.mean([np.isin(terminal_ids, t.vertex_ids).mean()
+                                for t in solution_set])
+            module = len(solution_set.module(args.threshold)[0])
+            print(f"{os.path.basename(path)[:28]:<28} {len(terminals):5d} {name:<14} "
+                  f"{seconds:8.3f} {len(solution_set):5d} {cost:8.1f} {coverage:8.3f} "
+                  f"{module:6d}")
+            for key, value in [("seconds", seconds), ("cost", cost),
+                               ("coverage", coverage), ("seed_sets", 1)]:
+                totals[name][key] += value
+    print("Mean over the seed sets:")
+    for name, total in totals.items():
+        n = total["seed_sets"]
+        print(f"{name:<14} {total['seconds'] / n:8.3f} s/solve, cost {total['cost'] / n:8.1f}, "
+              f"coverage {total['coverage'] / n:.3f}")
+
+
+def _select(records, key):
+    """
+    Selects a record by (negative) index or by commit.
+    """
+    try:
+        return records[int(key)]
+    except ValueError:
+        matches = [r for r in records if r.get("commit") == key or r.get("label") == key]
+        if not matches:
+            raise SystemExit(f"No record for {key!r} in the history.")
+        return matches[-1]
+
+
+def compare(args):
+    with open(args.history) as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    if len(records) < 2:
+        raise SystemExit("The history needs at least two records to compare.")
+    base, new = _select(records, args.base), _select(records, args.new)
+    if base["parameters"] != new["parameters"]:
+        print("Warning: The records were measured with different parameters.")
+    regressions = []
+    print(f"{'stage':<20} {base.get('commit') or 'base':>10} {new.get('commit') or 'new':>10}"
+          f" {'change':>8}")
+    for name, stage in new["stages"].items():
+        if name not in base["stages"]:
+            continue
+        old_seconds = base["stages"][name]["seconds"]
+        new_seconds = stage["seconds"]
+        change = new_seconds / old_seconds - 1 if old_seconds > 0 else 0.0
+        # Changes below min_seconds are noise, whatever the relative change is.
+        regression = change > args.tolerance and \
+            new_seconds - old_seconds > args.min_seconds
+        if regression:
+            regressions.append(name)
+        print(f"{name:<20} {old_seconds:10.4f} {new_seconds:10.4f} {change:+8.1%}"
+              f"{'  REGRESSION' if regression else ''}")
+    if regressions:
+        print(f"Regressions in: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks the stages of ROBUST.")
+    parser.add_argument("--history", default=HISTORY,
+                        help="JSON lines file with the results (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmark")
+    run_parser.add_argument("--sample", type=int, default=5,
+                            help="number of seed sets from data/all-seeds")
+    run_parser.add_argument("--seed", type=int, default=0,
+                            help="random seed for the sample")
+    run_parser.add_argument("--trees", type=int, default=30)
+    run_parser.add_argument("--initial-fraction", type=float, default=0.25)
+    run_parser.add_argument("--reduction-factor", type=float, default=0.9)
+    run_parser.add_argument("--threshold", type=float, default=0.1)
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="number of runs, the fastest counts per stage")
+    run_parser.add_argument("--no-memory", dest="memory", action="store_false",
+                            help="skip the pass measuring the memory per stage")
+    run_parser.add_argument("--label", default=None, help="label of the record")
+    compare_parser = commands.add_parser("compare", help="compare two records")
+    compare_parser.add_argument("--base", default="-2",
+                                help="index, commit or label of the base record "
+                                     "(default: the second to last)")
+    compare_parser.add_argument("--new", default="-1",
+                                help="index, commit or label of the new record "
+                                     "(default: the last)")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1,
+                                help="allowed relative slowdown (default: 0.1)")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.01,
+                                help="ignore slowdowns below this many seconds")
+    solvers_parser = commands.add_parser("solvers", help="compare the PCST solvers")
+    solvers_parser.add_argument("--sample", type=int, default=5,
+                                help="number of seed sets from data/all-seeds")
+    solvers_parser.add_argument("--seed", type=int, default=0,
+                                help="random seed for the sample")
+    solvers_parser.add_argument("--trees", type=int, default=30)
+    solvers_parser.add_argument("--initial-fraction", type=float, default=0.25)
+    solvers_parser.add_argument("--reduction-factor", type=float, default=0.9)
+    solvers_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "solvers":
+        solvers(args)
+    else:
+        compare(args)
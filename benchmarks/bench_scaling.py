@@ -0,0 +1,345 @@
+"""
+Measures how ROBUST scales with the size of the network on seeded synthetic scale-free
+graphs and enforces a memory budget.
+
+    python benchmarks/bench_scaling.py run [--preset ci|curve|large] [--sizes 1e5 1e6]
+    python benchmarks/bench_scaling.py generate --edges 1e6 network.txt seeds.txt
+
+run generates a scale-free network (preferential attachment) and a seed set per size, runs
+the full call_robust pipeline on each in a fresh process and records the time and the peak
+RSS per stage (loading and compiling the network, PpiInstance, setup with the PcstInstance,
+solves, SolutionSet appends, prize updates, writing). read_ppi, which builds a networkx
+graph, is measured in a separate process up to --read-ppi-max-edges. The results are printed
+as tables over the sizes with the fitted scaling exponent of every stage (the slope of
+log(seconds) over log(edges)) and appended as one JSON record to the history
+(benchmarks/scaling.jsonl).
+
+The memory per million edges is the slope of a linear fit of the peak RSS of the pipeline
+(minus the RSS after the imports) over the number of edges, so fixed costs do not count.
+With --budget (set by the ci preset), run exits with 1 if it exceeds the budget in MiB, to
+catch regressions in the paths that create Python objects per vertex or edge.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from pcst_approach.utils.steinerdiv import Tracer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HISTORY = os.path.join(ROOT, "benchmarks", "scaling.jsonl")
+# Sizes (edges), trees, seeds and memory budget (MiB per million edges) of the presets.
+PRESETS = {
+    "ci": {"sizes": [1e5, 3e5], "trees": 5, "seeds": 20, "budget": 500},
+    "curve": {"sizes": [1e5, 3e5, 1e6, 3e6], "trees": 10, "seeds": 50, "budget": None},
+    "large": {"sizes": [1e5, 1e6, 1e7], "trees": 10, "seeds": 50, "budget": None},
+}
+
+
+def scale_free_edges(n_edges: int, m=4, seed=0) -> np.ndarray:
+    """
+    About n_edges edges of a scale-free graph by preferential attachment: every new
+    vertex is connected to m vertices chosen with probability proportional to their
+    degree (by sampling from the endpoints of the edges so far). The vertices are added
+    in batches of an eighth of the current size, which only slightly weakens the
+    attachment within a batch and keeps the generation vectorized. Multi-edges are
+    removed, the vertex ids and the order of the edges are shuffled.
+    """
+    rng = np.random.default_rng(seed)
+    n_vertices = max(n_edges // m, 1) + m
+    # Start with a star of vertex m to 0..m-1.
+    edges = [np.stack([np.full(m, m), np.arange(m)], axis=1)]
+    endpoints = np.empty(2 * m * n_vertices, dtype=np.int64)
+    endpoints[:2 * m] = edges[0].ravel()
+    filled = 2 * m
+    start = m + 1
+    while start < n_vertices:
+        stop = min(n_vertices, start + max(1, start // 8))
+        sources = np.repeat(np.arange(start, stop), m)
+        targets = endpoints[rng.integers(0, filled, size=len(sources))]
+        batch = np.stack([sources, targets], axis=1)
+        edges.append(batch)
+        endpoints[filled:filled + batch.size] = batch.ravel()
+        filled += batch.size
+        start = stop
+    edges = np.concatenate(edges)[:n_edges]
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    permutation = rng.permutation(n_vertices)
+    return permutation[edges[rng.permutation(len(edges))]]
+
+
+def generate(network_path: str, seeds_path: str, n_edges: int, n_seeds: int, m=4,
+             seed=0) -> dict:
+    """
+    Writes a scale-free network (see scale_free_edges) with the labels G<id> as edge list
+    and n_seeds random vertices of it as seed file. Returns the numbers of vertices and
+    edges.
+    """
+    edges = scale_free_edges(n_edges, m, seed)
+    vertices = np.unique(edges)
+    with open(network_path, "w") as file:
+        file.write("gene1\tgene2\n")
+        for chunk in range(0, len(edges), 1 << 20):
+            np.savetxt(file, edges[chunk:chunk + (1 << 20)], fmt="G%d\tG%d")
+    seeds = np.random.default_rng(seed + 1).choice(vertices, min(n_seeds, len(vertices)),
+                                                   replace=False)
+    with open(seeds_path, "w") as file:
+        file.writelines(f"G{v}\n" for v in seeds.tolist())
+    return {"vertices": len(vertices), "edges": len(edges)}
+
+
+def _memory():
+    """
+    The current and the peak RSS of the process in bytes. VmHWM of /proc/self/status
+    belongs to the process image, so unlike ru_maxrss it does not include the peak of
+    the parent before exec. Falls back to ru_maxrss on other systems.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            status = dict(line.split(":", 1) for line in file)
+        return (int(status["VmRSS"].split()[0]) * 1024,
+                int(status["VmHWM"].split()[0]) * 1024)
+    except (OSError, KeyError):
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * \
+            (1 if sys.platform == "darwin" else 1024)
+        return peak, peak
+
+
+class _MemoryTracer(Tracer):
+    """
+    A Tracer that records the peak RSS at the end of every stage and the growth of the
+    peak since the end of the previous stage (so nested stages count for the innermost
+    one). The appends to the SolutionSet between a solve and the prize update are
+    recorded as stage solution_set.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.peak_growth = {}
+        self.peak_after = {}
+        self._last_peak = _memory()[1]
+        self._last_end = timer()
+
+    def add_stage(self, name: str, start: float, seconds: float, **args):
+        super().add_stage(name, start, seconds, **args)
+        peak = _memory()[1]
+        self.peak_growth[name] = max(self.peak_growth.get(name, 0), peak - self._last_peak)
+        self.peak_after[name] = peak
+        self._last_peak = peak
+        self._last_end = start + seconds
+
+    def end_iteration(self, **fields):
+        start = self._last_end
+        super().end_iteration(**fields)
+        self.add_stage("solution_set", start, timer() - start)
+
+
+def measure(args):
+    """
+    Runs in a fresh process and prints the measurements as JSON (last line).
+    """
+    baseline = _memory()[0]
+    result = {"baseline_rss_bytes": baseline}
+    # The messages of ROBUST would mix with the result.
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.read_ppi:
+            from pcst_approach.utils.ppi import read_ppi
+            start = timer()
+            graph = read_ppi(args.network)
+            result["stages"] = {"read_ppi": {
+                "seconds": timer() - start, "calls": 1,
+                "peak_growth_bytes": _memory()[1] - baseline,
+                "peak_rss_bytes": _memory()[1]}}
+            del graph
+        else:
+            from robust import call_robust
+            tracer = _MemoryTracer()
+            with tempfile.TemporaryDirectory() as directory:
+                # A fresh cache, so the network is compiled as on the first run.
+                os.environ["ROBUST_CACHE_DIR"] = os.path.join(directory, "cache")
+                call_robust(args.network, args.seeds, os.path.join(directory, "module.graphml"),
+                            args.initial_fraction, args.reduction_factor, args.trees - 1,
+                            args.threshold, tracer=tracer)
+            calls = {}
+            for event in tracer.events:
+                calls[event["name"]] = calls.get(event["name"], 0) + 1
+            result["stages"] = {name: {"seconds": seconds, "calls": calls[name],
+                                       "peak_growth_bytes": tracer.peak_growth[name],
+                                       "peak_rss_bytes": tracer.peak_after[name]}
+                                for name, seconds in tracer.stage_seconds.items()}
+            result["trees"] = len(tracer.iterations)
+    result["peak_rss_bytes"] = _memory()[1]
+    print(json.dumps(result))
+
+
+def _run_child(args, network: str, seeds: str, read_ppi=False) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "measure", network, seeds,
+               "--trees", str(args.trees), "--initial-fraction", str(args.initial_fraction),
+               "--reduction-factor", str(args.reduction_factor),
+               "--threshold", str(args.threshold)] + (["--read-ppi"] if read_ppi else [])
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        raise SystemExit(f"The measurement of {network} failed.")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    preset = PRESETS[args.preset]
+    for name in ("sizes", "trees", "seeds", "budget"):
+        if getattr(args, name) is None:
+            setattr(args, name, preset[name])
+    sizes = sorted(int(float(size)) for size in args.sizes)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            network = os.path.join(args.work_dir or directory, f"scale_free_{size}.txt")
+            seeds = os.path.join(args.work_dir or directory, f"scale_free_{size}_seeds.txt")
+            start = timer()
+            graph = generate(network, seeds, size, args.seeds, args.m, args.seed)
+            print(f"{size:.0e} edges: generated {graph['vertices']} vertices and "
+                  f"{graph['edges']} edges in {timer() - start:.1f}s", file=sys.stderr)
+            result = dict(graph, size=size, **_run_child(args, network, seeds))
+            if size <= args.read_ppi_max_edges:
+                result["stages"].update(_run_child(args, network, seeds,
+                                                   read_ppi=True)["stages"])
+            results.append(result)
+            print(f"{size:.0e} edges: {result['trees']} trees, peak RSS "
+                  f"{result['peak_rss_bytes'] / 2 ** 20:.0f} MiB", file=sys.stderr)
+
+    stages = []
+    for result in results:
+        stages.extend(name for name in result["stages"] if name not in stages)
+    print(f"{'seconds':<20}" + "".join(f"{r['edges']:>12}" for r in results) +
+          f"{'exponent':>10}")
+    exponents = {}
+    for name in stages:
+        points = [(r["edges"], r["stages"][name]["seconds"]) for r in results
+                  if name in r["stages"] and r["stages"][name]["seconds"] > 0]
+        if len(points) >= 2:
+            x, y = np.log(np.array(points)).T
+            exponents[name] = float(np.polyfit(x, y, 1)[0])
+        print(f"{name:<20}" + "".join(
+            f"{r['stages'][name]['seconds']:12.3f}" if name in r["stages"] else f"{'-':>12}"
+            for r in results) +
+              (f"{exponents[name]:10.2f}" if name in exponents else f"{'-':>10}"))
+    print(f"{'peak growth MiB':<20}" + "".join(f"{r['edges']:>12}" for r in results))
+    for name in stages:
+        print(f"{name:<20}" + "".join(
+            f"{r['stages'][name]['peak_growth_bytes'] / 2 ** 20:12.1f}"
+            if name in r["stages"] else f"{'-':>12}" for r in results))
+    growth = [(r["peak_rss_bytes"] - r["baseline_rss_bytes"]) / 2 ** 20 for r in results]
+    print(f"{'pipeline peak MiB':<20}" + "".join(f"{g:12.1f}" for g in growth))
+    mib_per_million_edges = None
+    if len(results) >= 2:
+        mib_per_million_edges = float(np.polyfit([r["edges"] / 1e6 for r in results],
+                                                 growth, 1)[0])
+        print(f"memory: {mib_per_million_edges:.0f} MiB per million edges"
+              + (f" (budget {args.budget} MiB)" if args.budget is not None else ""))
+
+    record = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "label": args.label,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.node(),
+        "parameters": {"preset": args.preset, "sizes": sizes, "trees": args.trees,
+                       "seeds": args.seeds, "m": args.m, "seed": args.seed,
+                       "initial_fraction": args.initial_fraction,
+                       "reduction_factor": args.reduction_factor,
+                       "threshold": args.threshold},
+        "results": results,
+        "exponents": exponents,
+        "mib_per_million_edges": mib_per_million_edges,
+        "budget": args.budget,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as file:
+        file.write(json.dumps(record) + "\n")
+    print(f"Appended to {args.history}.")
+    if args.budget is not None and mib_per_million_edges is not None and \
+            mib_per_million_edges > args.budget:
+        print(f"The memory of {mib_per_million_edges:.0f} MiB per million edges exceeds "
+              f"the budget of {args.budget} MiB.")
+        sys.exit(1)
+
+
+def _add_parameters(parser):
+    parser.add_argument("--initial-fraction", type=float, default=0.25)
+    parser.add_argument("--reduction-factor", type=float, default=0.9)
+    parser.add_argument("--threshold", type=float, default=0.1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures how ROBUST scales with the "
+                                                 "size of the network.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the scaling benchmark")
+    run_parser.add_argument("--preset", choices=sorted(PRESETS), default="ci",
+                            help="sizes, trees, seeds and budget (default: %(default)s)")
+    run_parser.add_argument("--sizes", nargs="+", default=None,
+                            help="numbers of edges, e.g. 1e5 1e6 (default: of the preset)")
+    run_parser.add_argument("--trees", type=int, default=None)
+    run_parser.add_argument("--seeds", type=int, default=None,
+                            help="number of seeds per network")
+    run_parser.add_argument("--budget", type=float, default=None,
+                            help="maximal MiB per million edges (default: of the preset)")
+    run_parser.add_argument("--m", type=int, default=4,
+                            help="edges per new vertex of the generator")
+    run_parser.add_argument("--seed", type=int, default=0,
+                            help="random seed of the generator")
+    run_parser.add_argument("--read-ppi-max-edges", type=float, default=1e6,
+                            help="largest network for which read_ppi (networkx) is "
+                                 "measured (default: 1e6)")
+    run_parser.add_argument("--work-dir", default=None,
+                            help="keep the generated networks in this directory")
+    run_parser.add_argument("--history", default=HISTORY,
+                            help="JSON lines file with the results (default: %(default)s)")
+    run_parser.add_argument("--label", default=None, help="label of the record")
+    _add_parameters(run_parser)
+    generate_parser = commands.add_parser("generate", help="write a scale-free network "
+                                                           "and a seed file")
+    generate_parser.add_argument("network")
+    generate_parser.add_argument("seeds")
+    generate_parser.add_argument("--edges", type=float, default=1e6)
+    generate_parser.add_argument("--n-seeds", type=int, default=50)
+    generate_parser.add_argument("--m", type=int, default=4)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    # Used by run, measures one network in this process.
+    measure_parser = commands.add_parser("measure")
+    measure_parser.add_argument("network")
+    measure_parser.add_argument("seeds")
+    measure_parser.add_argument("--trees", type=int, default=10)
+    measure_parser.add_argument("--read-ppi", action="store_true")
+    _add_parameters(measure_parser)
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "generate":
+        print(generate(args.network, args.seeds, int(args.edges), args.n_seeds, args.m,
+                       args.seed))
+    else:
+        measure(args)
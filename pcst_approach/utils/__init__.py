@@ -1,3 +1,12 @@
 from .ppi import *
 from .pcst import *
 from .steinerdiv import *
+from .version import __version__
+
+
+def __getattr__(name):
+    # Not part of the star import of steinerdiv, which loads it lazily.
+    if name == "display_solution_set":
+        from .steinerdiv import display_solution_set
+        return display_solution_set
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,2 +1,9 @@
-from .solve_pcst import solve_pcst
+from .solve_pcst import solve_pcst, solve_pcst_tree
 from .pcst_instance import PcstInstance
+from .reduce_pcst import reduce_pcst_instance
+from .steiner_tree import SteinerTree
+from .union_find import UnionFind
+from .repair_tree import repair_tree, missing_terminals
+from .shortest_path_steiner import shortest_path_steiner_tree
+from .pcst_solver import PcstSolver, PcstFastSolver, ShortestPathSteinerSolver, SOLVERS, \
+    get_solver
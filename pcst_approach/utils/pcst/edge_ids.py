@@ -1,6 +1,6 @@
 from typing import Tuple, List
 
-import networkx as nx
+import numpy as np
 from .vertex_ids import VertexIds
 
 
@@ -8,12 +8,23 @@ class EdgeIds:
     """
     Maps between networkx-edges and the two necessary representations in pcst_fast:
     Position in the cost-array and the pair of ids of the vertices.
+    The edges are indexed by the integer key min(u,v)*n+max(u,v) in a sorted array, so
+    a lookup is a binary search (np.searchsorted) instead of a dict of tuples.
     """
-    def __init__(self, ppi_graph: nx.Graph, vertex_ids: VertexIds):
+    def __init__(self, edges: np.ndarray, vertex_ids: VertexIds):
+        """
+        edges: The array [[u, v], ...] of vertex ids. The position of an edge in this
+        array is its id.
+        """
         self._vertex_ids = vertex_ids
-        self.key_to_nx = {self.get_key(e): e for e in ppi_graph.edges}
-        self.id_to_edge_key = sorted(self.edge_ids())
-        self._edge_key_to_id = {edge: i for i, edge in enumerate(self.id_to_edge_key)}
+        self._n = len(vertex_ids)
+        keys = self._keys(edges)
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def _keys(self, edges: np.ndarray) -> np.ndarray:
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        return edges.min(axis=1) * self._n + edges.max(axis=1)
 
     def get_key(self, e: Tuple[str,  str]) -> Tuple[int, int]:
         """
@@ -25,23 +36,38 @@ class EdgeIds:
         id2 = self._vertex_ids.get_id(e[1])
         return min(id1, id2), max(id1, id2)
 
+    def get_ids(self, edges: np.ndarray) -> np.ndarray:
+        """
+        Returns the positions of the edges given as array [[u, v], ...] of vertex ids
+        (in any direction). Raises a KeyError if one of them is not in the graph.
+        """
+        keys = self._keys(edges)
+        pos = np.searchsorted(self._sorted_keys, keys)
+        pos = np.minimum(pos, len(self._sorted_keys) - 1)
+        if len(keys) and (len(self._sorted_keys) == 0
+                          or np.any(self._sorted_keys[pos] != keys)):
+            raise KeyError("Edge is not part of the graph.")
+        return self._order[pos]
+
     def get_id(self, e: Tuple[str, str]) -> int:
         """
         Returns the position of the networkx-edge in the numpy-array of the
         pcst_fast graph representation.
         """
-        key = self.get_key(e)
-        return self._edge_key_to_id[key]
+        try:
+            return int(self.get_ids(np.array([self.get_key(e)]))[0])
+        except KeyError:
+            raise KeyError(e) from None
 
     def get_nx_edge(self, i: Tuple[int, int]) -> Tuple[str, str]:
         """
         Returns the networkx-edge for two numpy vertex-ids.
-        TODO: Why are they not made unique?
         """
-        return self.key_to_nx[i]
+        return self._vertex_ids.get_label(i[0]), self._vertex_ids.get_label(i[1])
 
     def edge_ids(self) -> List[Tuple[int, int]]:
         """
         Returns all edges (numpy id tuples).
         """
-        return list(self.key_to_nx.keys())
+        keys = self._sorted_keys
+        return list(zip((keys // self._n).tolist(), (keys % self._n).tolist()))
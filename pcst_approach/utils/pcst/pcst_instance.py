@@ -1,10 +1,10 @@
-import networkx as nx
 import numpy as np
 import typing
 
 from .edge_ids import EdgeIds
 from .vertex_ids import VertexIds
 from ..ppi import PpiInstance
+from ..ppi.edge_list import first_appearance_order
 
 
 def unit_cost(e):
@@ -20,14 +20,24 @@ def zero_prize(v):
     return 0.0
 
 
+def _sorted_edges(edges: np.ndarray) -> np.ndarray:
+    """
+    Returns the edges [[u, v], ...] with u <= v in lexicographic order.
+    """
+    edges = np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1)
+    return edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+
+
 class PcstInstance:
     """
     This class represents an instance (i.e., a graph with weighted edges and vertices) for
     the PCST solver. It primarily saves the graph in a compatible and efficient
     data structure. You can use update functions to efficiently update a subpart
     of the weights.
-    Creating the instance for the PPI-graph is quite slow so you do not want to create
-    a new instance for every round but simply update the weights.
+    The instance is built with numpy operations on integer edge arrays, so it is cheap
+    for a compiled network (see from_arrays for building it without a PpiInstance).
+    Still, you do not want to create a new instance for every round but simply update
+    the weights.
     """
     def __init__(self, ppi_instance: PpiInstance,
                  initial_costs_fn: typing.Optional[typing.Callable[[object], float]] = None,
@@ -41,23 +51,123 @@ class PcstInstance:
         initial_prize_fn: A function to define the initial prizes of the vertices. By
         default zero. Note that you can change them any time with update_vertex_prizes.
         """
-        self._vertex_ids = VertexIds(ppi_instance.ppi_graph.nodes)
-        self._edge_ids = EdgeIds(ppi_instance.ppi_graph, self._vertex_ids)
-        if not initial_costs_fn:
-            initial_costs_fn = lambda e: ppi_instance.edge_weights[e]
-        edges = [(self._vertex_ids.get_id(e[0]), self._vertex_ids.get_id(e[1])) for e in
-                 ppi_instance.ppi_graph.edges]
-        self._edges = np.array(sorted(edges), dtype=np.int64)
-        self._prizes = np.array([initial_prize_fn(self._vertex_ids.get_label(i)) for i in
-                                 range(ppi_instance.ppi_graph.number_of_nodes())], dtype=np.float64)
+        network = ppi_instance.network
+        if network is not None:
+            # The compiled network already provides sorted id-pairs, no graph needed.
+            labels = network.labels.tolist()
+            edges = np.array(network.edges, dtype=np.int64)
+        else:
+            labels = list(ppi_instance.ppi_graph.nodes)
+            label_to_id = {v: i for i, v in enumerate(labels)}
+            edges = _sorted_edges([(label_to_id[v], label_to_id[w]) for v, w in
+                                   ppi_instance.ppi_graph.edges])
+        if initial_costs_fn is None and hasattr(ppi_instance.edge_weights, "costs"):
+            costs = ppi_instance.edge_weights.costs(edges, labels)
+        else:
+            if initial_costs_fn is None:
+                initial_costs_fn = lambda e: ppi_instance.edge_weights[e]
+            costs = [initial_costs_fn((labels[u], labels[v])) for u, v in edges.tolist()]
+        if initial_prize_fn is zero_prize:
+            prizes = None
+        else:
+            prizes = [initial_prize_fn(v) for v in labels]
+        self._init_arrays(labels, edges, costs, prizes)
+
+    @classmethod
+    def from_arrays(cls, labels: typing.Sequence, edges: np.ndarray,
+                    costs: typing.Optional[np.ndarray] = None,
+                    prizes: typing.Optional[np.ndarray] = None) -> "PcstInstance":
+        """
+        Creates an instance directly from the vertex labels and the edge array
+        [[u, v], ...] of positions in labels. The edges keep their order, i.e., costs[i]
+        belongs to edges[i]. Costs default to one, prizes to zero.
+        """
+        instance = cls.__new__(cls)
+        instance._init_arrays(list(labels), edges, costs, prizes)
+        return instance
+
+    def _init_arrays(self, labels: list, edges, costs, prizes):
+        self._vertex_ids = VertexIds(labels)
+        self._edges = np.ascontiguousarray(edges, dtype=np.int64).reshape(-1, 2)
+        if costs is None:
+            self._costs = np.ones(len(self._edges), dtype=np.float64)
+        else:
+            self._costs = np.array(costs, dtype=np.float64)
+        if prizes is None:
+            self._prizes = np.zeros(len(labels), dtype=np.float64)
+        else:
+            self._prizes = np.array(prizes, dtype=np.float64)
+        # Only needed to access edges by label, thus, built on demand.
+        self._edge_ids = None
+        # Set for instances created by subinstance.
+        self._parent = None
+        self._vertex_map = None
+        self._edge_map = None
+
+    def subinstance(self, vertex_ids: np.ndarray) -> "PcstInstance":
+        """
+        Returns the instance induced by the given vertex ids with the current costs and
+        prizes. The order of the vertices and edges is kept. The new instance knows
+        its parent and maps its ids back to it (see parent, vertex_map and edge_map).
+        """
+        vertex_ids = np.sort(np.asarray(vertex_ids, dtype=np.int64))
+        keep = np.zeros(len(self._prizes), dtype=bool)
+        keep[vertex_ids] = True
+        edge_map = np.flatnonzero(keep[self._edges[:, 0]] & keep[self._edges[:, 1]])
+        new_ids = np.full(len(self._prizes), -1, dtype=np.int64)
+        new_ids[vertex_ids] = np.arange(len(vertex_ids))
+        get_label = self._vertex_ids.get_label
+        sub = PcstInstance.from_arrays([get_label(i) for i in vertex_ids.tolist()],
+                                       new_ids[self._edges[edge_map]],
+                                       self._costs[edge_map], self._prizes[vertex_ids])
+        sub._parent = self
+        sub._vertex_map = vertex_ids
+        sub._edge_map = edge_map
+        return sub
+
+    def permuted(self, seed=None) -> "PcstInstance":
+        """
+        Returns the instance with the edges in a random order (seeded by seed) and the
+        vertices renumbered in order of their first appearance in it, as if the lines of
+        the edge list had been shuffled before reading (the results of pcst_fast depend
+        on the order). Costs and prizes are kept. As for subinstance, the new instance
+        maps its ids back to this one, so SteinerTree.to_root gives the trees in the ids
+        of this instance.
+        """
+        edge_map = np.random.default_rng(seed).permutation(len(self._edges))
+        vertex_map = first_appearance_order(len(self._prizes), self._edges[edge_map])
+        new_ids = np.empty(len(self._prizes), dtype=np.int64)
+        new_ids[vertex_map] = np.arange(len(vertex_map))
+        get_label = self._vertex_ids.get_label
+        permuted = PcstInstance.from_arrays([get_label(i) for i in vertex_map.tolist()],
+                                            new_ids[self._edges[edge_map]],
+                                            self._costs[edge_map], self._prizes[vertex_map])
+        permuted._parent = self
+        permuted._vertex_map = vertex_map
+        permuted._edge_map = edge_map
+        return permuted
 
-        def f(e):
-            e_v = self._vertex_ids.get_label(e[0])
-            e_w = self._vertex_ids.get_label(e[1])
-            return initial_costs_fn((e_v, e_w))
+    @property
+    def parent(self) -> typing.Optional["PcstInstance"]:
+        """
+        The instance this one was derived from with subinstance or permuted (None
+        otherwise).
+        """
+        return self._parent
+
+    @property
+    def vertex_map(self) -> typing.Optional[np.ndarray]:
+        """
+        vertex_map[i] is the id in the parent of the vertex with id i.
+        """
+        return self._vertex_map
 
-        self._costs = np.array(np.apply_along_axis(f, axis=1, arr=self._edges),
-                               dtype=np.float64)
+    @property
+    def edge_map(self) -> typing.Optional[np.ndarray]:
+        """
+        edge_map[i] is the id in the parent of the edge with id i.
+        """
+        return self._edge_map
 
     @property
     def vertex_ids(self) -> VertexIds:
@@ -69,6 +179,15 @@ class PcstInstance:
         """
         return self._vertex_ids
 
+    @property
+    def edge_ids(self) -> EdgeIds:
+        """
+        A map between networkx edges and their position in edges and costs.
+        """
+        if self._edge_ids is None:
+            self._edge_ids = EdgeIds(self._edges, self._vertex_ids)
+        return self._edge_ids
+
     @property
     def edges(self) -> np.ndarray:
         """
@@ -100,7 +219,7 @@ class PcstInstance:
         The dict maps from edge to cost.
         """
         for edge in d:
-            self._costs[self._edge_ids.get_id(edge)] = d[edge]
+            self._costs[self.edge_ids.get_id(edge)] = d[edge]
 
     def update_vertex_prizes(self, d: typing.Dict):
         for node in d:
@@ -118,4 +237,4 @@ class PcstInstance:
         Returns the costs of an edge identified by the networkx edge. To acces the edge
         regarding to its index, directly use self.costs[i]
         """
-        return self._costs[self._edge_ids.get_id(e)]
+        return self._costs[self.edge_ids.get_id(e)]
@@ -0,0 +1,72 @@
+import typing
+
+import numpy as np
+
+from .pcst_instance import PcstInstance
+from .shortest_path_steiner import shortest_path_steiner_tree
+from .solve_pcst import solve_pcst_tree
+from .steiner_tree import SteinerTree
+
+
+class PcstSolver:
+    """
+    Computes a tree for a PcstInstance with its current costs and prizes. terminal_mask
+    marks the vertices that have to be in the tree (the solver may use it or rely on
+    their high prizes). The name identifies the solver, e.g., in benchmarks and in the
+    key of the result cache.
+    """
+    name = "solver"
+
+    def solve(self, pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> SteinerTree:
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class PcstFastSolver(PcstSolver):
+    """
+    The Goemans-Williamson algorithm of pcst_fast on the whole graph (the default). It
+    uses the prizes of the terminals but does not guarantee that all of them are in the
+    tree (see repair_tree).
+    """
+    name = "pcst_fast"
+
+    def __init__(self, pruning="strong"):
+        self.pruning = pruning
+
+    def solve(self, pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> SteinerTree:
+        return solve_pcst_tree(pcst_graph, pruning=self.pruning)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(pruning={self.pruning!r})"
+
+
+class ShortestPathSteinerSolver(PcstSolver):
+    """
+    The shortest path heuristic of Mehlhorn for the terminals, with the prizes of the
+    other vertices as discounts on the costs (see shortest_path_steiner_tree). Much
+    faster than pcst_fast for large terminal sets, in exchange for usually somewhat more
+    expensive trees. All terminals of a connected component are in the tree.
+    """
+    name = "shortest_path"
+
+    def solve(self, pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> SteinerTree:
+        return shortest_path_steiner_tree(pcst_graph, terminal_mask)
+
+
+SOLVERS: typing.Dict[str, typing.Type[PcstSolver]] = {
+    PcstFastSolver.name: PcstFastSolver,
+    ShortestPathSteinerSolver.name: ShortestPathSteinerSolver,
+}
+
+
+def get_solver(name: str) -> PcstSolver:
+    """
+    Returns a solver with default parameters by its name (see SOLVERS).
+    """
+    try:
+        return SOLVERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown solver {name!r}, choose one of "
+                         f"{', '.join(SOLVERS)}.") from None
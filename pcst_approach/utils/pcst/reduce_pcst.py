@@ -0,0 +1,57 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from .pcst_instance import PcstInstance
+
+
+def is_reduction_safe(pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> bool:
+    """
+    The reduction of reduce_pcst_instance does not change the solutions of the
+    Goemans-Williamson based solver if every non-terminal prize is below half of the
+    cheapest edge (see there).
+    """
+    if len(pcst_graph.costs) == 0:
+        return True
+    steiner_prizes = pcst_graph.prizes[~terminal_mask]
+    return len(steiner_prizes) == 0 or \
+        np.max(steiner_prizes) < 0.5 * np.min(pcst_graph.costs)
+
+
+def reduce_pcst_instance(pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> PcstInstance:
+    """
+    Removes the parts of the graph that can never be part of a solution and returns the
+    reduced instance (a subinstance, i.e., it maps back to pcst_graph) or pcst_graph
+    itself if nothing could be removed:
+    * connected components without terminal
+    * non-terminals of degree at most one, repeatedly, i.e., trees of non-terminals
+      hanging off the graph.
+    If every non-terminal prize is below half of every edge cost (is_reduction_safe),
+    the removed vertices cannot change the solutions: Such a vertex exhausts its prize
+    before any of its edges gets tight, so it never changes the growth of the other
+    clusters, and it can only be reached as a leaf of negative value that strong
+    pruning removes. Only ties between solutions of equal cost may be broken
+    differently because the ids change.
+    This also holds after prizes of non-terminals were reduced, so the reduced instance
+    can be reused for all diversification rounds.
+    """
+    n = len(pcst_graph.prizes)
+    edges = pcst_graph.edges
+    if not np.any(terminal_mask) or len(edges) == 0:
+        return pcst_graph
+    proper = edges[edges[:, 0] != edges[:, 1]]
+    adjacency = sp.csr_matrix((np.ones(len(proper)), (proper[:, 0], proper[:, 1])),
+                              shape=(n, n))
+    _, component = connected_components(adjacency, directed=False)
+    keep = np.isin(component, component[terminal_mask])
+
+    while True:
+        alive = proper[keep[proper[:, 0]] & keep[proper[:, 1]]]
+        degree = np.bincount(alive.ravel(), minlength=n)
+        leaves = keep & ~terminal_mask & (degree <= 1)
+        if not np.any(leaves):
+            break
+        keep &= ~leaves
+    if np.all(keep):
+        return pcst_graph
+    return pcst_graph.subinstance(np.flatnonzero(keep))
@@ -0,0 +1,65 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from .pcst_instance import PcstInstance
+from .steiner_tree import SteinerTree
+
+
+def missing_terminals(tree: SteinerTree, terminal_mask: np.ndarray) -> np.ndarray:
+    """
+    The ids of the terminals that are not in the tree.
+    """
+    in_tree = np.zeros(len(terminal_mask), dtype=bool)
+    in_tree[tree.vertex_ids] = True
+    return np.flatnonzero(terminal_mask & ~in_tree)
+
+
+def repair_tree(pcst_graph: PcstInstance, tree: SteinerTree,
+                terminal_mask: np.ndarray) -> SteinerTree:
+    """
+    Attaches the terminals missing in the tree (as pcst_fast may return them) by shortest
+    paths from the tree. Entering a vertex over an edge costs the edge cost minus the
+    current prize of the vertex (at least a tiny positive value), so paths prefer
+    vertices with high prizes and pass other missing terminals for free. One
+    multi-source Dijkstra from all tree vertices suffices because the shortest path
+    forest connects every terminal to the tree without cycles, i.e., the result is a
+    tree again. Terminals in other connected components stay missing.
+    Returns tree itself if no terminal is missing.
+    """
+    missing = missing_terminals(tree, terminal_mask)
+    if len(missing) == 0:
+        return tree
+    sources = tree.vertex_ids if len(tree.vertex_ids) else missing[:1]
+    n = len(pcst_graph.prizes)
+    edges = pcst_graph.edges
+    proper = np.flatnonzero(edges[:, 0] != edges[:, 1])
+    tails = np.concatenate([edges[proper, 0], edges[proper, 1]])
+    heads = np.concatenate([edges[proper, 1], edges[proper, 0]])
+    costs = np.concatenate([pcst_graph.costs[proper]] * 2)
+    # Zero weights would be dropped by scipy as missing entries.
+    epsilon = 1e-9 * max(float(np.max(pcst_graph.costs, initial=0.0)), 1.0)
+    weights = np.maximum(costs - pcst_graph.prizes[heads], 0.0) + epsilon
+    graph = sp.csr_matrix((weights, (tails, heads)), shape=(n, n))
+    distances, predecessors, _ = dijkstra(graph, directed=True, indices=sources,
+                                          min_only=True, return_predecessors=True)
+
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[sources] = True
+    new_vertices = [] if len(tree.vertex_ids) else [int(sources[0])]
+    new_edges = []
+    for t in missing[np.isfinite(distances[missing])].tolist():
+        v = t
+        while not in_tree[v]:
+            in_tree[v] = True
+            new_vertices.append(v)
+            u = int(predecessors[v])
+            new_edges.append((u, v))
+            v = u
+    if not new_vertices:
+        return tree
+    edge_ids = pcst_graph.edge_ids.get_ids(np.array(new_edges, dtype=np.int64)
+                                           .reshape(-1, 2))
+    return SteinerTree(pcst_graph,
+                       np.concatenate([tree.vertex_ids, new_vertices]),
+                       np.concatenate([tree.edge_ids, edge_ids]))
@@ -0,0 +1,126 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components, dijkstra, minimum_spanning_tree
+
+from .pcst_instance import PcstInstance
+from .steiner_tree import SteinerTree
+
+
+def _discounted_weights(pcst_graph: PcstInstance, terminal_mask: np.ndarray) -> np.ndarray:
+    """
+    The edge costs minus half the prizes of both endpoints (at least a tiny positive
+    value, scipy drops zero weights), so a path is discounted by the full prize of every
+    inner vertex. Terminals are part of the tree anyway, their prizes are no discount.
+    """
+    edges = pcst_graph.edges
+    discounts = np.where(terminal_mask, 0.0, pcst_graph.prizes)
+    epsilon = 1e-9 * max(float(np.max(pcst_graph.costs, initial=0.0)), 1.0)
+    return np.maximum(pcst_graph.costs - 0.5 * (discounts[edges[:, 0]] +
+                                                discounts[edges[:, 1]]), 0.0) + epsilon
+
+
+def _prune_steiner_leaves(tree_edges: np.ndarray, terminal_mask: np.ndarray) -> np.ndarray:
+    """
+    Removes the non-terminal leaves of the tree (given as [[u, v], ...]) until all
+    leaves are terminals. Returns the remaining edges.
+    """
+    alive = np.ones(len(tree_edges), dtype=bool)
+    degree = np.bincount(tree_edges.ravel(), minlength=len(terminal_mask))
+    incident = {}
+    for i, (u, v) in enumerate(tree_edges.tolist()):
+        incident.setdefault(u, []).append(i)
+        incident.setdefault(v, []).append(i)
+    stack = [v for v in incident if degree[v] == 1 and not terminal_mask[v]]
+    while stack:
+        v = stack.pop()
+        for i in incident[v]:
+            if alive[i]:
+                alive[i] = False
+                u = tree_edges[i, 0] if tree_edges[i, 1] == v else tree_edges[i, 1]
+                degree[u] -= 1
+                degree[v] -= 1
+                if degree[u] == 1 and not terminal_mask[u]:
+                    stack.append(u)
+    return tree_edges[alive]
+
+
+def shortest_path_steiner_tree(pcst_graph: PcstInstance,
+                               terminal_mask: np.ndarray) -> SteinerTree:
+    """
+    Computes a steiner tree for the terminals with the shortest path heuristic of
+    Mehlhorn (a 2-approximation) on the costs discounted by the current prizes (see
+    _discounted_weights):
+    1. One multi-source Dijkstra from all terminals gives every vertex its nearest
+       terminal (Voronoi regions).
+    2. Every edge between two regions connects their terminals by a path; the cheapest
+       per pair of terminals forms the distance network, of which the minimum spanning
+       tree is taken.
+    3. The paths of this spanning tree are expanded, a minimum spanning tree of their
+       union removes cycles and non-terminal leaves are pruned.
+    This takes one Dijkstra instead of the growth phase of pcst_fast, which is much
+    faster for hundreds of terminals. All terminals are integrated, but in a graph
+    with several components only those of the component with the most terminals.
+    """
+    terminals = np.flatnonzero(terminal_mask)
+    if len(terminals) <= 1:
+        return SteinerTree(pcst_graph, terminals, np.zeros(0, dtype=np.int64))
+    n = len(pcst_graph.prizes)
+    edges = pcst_graph.edges
+    weights = _discounted_weights(pcst_graph, terminal_mask)
+    graph = sp.csr_matrix((weights, (edges[:, 0], edges[:, 1])), shape=(n, n))
+    distances, predecessors, sources = dijkstra(graph, directed=False, indices=terminals,
+                                                min_only=True, return_predecessors=True)
+
+    # 2. The cheapest edge between every pair of regions.
+    u, v = edges[:, 0], edges[:, 1]
+    bridges = np.flatnonzero((sources[u] != sources[v]) & (sources[u] >= 0) &
+                             (sources[v] >= 0))
+    lengths = distances[u[bridges]] + weights[bridges] + distances[v[bridges]]
+    terminal_index = np.full(n, -1, dtype=np.int64)
+    terminal_index[terminals] = np.arange(len(terminals))
+    a = terminal_index[sources[u[bridges]]]
+    b = terminal_index[sources[v[bridges]]]
+    pairs = np.minimum(a, b) * len(terminals) + np.maximum(a, b)
+    order = np.lexsort((lengths, pairs))
+    _, first = np.unique(pairs[order], return_index=True)
+    bridges, lengths = bridges[order[first]], lengths[order[first]]
+    a, b = a[order[first]], b[order[first]]
+    distance_network = sp.csr_matrix((lengths, (a, b)),
+                                     shape=(len(terminals), len(terminals)))
+    spanning = minimum_spanning_tree(distance_network).tocoo()
+
+    # Only the component with the most terminals can be connected.
+    _, labels = connected_components(spanning, directed=False)
+    largest = np.argmax(np.bincount(labels))
+    selected = np.zeros(len(terminal_mask), dtype=bool)
+    selected[terminals[labels == largest]] = True
+    bridge_of_pair = dict(zip((np.minimum(a, b) * len(terminals) +
+                               np.maximum(a, b)).tolist(), bridges.tolist()))
+
+    # 3. Expand the paths. The predecessors form a forest, so a path can stop at the
+    # first vertex that was already expanded.
+    expanded = np.zeros(n, dtype=bool)
+    path_edges = []
+    for i, j in zip(spanning.row.tolist(), spanning.col.tolist()):
+        if labels[i] != largest:
+            continue
+        e = bridge_of_pair[min(i, j) * len(terminals) + max(i, j)]
+        path_edges.append((int(u[e]), int(v[e])))
+        for x in (int(u[e]), int(v[e])):
+            while not expanded[x] and predecessors[x] >= 0:
+                expanded[x] = True
+                path_edges.append((x, int(predecessors[x])))
+                x = int(predecessors[x])
+    path_edges = np.array(path_edges, dtype=np.int64).reshape(-1, 2)
+    vertices = np.unique(np.concatenate([path_edges.ravel(),
+                                         terminals[labels == largest]]))
+    local = np.searchsorted(vertices, path_edges)
+    path_weights = weights[pcst_graph.edge_ids.get_ids(path_edges)]
+    union = sp.csr_matrix((path_weights, (local[:, 0], local[:, 1])),
+                          shape=(len(vertices), len(vertices)))
+    tree = minimum_spanning_tree(union).tocoo()
+    tree_edges = np.stack([vertices[tree.row], vertices[tree.col]], axis=1)
+    tree_edges = _prune_steiner_leaves(tree_edges, selected)
+    vertices = np.unique(np.concatenate([tree_edges.ravel(),
+                                         terminals[labels == largest]]))
+    return SteinerTree(pcst_graph, vertices, pcst_graph.edge_ids.get_ids(tree_edges))
@@ -0,0 +1,133 @@
+import hashlib
+import typing
+
+import networkx as nx
+import numpy as np
+
+from .pcst_instance import PcstInstance
+from .union_find import UnionFind
+
+
+class SteinerTree:
+    """
+    A tree of a PcstInstance as returned by the solver: the (sorted) vertex ids and the
+    edge ids, i.e., positions in pcst_graph.edges. Labels or a networkx graph are only
+    created if you ask for them, so solving does not need any per-vertex Python work.
+    For convenience, it provides the parts of the networkx interface that are commonly
+    used on solutions: nodes, edges, number_of_nodes, number_of_edges and `v in tree`.
+    """
+
+    def __init__(self, pcst_graph: PcstInstance, vertex_ids: np.ndarray,
+                 edge_ids: np.ndarray):
+        self.pcst_graph = pcst_graph
+        self.vertex_ids = np.sort(np.asarray(vertex_ids, dtype=np.int64))
+        self.edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        self._nodes = None
+        self._node_set = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_networkx(cls, pcst_graph: PcstInstance, graph: nx.Graph) -> "SteinerTree":
+        """
+        Converts a networkx graph with labels of the instance back to ids.
+        """
+        vertex_ids = pcst_graph.vertex_ids
+        vertices = [vertex_ids.get_id(v) for v in graph.nodes]
+        edges = np.array([(vertex_ids.get_id(v), vertex_ids.get_id(w))
+                          for v, w in graph.edges], dtype=np.int64).reshape(-1, 2)
+        return cls(pcst_graph, vertices, pcst_graph.edge_ids.get_ids(edges))
+
+    def to_root(self) -> "SteinerTree":
+        """
+        Returns the same tree with the ids of the instance the pcst_graph was derived
+        from by (possibly repeated) subinstance or permuted calls.
+        """
+        tree = self
+        while tree.pcst_graph.parent is not None:
+            graph = tree.pcst_graph
+            tree = SteinerTree(graph.parent, graph.vertex_map[tree.vertex_ids],
+                               graph.edge_map[tree.edge_ids])
+        return tree
+
+    def fingerprint(self) -> bytes:
+        """
+        A 128 bit hash of the sorted vertex ids, equal for trees with the same vertices.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.blake2b(self.vertex_ids.tobytes(),
+                                                digest_size=16).digest()
+        return self._fingerprint
+
+    @property
+    def nodes(self) -> typing.List[str]:
+        """
+        The labels of the vertices.
+        """
+        if self._nodes is None:
+            get_label = self.pcst_graph.vertex_ids.get_label
+            self._nodes = [get_label(i) for i in self.vertex_ids.tolist()]
+        return self._nodes
+
+    @property
+    def edges(self) -> typing.List[typing.Tuple[str, str]]:
+        """
+        The edges as pairs of labels.
+        """
+        get_label = self.pcst_graph.vertex_ids.get_label
+        return [(get_label(v), get_label(w))
+                for v, w in self.pcst_graph.edges[self.edge_ids].tolist()]
+
+    def number_of_nodes(self) -> int:
+        return len(self.vertex_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.edge_ids)
+
+    def __len__(self):
+        return len(self.vertex_ids)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __contains__(self, label):
+        if self._node_set is None:
+            self._node_set = frozenset(self.nodes)
+        return label in self._node_set
+
+    def cost(self) -> float:
+        """
+        The sum of the current edge costs in the instance.
+        """
+        return float(self.pcst_graph.costs[self.edge_ids].sum())
+
+    def to_networkx(self) -> nx.Graph:
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes)
+        graph.add_edges_from(self.edges)
+        return graph
+
+    def is_connected(self) -> bool:
+        """
+        Checks with a single union-find pass over the edges that the edges only use
+        vertices of the tree and connect all of them.
+        """
+        n = len(self.vertex_ids)
+        if n == 0:
+            return False
+        endpoints = self.pcst_graph.edges[self.edge_ids]
+        local = np.searchsorted(self.vertex_ids, endpoints)
+        local = np.minimum(local, n - 1)
+        if np.any(self.vertex_ids[local] != endpoints):
+            return False
+        union_find = UnionFind(n)
+        merged = sum(union_find.union(v, w) for v, w in local.tolist())
+        return merged == n - 1
+
+    def is_tree(self) -> bool:
+        """
+        A connected graph with |V|-1 edges is a tree.
+        """
+        return len(self.edge_ids) == len(self.vertex_ids) - 1 and self.is_connected()
+
+    def __repr__(self):
+        return f"SteinerTree({len(self.vertex_ids)} vertices, {len(self.edge_ids)} edges)"
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class UnionFind:
+    """
+    Disjoint sets over the elements 0..n-1 with path halving and union by size.
+    """
+
+    def __init__(self, n: int):
+        self._parent = list(range(n))
+        self._size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x: int, y: int) -> bool:
+        """
+        Merges the sets of x and y. Returns False if they were already in the same set.
+        """
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return False
+        if self._size[x] < self._size[y]:
+            x, y = y, x
+        self._parent[y] = x
+        self._size[x] += self._size[y]
+        return True
+
+    def components(self) -> np.ndarray:
+        """
+        Returns the representative of every element.
+        """
+        return np.array([self.find(x) for x in range(len(self._parent))], dtype=np.int64)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class VertexIds:
     """
     Mapping between the labels of the PPI-graph and the ids in the numpy-representation
@@ -8,6 +11,9 @@ class VertexIds:
         self._id_to_name = list(node_names)
         self._name_to_id = {name: i for i, name in enumerate(self._id_to_name)}
 
+    def __len__(self):
+        return len(self._id_to_name)
+
     def get_label(self, i: int) -> str:
         """
         Returns the networkx label of the vertex at position i in the numpy-representation
@@ -21,3 +27,9 @@ class VertexIds:
         representation for pcst_fast.
         """
         return self._name_to_id[label]
+
+    def get_ids(self, labels) -> np.ndarray:
+        """
+        Returns the positions of all labels as numpy array.
+        """
+        return np.array([self._name_to_id[label] for label in labels], dtype=np.int64)
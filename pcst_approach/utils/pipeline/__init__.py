@@ -0,0 +1,6 @@
+from .shared_network import SharedNetwork, get_shared_network, imap_shared, load_shared_network
+from .batch import run_batch, BatchResult
+from .sweep import run_sweep, SweepResult
+from .server import RobustServer, RobustClient
+from .replicates import run_replicates, ReplicateResult
+from .significance import run_significance, SignificanceResult
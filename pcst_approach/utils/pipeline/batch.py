@@ -0,0 +1,108 @@
+import os
+import sys
+import typing
+from timeit import default_timer as timer
+
+from ..pcst import get_solver
+from ..ppi import read_terminals
+from ..steinerdiv import ExpMinMaxDiverseSteinerTreeComputer, write_solution_set
+from .shared_network import get_shared_network, imap_shared
+
+
+class BatchResult:
+    """
+    The outcome of a single seed file of a batch run. A failed seed file has the status
+    'failed' and the reason in error; it does not stop the remaining batch.
+    """
+
+    def __init__(self, seed_file: str, outfile: str, status: str, n_terminals=0,
+                 n_trees=0, seconds=0.0, error=""):
+        self.seed_file = seed_file
+        self.outfile = outfile
+        self.status = status
+        self.n_terminals = n_terminals
+        self.n_trees = n_trees
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return f"BatchResult({self.seed_file!r}, status={self.status!r})"
+
+
+def _run_seed_file(job) -> BatchResult:
+    seed_file, outfile, init, red, n, threshold, solver = job
+    start = timer()
+    try:
+        shared = get_shared_network()
+        ppi_instance = shared.ppi_instance(read_terminals(seed_file))
+        if not ppi_instance.terminals:
+            raise ValueError("None of the seeds is part of the network.")
+        engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
+                                                     reduction_factor=red,
+                                                     solver=get_solver(solver))
+        steiner_trees = engine(ppi_instance, n=n - 1, pcst_graph=shared.pcst_graph)
+        write_solution_set(steiner_trees, outfile, threshold)
+        return BatchResult(seed_file, outfile, "ok",
+                           n_terminals=len(ppi_instance.terminals),
+                           n_trees=len(steiner_trees), seconds=timer() - start)
+    except Exception as e:
+        return BatchResult(seed_file, outfile, "failed", seconds=timer() - start,
+                           error=f"{type(e).__name__}: {e}")
+
+
+def write_batch_summary(results: typing.List[BatchResult], path: str):
+    """
+    Writes one tab-separated line per seed file with status, timing and error.
+    """
+    with open(path, "w") as file:
+        file.write("seed_file\toutfile\tstatus\tterminals\ttrees\tseconds\terror\n")
+        for r in results:
+            error = r.error.replace("\t", " ").replace("\n", " ")
+            file.write(f"{r.seed_file}\t{r.outfile}\t{r.status}\t{r.n_terminals}\t"
+                       f"{r.n_trees}\t{r.seconds:.3f}\t{error}\n")
+
+
+def run_batch(path_to_graph: str, seed_files: typing.List[str], out_dir: str,
+              init=0.25, red=0.9, n=30, threshold=0.1, suffix=".graphml",
+              processes=None, progress=True,
+              solver="pcst_fast") -> typing.List[BatchResult]:
+    """
+    Runs ROBUST for every seed file against a single loaded network and writes one
+    result per seed file to out_dir (named like the seed file with the given suffix,
+    which determines the format as in write_solution_set).
+    The network and the PcstInstance are built once. With more than one process, the
+    seed files are distributed over a process pool that inherits them via fork (or
+    loads them once per worker where fork is not available).
+    A seed file that fails is recorded in the returned results and in
+    batch_summary.tsv in out_dir, the batch continues.
+    solver: The name of the PcstSolver (see pcst.SOLVERS), e.g., 'shortest_path' for
+    large seed sets.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for seed_file in seed_files:
+        name = os.path.splitext(os.path.basename(seed_file))[0]
+        jobs.append((seed_file, os.path.join(out_dir, name + suffix), init, red, n,
+                     threshold, solver))
+
+    start = timer()
+    results = []
+
+    def report(result: BatchResult):
+        results.append(result)
+        if progress:
+            status = result.status if not result.error else f"{result.status} ({result.error})"
+            print(f"[{len(results)}/{len(jobs)}] {os.path.basename(result.seed_file)}: "
+                  f"{status} in {result.seconds:.1f}s", file=sys.stderr)
+
+    for result in imap_shared(path_to_graph, _run_seed_file, jobs, processes):
+        report(result)
+
+    order = {job[0]: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[r.seed_file])
+    write_batch_summary(results, os.path.join(out_dir, "batch_summary.tsv"))
+    if progress:
+        failed = sum(r.status != "ok" for r in results)
+        print(f"Finished {len(results)} seed files in {timer() - start:.1f}s, "
+              f"{failed} failed.", file=sys.stderr)
+    return results
@@ -0,0 +1,122 @@
+import itertools
+import sys
+import typing
+from timeit import default_timer as timer
+
+import numpy as np
+
+from ..pcst import SteinerTree
+from ..ppi import read_terminals
+from ..steinerdiv import ExpMinMaxDiverseSteinerTreeComputer, SolutionSet
+from .shared_network import get_shared_network, imap_shared, load_shared_network
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+class ReplicateResult:
+    """
+    The result of replicate runs over shuffled edge orders as two tidy tables:
+    * replicates: One row per replicate with its seed, the number of trees, the size of
+        its module and the time of the diversification chain.
+    * vertices: One row per vertex that occurs in any replicate with the mean and the
+        variance of its %occurrences over the replicates, the fraction of the
+        replicates with the vertex in the module (module_frequency) and terminal.
+    mean_jaccard is the mean Jaccard index of the modules of all pairs of replicates
+    (1.0 if the module does not depend on the edge order).
+    """
+
+    def __init__(self, replicates: "pd.DataFrame", vertices: "pd.DataFrame",
+                 mean_jaccard: float):
+        self.replicates = replicates
+        self.vertices = vertices
+        self.mean_jaccard = mean_jaccard
+
+
+def replicate_seeds(k: int, seed=None) -> typing.List[int]:
+    """
+    k independent seeds for the edge permutations, derived from seed.
+    """
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(k)]
+
+
+def _run_replicate(job):
+    terminals, init, red, n, seed = job
+    start = timer()
+    shared = get_shared_network()
+    ppi_instance = shared.ppi_instance(terminals)
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
+                                                 reduction_factor=red)
+    # The trees of the permuted instance are returned in the ids of the shared one.
+    steiner_trees = engine(ppi_instance, n=n - 1,
+                           pcst_graph=shared.pcst_graph.permuted(seed))
+    # Only the ids are sent back to the parent.
+    trees = [(tree.vertex_ids, tree.edge_ids) for tree in steiner_trees]
+    return seed, trees, timer() - start
+
+
+def run_replicates(path_to_graph: str, path_to_seeds: str, k: int, init=0.25, red=0.9,
+                   n=30, threshold=0.1, seed=None, processes=None,
+                   progress=True) -> ReplicateResult:
+    """
+    Runs k independent diversification chains for the seeds, each on the PcstInstance
+    with the edges in another seeded random order (see PcstInstance.permuted), in
+    parallel over a shared network. This measures how stable the module is against the
+    edge order that pcst_fast depends on, without reading the network k times (as with
+    read_ppi_shuffled). The occurrences of the replicates are merged into the mean and
+    variance per vertex.
+    """
+    import pandas as pd  # Only loaded for the result tables.
+    shared = load_shared_network(path_to_graph)
+    terminals = shared.ppi_instance(read_terminals(path_to_seeds)).terminals
+    if not terminals:
+        raise ValueError("None of the seeds is part of the network.")
+    jobs = [(terminals, init, red, n, s) for s in replicate_seeds(k, seed)]
+    n_vertices = len(shared.pcst_graph.prizes)
+    fraction_sum = np.zeros(n_vertices, dtype=np.float64)
+    fraction_square_sum = np.zeros(n_vertices, dtype=np.float64)
+    module_count = np.zeros(n_vertices, dtype=np.int64)
+    modules = {}
+    replicate_rows = []
+    for i, (replicate_seed, trees, seconds) in enumerate(
+            imap_shared(path_to_graph, _run_replicate, jobs, processes)):
+        if progress:
+            print(f"[{i + 1}/{len(jobs)}] replicate with seed {replicate_seed}: "
+                  f"{len(trees)} trees in {seconds:.1f}s", file=sys.stderr)
+        solution_set = SolutionSet(shared.ppi_instance(terminals), shared.pcst_graph)
+        for vertex_ids, edge_ids in trees:
+            solution_set.append(SteinerTree(shared.pcst_graph, vertex_ids, edge_ids))
+        fractions = solution_set.occurrence_counts() / max(len(solution_set), 1)
+        fraction_sum += fractions
+        fraction_square_sum += fractions ** 2
+        module = solution_set.module(threshold)[0]
+        module_count[module] += 1
+        modules[replicate_seed] = module
+        replicate_rows.append({"seed": replicate_seed, "trees": len(solution_set),
+                               "module_size": len(module), "chain_seconds": seconds})
+
+    terminal_mask = np.zeros(n_vertices, dtype=bool)
+    terminal_mask[shared.pcst_graph.vertex_ids.get_ids(terminals)] = True
+    mean = fraction_sum / k
+    # The sample variance, 0 for a single replicate.
+    variance = np.maximum(fraction_square_sum - k * mean ** 2, 0.0) / max(k - 1, 1)
+    ids = np.flatnonzero(fraction_sum > 0)
+    get_label = shared.pcst_graph.vertex_ids.get_label
+    vertices = pd.DataFrame({
+        "vertex": [get_label(v) for v in ids.tolist()],
+        "mean %occurrences": mean[ids],
+        "variance %occurrences": variance[ids],
+        "module_frequency": module_count[ids] / k,
+        "terminal": terminal_mask[ids],
+    })
+    vertices = vertices.sort_values(["module_frequency", "mean %occurrences"],
+                                    ascending=False, kind="mergesort").reset_index(drop=True)
+    # The replicates in the order of the seeds, independent of the finishing order.
+    order = {job[-1]: i for i, job in enumerate(jobs)}
+    replicate_rows.sort(key=lambda row: order[row["seed"]])
+    replicates = pd.DataFrame(replicate_rows,
+                              columns=["seed", "trees", "module_size", "chain_seconds"])
+    jaccard = [len(np.intersect1d(a, b)) / max(len(np.union1d(a, b)), 1)
+               for a, b in itertools.combinations(modules.values(), 2)]
+    return ReplicateResult(replicates, vertices,
+                           float(np.mean(jaccard)) if jaccard else 1.0)
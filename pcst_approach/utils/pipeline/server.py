@@ -0,0 +1,306 @@
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import typing
+from timeit import default_timer as timer
+
+import numpy as np
+
+from ..steinerdiv import ExpMinMaxDiverseSteinerTreeComputer, write_solution_set
+from .shared_network import SharedNetwork
+
+# The protocol: every message is a JSON object on a single line. Requests have an "op":
+# * submit: network, seeds, and optionally initial_fraction, reduction_factor, trees,
+#   threshold and format (csv, graphml or edgelist). The server answers with
+#   {"job": id, "status": "queued"} and later streams the result as
+#   {"job": id, "chunk": "..."} messages, followed by
+#   {"job": id, "status": "done", ...} (or "failed" with an "error").
+# * cancel: job. Queued jobs are not run. A running job is not interrupted: its worker
+#   process keeps computing until the job ends, then the result is dropped. The
+#   submitter gets {"job": id, "status": "cancelled"} as final message of the job.
+# * stats: Queue depth, number of jobs per status and latencies.
+# * networks: The names of the loaded networks.
+SUFFIXES = {"csv": ".csv", "graphml": ".graphml", "edgelist": ".txt"}
+CHUNK_SIZE = 1 << 16
+DEFAULT_PARAMETERS = {"initial_fraction": 0.25, "reduction_factor": 0.9, "trees": 30,
+                      "threshold": 0.1, "format": "graphml"}
+
+# The networks of the server, loaded before the worker processes are forked (or by
+# _load_networks in spawned workers).
+_networks: typing.Dict[str, SharedNetwork] = {}
+
+
+def _load_networks(networks: typing.Dict[str, str]):
+    for name, path in networks.items():
+        if name not in _networks:
+            _networks[name] = SharedNetwork(path)
+
+
+def _solve_job(job) -> typing.Tuple[str, int]:
+    name, seeds, init, red, trees, threshold, output_format = job
+    shared = _networks[name]
+    ppi_instance = shared.ppi_instance(seeds)
+    if not ppi_instance.terminals:
+        raise ValueError("None of the seeds is part of the network.")
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
+                                                 reduction_factor=red)
+    steiner_trees = engine(ppi_instance, n=trees - 1, pcst_graph=shared.pcst_graph)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "module" + SUFFIXES[output_format])
+        write_solution_set(steiner_trees, path, threshold)
+        with open(path) as file:
+            return file.read(), len(steiner_trees)
+
+
+class _Job:
+    def __init__(self, job_id: int, payload: tuple, send: typing.Callable):
+        self.id = job_id
+        self.payload = payload
+        self.send = send
+        self.status = "queued"
+        self.submitted = timer()
+        self.started = None
+
+
+def _summary(values) -> typing.Dict[str, float]:
+    if not values:
+        return {}
+    values = np.array(values)
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "max": float(values.max())}
+
+
+class RobustServer:
+    """
+    A long-running server that keeps networks loaded and runs ROBUST for submitted seed
+    sets. Requests are handled by an asyncio front end and put in a queue, from which
+    the jobs are given to a pool of worker processes that inherit the networks via fork.
+    See the comment on top of this module for the protocol.
+    """
+
+    def __init__(self, networks: typing.Dict[str, str], processes=None):
+        """
+        networks: Maps the names used in requests to network files.
+        processes: Number of worker processes (default: number of cpus).
+        """
+        for name, path in networks.items():
+            print(f"Loading network {name} from {path}...")
+            _networks[name] = SharedNetwork(path)
+        self.networks = dict(networks)
+        self.processes = processes or os.cpu_count() or 1
+        self._ids = itertools.count(1)
+        self._jobs: typing.Dict[int, _Job] = {}
+        self._counts = collections.Counter()
+        self._latencies = collections.deque(maxlen=1000)
+        self._waits = collections.deque(maxlen=1000)
+        self._queue = None
+        self._executor = None
+        self._futures = set()
+
+    async def serve(self, socket_path: typing.Optional[str] = None,
+                    host="127.0.0.1", port=8765):
+        """
+        Serves on the Unix socket (if given) or on host:port until SIGINT or SIGTERM.
+        """
+        self._queue = asyncio.Queue()
+        if "fork" in multiprocessing.get_all_start_methods():
+            # The workers inherit the loaded networks.
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.processes, mp_context=multiprocessing.get_context("fork"))
+        else:
+            # Spawned workers load the networks once when they start.
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.processes, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_networks, initargs=(self.networks,))
+        workers = [asyncio.ensure_future(self._work()) for _ in range(self.processes)]
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self._handle, path=socket_path)
+            print(f"Listening on {socket_path}")
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+            print(f"Listening on {host}:{port}")
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, server.close)
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            print("Shutting down...")
+        finally:
+            for worker in workers:
+                worker.cancel()
+            # shutdown(cancel_futures=True) needs Python 3.9.
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            if job.status == "cancelled":
+                continue
+            job.status = "running"
+            job.started = timer()
+            self._waits.append(job.started - job.submitted)
+            future = self._executor.submit(_solve_job, job.payload)
+            self._futures.add(future)
+            try:
+                data, n_trees = await asyncio.wrap_future(future)
+            except Exception as e:
+                if job.status == "running":
+                    self._finish(job, "failed")
+                    await job.send({"job": job.id, "status": "failed",
+                                    "error": f"{type(e).__name__}: {e}"})
+                continue
+            finally:
+                self._futures.discard(future)
+            if job.status != "running":
+                continue  # Cancelled while running.
+            self._finish(job, "done")
+            for i in range(0, len(data), CHUNK_SIZE):
+                await job.send({"job": job.id, "chunk": data[i:i + CHUNK_SIZE]})
+            await job.send({"job": job.id, "status": "done", "trees": n_trees,
+                            "seconds": timer() - job.submitted})
+
+    def _finish(self, job: _Job, status: str):
+        job.status = status
+        self._counts[status] += 1
+        if status != "cancelled":
+            self._latencies.append(timer() - job.submitted)
+        del self._jobs[job.id]
+
+    def stats(self) -> typing.Dict:
+        return {"queue_depth": sum(job.status == "queued" for job in self._jobs.values()),
+                "running": sum(job.status == "running" for job in self._jobs.values()),
+                "done": self._counts["done"], "failed": self._counts["failed"],
+                "cancelled": self._counts["cancelled"], "workers": self.processes,
+                "latency": _summary(self._latencies),
+                "queue_wait": _summary(self._waits)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+
+        async def send(message):
+            async with lock:
+                try:
+                    writer.write((json.dumps(message) + "\n").encode())
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # The client is gone, nobody waits for the message.
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                await send(self._request(json.loads(line), send))
+            except Exception as e:
+                await send({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        writer.close()
+
+    def _request(self, request: typing.Dict, send) -> typing.Dict:
+        op = request.get("op")
+        if op == "submit":
+            p = dict(DEFAULT_PARAMETERS, **request)
+            if p.get("network") not in _networks:
+                raise ValueError(f"Unknown network {p.get('network')!r}.")
+            if p["format"] not in SUFFIXES:
+                raise ValueError(f"Unknown format {p['format']!r}.")
+            seeds = p.get("seeds")
+            if not isinstance(seeds, list) or not all(isinstance(v, str) for v in seeds):
+                raise ValueError("The seeds have to be a list of strings.")
+            payload = (p["network"], seeds, float(p["initial_fraction"]),
+                       float(p["reduction_factor"]), int(p["trees"]),
+                       float(p["threshold"]), p["format"])
+            job = _Job(next(self._ids), payload, send)
+            self._jobs[job.id] = job
+            self._queue.put_nowait(job)
+            return {"job": job.id, "status": "queued"}
+        if op == "cancel":
+            job = self._jobs.get(request.get("job"))
+            if job is None:
+                return {"job": request.get("job"), "status": "unknown"}
+            self._finish(job, "cancelled")
+            # The submitter waits for a final message of the job (sent once, the job is
+            # no longer known afterwards).
+            asyncio.ensure_future(job.send({"job": job.id, "status": "cancelled"}))
+            return {"job": job.id, "status": "cancelled"}
+        if op == "stats":
+            return self.stats()
+        if op == "networks":
+            return {"networks": sorted(_networks)}
+        raise ValueError(f"Unknown op {op!r}.")
+
+
+class RobustClient:
+    """
+    A simple blocking client for RobustServer.
+    """
+
+    def __init__(self, socket_path: typing.Optional[str] = None, host="127.0.0.1",
+                 port=8765):
+        if socket_path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile("rwb")
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def request(self, message: typing.Dict) -> typing.Dict:
+        self._file.write((json.dumps(message) + "\n").encode())
+        self._file.flush()
+        return self.receive()
+
+    def receive(self) -> typing.Dict:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection.")
+        message = json.loads(line)
+        if message.get("status") == "error":
+            raise RuntimeError(message["error"])
+        return message
+
+    def submit(self, network: str, seeds: typing.List[str], **parameters) -> int:
+        """
+        Submits a job and returns its id. See DEFAULT_PARAMETERS for the parameters.
+        """
+        if isinstance(seeds, str):
+            raise ValueError("The seeds have to be a list of strings, not a string.")
+        answer = self.request(dict(parameters, op="submit", network=network,
+                                   seeds=list(seeds)))
+        return answer["job"]
+
+    def results(self, out: typing.TextIO) -> typing.Dict:
+        """
+        Writes the streamed result of the submitted job to out and returns the final
+        message (with status done, failed or cancelled, also if another client cancelled
+        the job).
+        """
+        while True:
+            message = self.receive()
+            if "chunk" in message:
+                out.write(message["chunk"])
+            elif message.get("status") in ("done", "failed", "cancelled"):
+                return message
+
+    def cancel(self, job: int) -> typing.Dict:
+        return self.request({"op": "cancel", "job": job})
+
+    def stats(self) -> typing.Dict:
+        return self.request({"op": "stats"})
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import typing
+
+from ..pcst import PcstInstance
+from ..ppi import PpiInstance, UnitEdgeWeight, load_network
+
+
+class SharedNetwork:
+    """
+    The parts of a run that only depend on the network: the compiled network, a
+    PpiInstance without terminals providing edge weights and meta, and the PcstInstance
+    with the edge and cost arrays. Workers only read from it (the prizes are
+    reset for every seed set), so forked processes share the pages with the parent.
+    """
+
+    def __init__(self, path_to_graph: str, edge_weights=None):
+        self.path_to_graph = path_to_graph
+        self.network = load_network(path_to_graph)
+        if edge_weights is None:
+            edge_weights = UnitEdgeWeight()
+        self.ppi_template = PpiInstance.from_network(self.network, [], edge_weights)
+        self.pcst_graph = PcstInstance(self.ppi_template)
+
+    def ppi_instance(self, terminals: list) -> PpiInstance:
+        """
+        Returns a PpiInstance for the terminals that are part of the network.
+        """
+        terminals = list(set(terminals).intersection(self.network.label_to_id()))
+        return PpiInstance.from_network(self.network, terminals,
+                                        self.ppi_template.edge_weights,
+                                        meta=self.ppi_template.meta)
+
+
+# The shared network of the current process. It is set in the parent before the pool
+# is forked, or by _init_worker if processes have to be spawned.
+_shared: typing.Optional[SharedNetwork] = None
+
+
+def _init_worker(path_to_graph):
+    global _shared
+    if _shared is None or _shared.path_to_graph != path_to_graph:
+        _shared = SharedNetwork(path_to_graph)
+
+
+def load_shared_network(path_to_graph: str) -> SharedNetwork:
+    """
+    Loads the network in the current process (if not already loaded), e.g., to use it
+    in the parent of imap_shared as well.
+    """
+    _init_worker(path_to_graph)
+    return _shared
+
+
+def get_shared_network() -> SharedNetwork:
+    """
+    The network loaded for the jobs of imap_shared in the current process.
+    """
+    return _shared
+
+
+def imap_shared(path_to_graph: str, fn: typing.Callable, jobs: list, processes=None):
+    """
+    Applies fn to every job and yields the results in the order they are finished.
+    fn can access the network with get_shared_network(). The network is loaded once:
+    with more than one process, the workers of the pool inherit it via fork (or load it
+    once per worker where fork is not available).
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(jobs)))
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if processes == 1 or can_fork:
+        # Forked workers inherit the network loaded here.
+        _init_worker(path_to_graph)
+    if processes == 1:
+        for job in jobs:
+            yield fn(job)
+        return
+    context = multiprocessing.get_context("fork" if can_fork else "spawn")
+    with context.Pool(processes, initializer=_init_worker,
+                      initargs=(path_to_graph,)) as pool:
+        yield from pool.imap_unordered(fn, jobs)
@@ -0,0 +1,289 @@
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import typing
+from timeit import default_timer as timer
+
+import numpy as np
+
+from ..pcst import PcstInstance, SteinerTree
+from ..ppi import read_terminals
+from ..ppi.compiled_network import default_cache_dir
+from ..steinerdiv import ExpMinMaxDiverseSteinerTreeComputer, SolutionSet
+from ..steinerdiv.result_cache import graph_hash
+from ..version import __version__
+from .shared_network import get_shared_network, imap_shared, load_shared_network
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+# Increase whenever the layout of the cached null runs changes.
+FORMAT_VERSION = 1
+
+
+class SignificanceResult:
+    """
+    The result of run_significance:
+    * vertices: The columns of SolutionSet.get_occurrences (vertex, #occurrences,
+        %occurrences, terminal, including the seeds) and for every vertex the mean and
+        the standard deviation of its %occurrences over the null runs and the empirical
+        p-value, i.e., (1 + #null runs with at least the observed %occurrences) /
+        (1 + #null runs).
+    * solution_set: The steiner trees of the seeds.
+    * n_null: The number of null runs, of which n_cached were loaded from the cache.
+    """
+
+    def __init__(self, vertices: "pd.DataFrame", solution_set: SolutionSet, n_null: int,
+                 n_cached: int):
+        self.vertices = vertices
+        self.solution_set = solution_set
+        self.n_null = n_null
+        self.n_cached = n_cached
+
+
+def degree_bins(degrees: np.ndarray, min_size=50) -> np.ndarray:
+    """
+    Assigns every vertex to a bin of similar degree: the bins are the powers of two of
+    the degree (1, 2-3, 4-7, ...), where bins with less than min_size vertices are merged
+    into the next lower one, so the rare hubs can be matched by enough vertices. Vertices
+    without edges get -1.
+    """
+    log_degree = np.where(degrees > 0, np.floor(np.log2(np.maximum(degrees, 1))), -1)
+    log_degree = log_degree.astype(np.int64)
+    sizes = np.bincount(log_degree[log_degree >= 0])
+    # Merge from the highest bin downwards.
+    target = np.arange(len(sizes))
+    carried = 0
+    for b in range(len(sizes) - 1, 0, -1):
+        carried += sizes[b]
+        if carried < min_size:
+            target[b] = b - 1
+        else:
+            carried = 0
+    for b in range(1, len(sizes)):
+        target[b] = target[target[b]]
+    _, bins = np.unique(target, return_inverse=True)
+    return np.where(log_degree >= 0, bins[np.maximum(log_degree, 0)], -1)
+
+
+def _merge_small_bins(groups: typing.List[typing.Tuple[np.ndarray, int]]
+                      ) -> typing.List[typing.Tuple[np.ndarray, int]]:
+    """
+    groups are the (vertices, number of seeds) of the degree bins in ascending order. A
+    bin with less vertices than seeds cannot be sampled without replacement, so it is
+    merged with the next lower bin (the next higher one for the lowest bin) until it has
+    enough vertices; the seeds of merged bins are drawn from their union. This always
+    ends because the seeds are vertices of the bins themselves. Bins without seeds are
+    dropped.
+    """
+    groups = list(groups)
+    b = 0
+    while b < len(groups):
+        vertices, count = groups[b]
+        if len(vertices) >= count or len(groups) == 1:
+            b += 1
+            continue
+        other = b - 1 if b > 0 else b + 1
+        low, high = min(b, other), max(b, other)
+        groups[low:high + 1] = [(np.concatenate([groups[low][0], groups[high][0]]),
+                                 groups[low][1] + groups[high][1])]
+        # The merged bin is checked again, and the bins below it still have enough.
+        b = low
+    return [(vertices, count) for vertices, count in groups if count]
+
+
+def random_seed_sets(pcst_graph: PcstInstance, seed_ids: np.ndarray, indices,
+                     matching="degree", seed=0, min_bin_size=50) -> typing.List[np.ndarray]:
+    """
+    The random seed sets with the indices (of an infinite sequence for seed), as
+    vertex ids of pcst_graph. With matching="degree", every seed is replaced by a random
+    vertex of its degree bin (see degree_bins); with matching="size", the sets are
+    uniform random vertex sets of the same size. A set only depends on its index, so
+    the sequence can be extended. If a bin has less vertices than seeds, it is merged
+    with its neighbouring bins (see _merge_small_bins).
+    """
+    degrees = np.bincount(pcst_graph.edges.ravel(), minlength=len(pcst_graph.prizes))
+    candidates = np.flatnonzero(degrees > 0)
+    if matching == "size":
+        groups = [(candidates, len(seed_ids))]
+    elif matching == "degree":
+        bins = degree_bins(degrees, min_bin_size)
+        seed_bins = bins[seed_ids]
+        profile = np.bincount(seed_bins[seed_bins >= 0], minlength=bins.max() + 1)
+        groups = _merge_small_bins(
+            [(np.flatnonzero(bins == b), int(c)) for b, c in enumerate(profile)])
+    else:
+        raise ValueError(f"Unknown matching {matching!r}, choose degree or size.")
+    sets = []
+    for index in indices:
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+        sets.append(np.sort(np.concatenate(
+            [rng.choice(group, count, replace=False) for group, count in groups])))
+    return sets
+
+
+def _null_key(pcst_graph: PcstInstance, meta: typing.Dict, seed_ids: np.ndarray, init,
+              red, n, matching, seed, min_bin_size) -> str:
+    """
+    The key of the null runs: the network, the parameters and the number of seeds (and
+    their degree profile with degree matching), not the seeds themselves.
+    """
+    description = {
+        "version": __version__,
+        "format": FORMAT_VERSION,
+        "graph": graph_hash(pcst_graph),
+        "graph_diameter": meta["graph_diameter"],
+        "parameters": {"initial_fraction": init, "reduction_factor": red, "n": n},
+        "matching": matching,
+        "seed": seed,
+        "seeds": len(seed_ids),
+    }
+    if matching == "degree":
+        degrees = np.bincount(pcst_graph.edges.ravel(), minlength=len(pcst_graph.prizes))
+        bins = degree_bins(degrees, min_bin_size)
+        description["profile"] = np.bincount(bins[seed_ids][bins[seed_ids] >= 0]).tolist()
+        description["min_bin_size"] = min_bin_size
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def _load_null_runs(path: str) -> typing.List[typing.Tuple[np.ndarray, np.ndarray, int]]:
+    """
+    The cached null runs as (vertex ids, occurrence counts, number of trees), or [].
+    """
+    try:
+        with np.load(path) as data:
+            offsets = data["offsets"]
+            vertex_ids = np.split(data["vertex_ids"], offsets[1:-1])
+            counts = np.split(data["counts"], offsets[1:-1])
+            n_trees = data["n_trees"].tolist()
+    except (OSError, ValueError, KeyError):
+        return []
+    return list(zip(vertex_ids, counts, n_trees))
+
+
+def _store_null_runs(path: str, runs):
+    """
+    Saves the null runs atomically. Caching is best effort, errors are ignored.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, offsets=np.cumsum([0] + [len(v) for v, _, _ in runs]),
+                     vertex_ids=np.concatenate([v for v, _, _ in runs] +
+                                               [np.zeros(0, dtype=np.int32)]),
+                     counts=np.concatenate([c for _, c, _ in runs] +
+                                           [np.zeros(0, dtype=np.int32)]),
+                     n_trees=np.array([t for _, _, t in runs], dtype=np.int64))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+
+
+def _run_chain(job):
+    index, seed_ids, init, red, n = job
+    start = timer()
+    shared = get_shared_network()
+    get_label = shared.pcst_graph.vertex_ids.get_label
+    ppi_instance = shared.ppi_instance([get_label(v) for v in seed_ids.tolist()])
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
+                                                 reduction_factor=red)
+    steiner_trees = engine(ppi_instance, n=n - 1, pcst_graph=shared.pcst_graph)
+    if index < 0:
+        # The observed run, its trees are needed for the table.
+        return index, [(tree.vertex_ids, tree.edge_ids) for tree in steiner_trees], \
+            timer() - start
+    # Only the occurrence counts of a null run are sent back to the parent.
+    counts = steiner_trees.occurrence_counts()
+    vertex_ids = np.flatnonzero(counts)
+    return index, (vertex_ids.astype(np.int32), counts[vertex_ids].astype(np.int32),
+                   len(steiner_trees)), timer() - start
+
+
+def run_significance(path_to_graph: str, path_to_seeds: str, n_null=100, init=0.25,
+                     red=0.9, n=30, matching="degree", seed=0, min_bin_size=50,
+                     processes=None, cache=True, cache_dir=None,
+                     progress=True) -> SignificanceResult:
+    """
+    Runs ROBUST for the seeds and for n_null random seed sets of the same network (see
+    random_seed_sets, degree-matched by default), so hubs that occur in many modules
+    whatever the seeds are can be told apart from vertices specific to the seeds. All
+    runs share one loaded PcstInstance and are distributed over processes. The
+    empirical p-value of a vertex is computed from the fraction of the null runs in
+    which it occurs at least as often as in the run for the seeds (vectorized over the
+    occurrence counts of all null runs).
+    The null runs are cached in <cache_dir>/nulls by network, parameters and number of
+    seeds (and their degree profile with degree matching), so they are computed once and
+    reused for other seed sets; with matching="size", by all seed sets of the same size.
+    More null runs than cached are added to the cache.
+    """
+    import pandas as pd  # Only loaded for the result table.
+    shared = load_shared_network(path_to_graph)
+    pcst_graph = shared.pcst_graph
+    terminals = shared.ppi_instance(read_terminals(path_to_seeds)).terminals
+    if not terminals:
+        raise ValueError("None of the seeds is part of the network.")
+    seed_ids = np.sort(pcst_graph.vertex_ids.get_ids(terminals))
+
+    runs = []
+    path = None
+    if cache:
+        directory = os.path.join(cache_dir or default_cache_dir(), "nulls")
+        os.makedirs(directory, exist_ok=True)
+        key = _null_key(pcst_graph, shared.ppi_template.meta, seed_ids, init, red, n,
+                        matching, seed, min_bin_size)
+        path = os.path.join(directory, key + ".npz")
+        runs = _load_null_runs(path)[:n_null]
+    n_cached = len(runs)
+    missing = range(n_cached, n_null)
+    null_sets = random_seed_sets(pcst_graph, seed_ids, missing, matching, seed,
+                                 min_bin_size)
+    jobs = [(-1, seed_ids, init, red, n)] + \
+        [(i, s, init, red, n) for i, s in zip(missing, null_sets)]
+    if progress and n_cached:
+        print(f"Loaded {n_cached} null runs from the cache.", file=sys.stderr)
+    new_runs = {}
+    observed = None
+    for done, (index, result, seconds) in enumerate(
+            imap_shared(path_to_graph, _run_chain, jobs, processes)):
+        if index < 0:
+            observed = result
+        else:
+            new_runs[index] = result
+        if progress:
+            print(f"[{done + 1}/{len(jobs)}] {'seeds' if index < 0 else 'null run'} in "
+                  f"{seconds:.1f}s", file=sys.stderr)
+    runs += [new_runs[i] for i in missing]
+    if path is not None and new_runs:
+        _store_null_runs(path, runs)
+
+    solution_set = SolutionSet(shared.ppi_instance(terminals), pcst_graph)
+    for vertex_ids, edge_ids in observed:
+        solution_set.append(SteinerTree(pcst_graph, vertex_ids, edge_ids))
+    n_vertices = len(pcst_graph.prizes)
+    observed_fractions = solution_set.occurrence_counts() / max(len(solution_set), 1)
+    run_vertices = np.concatenate([v for v, _, _ in runs] + [np.zeros(0, np.int32)])
+    run_fractions = np.concatenate([c / max(t, 1) for _, c, t in runs] + [np.zeros(0)])
+    # Vertices missing in a null run have the fraction 0, which never counts as at least
+    # the observed fraction of a vertex in the table.
+    at_least = run_fractions >= observed_fractions[run_vertices] - 1e-12
+    exceed = np.bincount(run_vertices[at_least], minlength=n_vertices)
+    null_sum = np.bincount(run_vertices, weights=run_fractions, minlength=n_vertices)
+    null_square_sum = np.bincount(run_vertices, weights=run_fractions ** 2,
+                                  minlength=n_vertices)
+    n_runs = max(len(runs), 1)
+    null_mean = null_sum / n_runs
+    null_std = np.sqrt(np.maximum(null_square_sum / n_runs - null_mean ** 2, 0.0))
+
+    vertices = solution_set.get_occurrences(include_terminals=True).reset_index()
+    ids = pcst_graph.vertex_ids.get_ids(vertices["vertex"].tolist())
+    vertices["null mean %occurrences"] = null_mean[ids]
+    vertices["null std %occurrences"] = null_std[ids]
+    vertices["p_value"] = (1 + exceed[ids]) / (1 + len(runs))
+    vertices = vertices.sort_values(["p_value", "#occurrences"], ascending=[True, False],
+                                    kind="mergesort").reset_index(drop=True)
+    return SignificanceResult(vertices, solution_set, len(runs), n_cached)
@@ -0,0 +1,102 @@
+import itertools
+import sys
+import typing
+from timeit import default_timer as timer
+
+import numpy as np
+
+from ..pcst import SteinerTree
+from ..ppi import read_terminals
+from ..steinerdiv import ExpMinMaxDiverseSteinerTreeComputer, SolutionSet
+from .shared_network import get_shared_network, imap_shared, load_shared_network
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+class SweepResult:
+    """
+    The result of a parameter sweep as two tidy tables:
+    * summary: One row per grid point (initial_fraction, reduction_factor, n,
+        threshold) with the number of trees actually computed, the size of the module,
+        the number of seeds in it, and the time of the diversification chain.
+    * vertices: One row per grid point and vertex of its module with #occurrences,
+        %occurrences and terminal as in SolutionSet.get_occurrences.
+    """
+
+    def __init__(self, summary: "pd.DataFrame", vertices: "pd.DataFrame"):
+        self.summary = summary
+        self.vertices = vertices
+
+
+def _run_chain(job):
+    terminals, init, red, n = job
+    start = timer()
+    shared = get_shared_network()
+    ppi_instance = shared.ppi_instance(terminals)
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
+                                                 reduction_factor=red)
+    steiner_trees = engine(ppi_instance, n=n - 1, pcst_graph=shared.pcst_graph)
+    # Only the ids are sent back to the parent.
+    trees = [(tree.vertex_ids, tree.edge_ids) for tree in steiner_trees]
+    return init, red, trees, timer() - start
+
+
+def run_sweep(path_to_graph: str, path_to_seeds: str,
+              initial_fractions: typing.Sequence[float],
+              reduction_factors: typing.Sequence[float],
+              ns: typing.Sequence[int], thresholds: typing.Sequence[float],
+              processes=None, progress=True) -> SweepResult:
+    """
+    Runs ROBUST for every combination of the parameters. Only one diversification chain
+    with max(ns) trees is computed per (initial_fraction, reduction_factor) pair, in
+    parallel over a shared network: a run with fewer trees yields exactly the first
+    trees of a longer run, and the threshold is only applied to the occurrences.
+    """
+    import pandas as pd  # Only loaded for the result tables.
+    shared = load_shared_network(path_to_graph)
+    terminals = shared.ppi_instance(read_terminals(path_to_seeds)).terminals
+    if not terminals:
+        raise ValueError("None of the seeds is part of the network.")
+    ns = sorted(set(ns))
+    thresholds = sorted(set(thresholds))
+    jobs = [(terminals, init, red, ns[-1]) for init, red in
+            itertools.product(initial_fractions, reduction_factors)]
+    summary_rows = []
+    vertex_rows = []
+    for i, (init, red, trees, seconds) in enumerate(
+            imap_shared(path_to_graph, _run_chain, jobs, processes)):
+        if progress:
+            print(f"[{i + 1}/{len(jobs)}] initial fraction {init}, reduction factor "
+                  f"{red}: {len(trees)} trees in {seconds:.1f}s", file=sys.stderr)
+        solution_set = SolutionSet(shared.ppi_instance(terminals), shared.pcst_graph)
+        for vertex_ids, edge_ids in trees:
+            solution_set.append(SteinerTree(shared.pcst_graph, vertex_ids, edge_ids))
+        terminal_mask = np.zeros(len(shared.pcst_graph.prizes), dtype=bool)
+        terminal_mask[shared.pcst_graph.vertex_ids.get_ids(terminals)] = True
+        for n in ns:
+            counts = solution_set.occurrence_counts(first_n=n)
+            n_trees = min(n, len(solution_set))
+            for threshold in thresholds:
+                ids = np.flatnonzero((counts > 0) & (counts / n_trees >= threshold))
+                point = {"initial_fraction": init, "reduction_factor": red, "n": n,
+                         "threshold": threshold}
+                summary_rows.append(dict(point, trees=n_trees, module_size=len(ids),
+                                         seeds_in_module=int(terminal_mask[ids].sum()),
+                                         chain_seconds=seconds))
+                for v in ids.tolist():
+                    vertex_rows.append(dict(
+                        point, vertex=shared.pcst_graph.vertex_ids.get_label(v),
+                        **{"#occurrences": int(counts[v]),
+                           "%occurrences": counts[v] / n_trees,
+                           "terminal": bool(terminal_mask[v])}))
+    keys = ["initial_fraction", "reduction_factor", "n", "threshold"]
+    summary = pd.DataFrame(summary_rows, columns=keys + [
+        "trees", "module_size", "seeds_in_module", "chain_seconds"])
+    vertices = pd.DataFrame(vertex_rows, columns=keys + [
+        "vertex", "#occurrences", "%occurrences", "terminal"])
+    summary = summary.sort_values(keys, kind="mergesort").reset_index(drop=True)
+    vertices = vertices.sort_values(keys + ["#occurrences"],
+                                    ascending=[True] * 4 + [False],
+                                    kind="mergesort").reset_index(drop=True)
+    return SweepResult(summary, vertices)
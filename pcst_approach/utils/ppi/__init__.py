@@ -1,5 +1,9 @@
+from .input_error import InputError
 from .ppi_instance import PpiInstance
+from .compiled_network import CompiledNetwork, load_network, compile_network
 from .edge_weights import UnitEdgeWeight, CoVexEdgeWeight
 from .read_ppi import read_ppi
 from .read_ppi_shuffled import read_ppi_shuffled
-from .read_terminals import read_terminals
\ No newline at end of file
+from .read_terminals import read_terminals
+from .diameter import estimate_diameter, bfs_distances
+from .edge_list import read_edge_list, permute_edges, first_appearance_order, open_text
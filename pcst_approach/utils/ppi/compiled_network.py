@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import typing
+
+import networkx as nx
+import numpy as np
+
+from .diameter import estimate_diameter
+from .edge_list import read_edge_list
+from .read_ppi import graph_from_edges
+
+# Increase whenever the layout of the compiled files changes.
+FORMAT_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    """
+    The directory for compiled networks and other caches. Can be changed with the
+    environment variable ROBUST_CACHE_DIR.
+    """
+    return os.environ.get("ROBUST_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "robust"))
+
+
+def file_hash(file_path: str) -> str:
+    """
+    Returns the sha256 hex digest of the content of the file.
+    """
+    h = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CompiledNetwork:
+    """
+    An array representation of a PPI-network that can be saved to and memory-mapped
+    from disk. Vertices are identified by their position in the label table.
+    * labels: The interned vertex labels (numpy unicode array), in order of their
+        first appearance in the source file.
+    * edges: int32 array [[u, v], ...] with u <= v, without duplicates, sorted.
+    * indptr, indices: The adjacency in CSR format, i.e., the neighbors of v are
+        indices[indptr[v]:indptr[v+1]].
+    * degrees: The degree of every vertex (as in networkx, self-loops count twice).
+    * meta: A dict with the content hash of the source file and other properties, e.g.,
+        the diameter bounds once they were computed (see diameter_bounds).
+    Loaded from disk, all arrays are read-only memory-maps, so processes working on
+    the same network share the pages.
+    """
+
+    _arrays = ("labels", "edges", "indptr", "indices", "degrees")
+
+    def __init__(self, labels: np.ndarray, edges: np.ndarray, indptr: np.ndarray,
+                 indices: np.ndarray, degrees: np.ndarray, meta: typing.Dict):
+        self.labels = labels
+        self.edges = edges
+        self.indptr = indptr
+        self.indices = indices
+        self.degrees = degrees
+        self.meta = meta
+        # The directory the network was loaded from, for caching derived properties.
+        self.directory = None
+        self._label_to_id = None
+
+    @classmethod
+    def from_edges(cls, labels: typing.List[str], edges: np.ndarray, meta=None):
+        """
+        Builds the network from a list of labels and an array with pairs of label
+        positions. Duplicated edges (also in reverse direction) are removed.
+        """
+        n = len(labels)
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+        degrees = np.bincount(edges.ravel(), minlength=n)
+        loops = edges[:, 0] == edges[:, 1]
+        # A self-loop is a single neighbor in the adjacency.
+        heads = np.concatenate([edges[:, 0], edges[~loops, 1]])
+        tails = np.concatenate([edges[:, 1], edges[~loops, 0]])
+        order = np.lexsort((tails, heads))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=n), out=indptr[1:])
+        meta = dict(meta or {})
+        meta.update({"format": FORMAT_VERSION, "num_vertices": n,
+                     "num_edges": len(edges)})
+        return cls(np.array(labels, dtype=np.str_), edges.astype(np.int32), indptr,
+                   tails[order].astype(np.int32), degrees.astype(np.int32), meta)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph, meta=None):
+        labels = list(graph.nodes)
+        label_to_id = {v: i for i, v in enumerate(labels)}
+        edges = np.array([(label_to_id[v], label_to_id[w]) for v, w in graph.edges],
+                         dtype=np.int64)
+        return cls.from_edges([str(v) for v in labels], edges, meta)
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.labels)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    @property
+    def content_hash(self) -> typing.Optional[str]:
+        return self.meta.get("sha256")
+
+    def label_to_id(self) -> typing.Dict[str, int]:
+        """
+        A dict from label to vertex id. Built on first use.
+        """
+        if self._label_to_id is None:
+            self._label_to_id = {v: i for i, v in enumerate(self.labels.tolist())}
+        return self._label_to_id
+
+    def diameter_bounds(self) -> typing.Tuple[int, int]:
+        """
+        Lower and upper bound of the diameter (see estimate_diameter), usually exact.
+        Computed on first use and saved with the network if it was loaded from disk.
+        """
+        if "diameter" not in self.meta:
+            lower, upper = estimate_diameter(self.indptr, self.indices)
+            self.meta["diameter"] = {"lower": lower, "upper": upper}
+            if self.directory is not None:
+                self._save_meta()
+        return self.meta["diameter"]["lower"], self.meta["diameter"]["upper"]
+
+    def _save_meta(self):
+        """
+        Replaces meta.json atomically. A read-only cache is not an error.
+        """
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".meta-")
+            with os.fdopen(fd, "w") as file:
+                json.dump(self.meta, file, indent=2)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, os.path.join(self.directory, "meta.json"))
+        except OSError:
+            pass
+
+    def __contains__(self, label):
+        return label in self.label_to_id()
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Returns the graph as networkx graph as read_ppi does.
+        """
+        return graph_from_edges(self.labels.tolist(), self.edges)
+
+    def save(self, directory: str):
+        """
+        Writes the network to the directory. The directory is created atomically, i.e.,
+        concurrent readers either see the complete network or no directory.
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            for name in self._arrays:
+                np.save(os.path.join(tmp, name + ".npy"), getattr(self, name))
+            with open(os.path.join(tmp, "meta.json"), "w") as file:
+                json.dump(self.meta, file, indent=2)
+            os.chmod(tmp, 0o755)
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise  # Otherwise, another process was faster.
+
+    @classmethod
+    def load(cls, directory: str, mmap=True):
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode=mode)
+                  for name in cls._arrays}
+        with open(os.path.join(directory, "meta.json")) as file:
+            meta = json.load(file)
+        network = cls(meta=meta, **arrays)
+        network.directory = directory
+        return network
+
+
+def compile_network(file_path: str, meta=None) -> CompiledNetwork:
+    """
+    Parses the PPI edge list (same format as read_ppi) into a CompiledNetwork.
+    """
+    labels, edges = read_edge_list(file_path)
+    return CompiledNetwork.from_edges(labels, edges, meta)
+
+
+def load_network(file_path: str, cache_dir: typing.Optional[str] = None,
+                 use_cache=True) -> CompiledNetwork:
+    """
+    Returns the compiled network of the PPI edge list. The compiled network is cached
+    in cache_dir (default_cache_dir() if None) under the content hash of the file:
+    the first call parses the file and writes the cache, later calls memory-map it.
+    """
+    digest = file_hash(file_path)
+    meta = {"sha256": digest, "source": os.path.abspath(file_path)}
+    if not use_cache:
+        return compile_network(file_path, meta)
+    directory = os.path.join(cache_dir or default_cache_dir(), "networks",
+                             f"{digest}-v{FORMAT_VERSION}")
+    if not os.path.isdir(directory):
+        compile_network(file_path, meta).save(directory)
+    return CompiledNetwork.load(directory)
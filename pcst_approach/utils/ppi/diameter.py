@@ -0,0 +1,95 @@
+import typing
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+
+def _adjacency(indptr: np.ndarray, indices: np.ndarray) -> sp.csr_matrix:
+    n = len(indptr) - 1
+    return sp.csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr),
+                         shape=(n, n))
+
+
+def bfs_distances(adjacency: sp.csr_matrix, source: int) -> np.ndarray:
+    """
+    The hop distances from source to every vertex (-1 if not reachable).
+    """
+    order, predecessors = breadth_first_order(adjacency, source, directed=True,
+                                              return_predecessors=True)
+    distances = np.full(adjacency.shape[0], -1, dtype=np.int64)
+    distances[order] = 0
+    # The distance is the number of predecessor steps back to the source.
+    vertices, current = order, predecessors[order]
+    while True:
+        reached = current >= 0
+        if not np.any(reached):
+            return distances
+        vertices, current = vertices[reached], current[reached]
+        distances[vertices] += 1
+        current = predecessors[current]
+
+
+def _component_diameter(adjacency: sp.csr_matrix, start: int, lower: int,
+                        max_bfs: int) -> typing.Tuple[int, int, int]:
+    """
+    iFUB (Crescenzi et al., 2013) on the component of start, starting with a 4-sweep
+    to find a central vertex. Returns lower and upper bound and the number of BFS.
+    """
+    # Double sweep twice: from the farthest vertex and from the middle of the path.
+    n_bfs = 0
+    u = start
+    for _ in range(2):
+        a = int(np.argmax(bfs_distances(adjacency, u)))
+        from_a = bfs_distances(adjacency, a)
+        b = int(np.argmax(from_a))
+        from_b = bfs_distances(adjacency, b)
+        n_bfs += 3
+        lower = max(lower, int(from_a[b]))
+        # A vertex on a shortest a-b path with distance ecc/2 from a.
+        middle = np.flatnonzero((from_a == from_a[b] // 2) &
+                                (from_a + from_b == from_a[b]))
+        u = int(middle[0])
+    from_u = bfs_distances(adjacency, u)
+    n_bfs += 1
+    i = int(from_u.max())
+    lower = max(lower, i)
+    upper = 2 * i
+    # Every vertex in a level < i has eccentricity <= 2 * (i - 1) unless one of the
+    # vertices of level i is farther away.
+    while upper > lower and i > 0:
+        fringe = np.flatnonzero(from_u == i)
+        if n_bfs + len(fringe) > max_bfs:
+            break
+        for v in fringe.tolist():
+            lower = max(lower, int(bfs_distances(adjacency, v).max()))
+        n_bfs += len(fringe)
+        if lower > 2 * (i - 1):
+            upper = lower
+            break
+        upper = 2 * (i - 1)
+        i -= 1
+    return lower, max(lower, upper), n_bfs
+
+
+def estimate_diameter(indptr: np.ndarray, indices: np.ndarray,
+                      max_bfs=500) -> typing.Tuple[int, int]:
+    """
+    Lower and upper bound of the diameter (the largest one of all connected components)
+    of the graph in CSR format, e.g., of a CompiledNetwork. Uses iFUB, which often needs
+    only a few BFS for the exact value on small-world graphs such as PPIs, and stops
+    with the current bounds after max_bfs BFS per component (about 3ms each for the
+    brain PPI).
+    """
+    adjacency = _adjacency(indptr, indices)
+    n_components, component = connected_components(adjacency, directed=False)
+    sizes = np.bincount(component, minlength=n_components)
+    lower = upper = 0
+    for c in np.argsort(-sizes, kind="stable").tolist():
+        if sizes[c] - 1 <= lower:
+            break  # This and all smaller components cannot have a larger diameter.
+        start = int(np.argmax(component == c))
+        c_lower, c_upper, _ = _component_diameter(adjacency, start, lower, max_bfs)
+        lower = max(lower, c_lower)
+        upper = max(upper, c_upper)
+    return lower, max(lower, upper)
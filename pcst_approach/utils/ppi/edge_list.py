@@ -0,0 +1,91 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import typing
+
+import numpy as np
+
+from .input_error import InputError
+
+_MAGIC = [(b"\x1f\x8b", gzip.open), (b"BZh", bz2.open), (b"\xfd7zXZ\x00", lzma.open)]
+
+
+def open_text(file_path: str) -> typing.TextIO:
+    """
+    Opens the file for reading text. gzip, bzip2 and xz compressed files are recognized
+    by their content and decompressed while reading.
+    """
+    with open(file_path, "rb") as file:
+        head = file.read(6)
+    for magic, opener in _MAGIC:
+        if head.startswith(magic):
+            return io.TextIOWrapper(opener(file_path, "rb"), encoding="utf-8")
+    return open(file_path, "r", encoding="utf-8")
+
+
+def read_edge_list(file_path: str, chunk_size=1 << 20) \
+        -> typing.Tuple[typing.List[str], np.ndarray]:
+    """
+    Parses a tab-separated edge list with header (the first two columns are used) into
+    the vertex labels, in order of their first appearance, and an int64 array with a
+    row of label positions per line. The file is parsed in chunks of chunk_size lines
+    by the C parser of pandas, and the labels are interned once at the end by
+    factorizing the distinct labels of all chunks, so time and memory are linear in the
+    number of edges. Compressed files are supported (see open_text). Raises an
+    InputError if the file is not a tab-separated table with at least two columns.
+    """
+    import pandas as pd  # Only loaded if a network has to be parsed (not if compiled).
+    chunk_codes = []
+    chunk_uniques = []
+    try:
+        with open_text(file_path) as file:
+            reader = pd.read_csv(file, sep="\t", header=None, skiprows=1, usecols=[0, 1],
+                                 dtype=str, na_filter=False, quoting=csv.QUOTE_NONE,
+                                 chunksize=chunk_size)
+            for chunk in reader:
+                # Interleaved, so the first appearance order is the one of the lines.
+                codes, uniques = pd.factorize(chunk.to_numpy().ravel())
+                chunk_codes.append(codes)
+                chunk_uniques.append(uniques)
+    except (ValueError, pd.errors.ParserError) as e:
+        # Also UnicodeDecodeError and EmptyDataError, both ValueErrors.
+        raise InputError(f"Cannot parse the edge list {file_path}: {e}") from e
+    if not chunk_codes:
+        return [], np.zeros((0, 2), dtype=np.int64)
+    # The uniques of all chunks, in order, contain every label first where it first
+    # appears, so factorizing them once gives the global ids.
+    uniques = pd.Series(np.concatenate(chunk_uniques)).str.strip()
+    global_codes, labels = pd.factorize(uniques)
+    offsets = np.cumsum([0] + [len(u) for u in chunk_uniques])
+    edges = np.concatenate([global_codes[offset + codes] for offset, codes in
+                            zip(offsets.tolist(), chunk_codes)]).astype(np.int64)
+    return labels.tolist(), edges.reshape(-1, 2)
+
+
+def first_appearance_order(n_vertices: int, edges: np.ndarray) -> np.ndarray:
+    """
+    The vertex ids in order of their first appearance in the edge list [[u, v], ...].
+    Vertices without edges are appended in the order of their ids.
+    """
+    flat = np.asarray(edges, dtype=np.int64).ravel()
+    first = np.full(n_vertices, len(flat), dtype=np.int64)
+    np.minimum.at(first, flat, np.arange(len(flat)))
+    return np.argsort(first, kind="stable")
+
+
+def permute_edges(labels: typing.List[str], edges: np.ndarray, seed=None) \
+        -> typing.Tuple[typing.List[str], np.ndarray]:
+    """
+    Returns the edge list in a random order (seeded by seed), with the labels renumbered
+    in order of their first appearance in the permuted list, i.e., as if the lines of
+    the file had been shuffled.
+    """
+    edges = edges[np.random.default_rng(seed).permutation(len(edges))]
+    order = first_appearance_order(len(labels), edges)
+    # Labels without edges cannot be in an edge list.
+    order = order[np.bincount(edges.ravel(), minlength=len(labels))[order] > 0]
+    new_id = np.empty(len(labels), dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+    return [labels[i] for i in order.tolist()], new_id[edges]
@@ -1,4 +1,7 @@
+import typing
+
 import networkx as nx
+import numpy as np
 
 class CoVexEdgeWeight:
     """
@@ -19,6 +22,15 @@ class CoVexEdgeWeight:
         return (1 - self.lambda_) * self.avg_degree + self.lambda_ * 0.5 * (
                 self.graph.degree()[e[0]] + self.graph.degree()[e[1]])
 
+    def costs(self, edges: np.ndarray, labels: typing.Sequence) -> np.ndarray:
+        """
+        Returns the weights of all edges [[u, v], ...] given as positions in labels.
+        """
+        degree = self.graph.degree()
+        degrees = np.array([degree[v] for v in labels], dtype=np.float64)
+        return (1 - self.lambda_) * self.avg_degree + self.lambda_ * 0.5 * (
+                degrees[edges[:, 0]] + degrees[edges[:, 1]])
+
 
 class UnitEdgeWeight:
     """
@@ -27,3 +39,9 @@ class UnitEdgeWeight:
     """
     def __getitem__(self, e):
         return 1.0
+
+    def costs(self, edges: np.ndarray, labels: typing.Sequence) -> np.ndarray:
+        """
+        Returns the weights of all edges [[u, v], ...] given as positions in labels.
+        """
+        return np.ones(len(edges), dtype=np.float64)
@@ -0,0 +1,6 @@
+class InputError(ValueError):
+    """
+    An input (the network, the seeds or a checkpoint) cannot be used, e.g., the edge
+    list cannot be parsed or none of the seeds is part of the network. A ValueError, so
+    code catching those still works.
+    """
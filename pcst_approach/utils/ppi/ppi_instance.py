@@ -1,7 +1,31 @@
+import typing
+import weakref
+
 import networkx as nx
 
+from .compiled_network import CompiledNetwork
 from .edge_weights import UnitEdgeWeight
 
+# The estimated diameters of networkx graphs with their number of vertices and edges (to
+# notice changes of the graph), so they are estimated once per graph.
+_diameters = weakref.WeakKeyDictionary()
+
+
+def _estimated_diameter(ppi_graph: typing.Optional[nx.Graph],
+                        network: typing.Optional[CompiledNetwork]) -> int:
+    """
+    The upper bound of the diameter, which is safe for the terminal prizes and usually
+    exact (see CompiledNetwork.diameter_bounds).
+    """
+    if network is not None:
+        return network.diameter_bounds()[1]
+    size = (ppi_graph.number_of_nodes(), ppi_graph.number_of_edges())
+    cached = _diameters.get(ppi_graph)
+    if cached is None or cached[0] != size:
+        cached = (size, CompiledNetwork.from_networkx(ppi_graph).diameter_bounds()[1])
+        _diameters[ppi_graph] = cached
+    return cached[1]
+
 
 class PpiInstance:
     """
@@ -11,31 +35,56 @@ class PpiInstance:
     One could actually encode it directly the the networkx-graph but the PPI graph is
     rather big. We don't want you to reload it for every new set of terminals, etc.
     All the values should be constant.
+    The graph can also be given as CompiledNetwork (see from_network). In this case, the
+    networkx-graph is only built if ppi_graph is accessed.
+    If no meta is given, the graph_diameter is estimated (see
+    CompiledNetwork.diameter_bounds; cached with the compiled network, or once per
+    networkx-graph).
     """
 
-    def __init__(self, ppi_graph: nx.Graph, terminals: list,
-                 edge_weights=UnitEdgeWeight(), meta=None):
-        self.ppi_graph = ppi_graph
+    def __init__(self, ppi_graph: typing.Optional[nx.Graph], terminals: list,
+                 edge_weights=UnitEdgeWeight(), meta=None,
+                 network: typing.Optional[CompiledNetwork] = None):
+        if ppi_graph is None and network is None:
+            raise ValueError("Either ppi_graph or network has to be given.")
+        self._ppi_graph = ppi_graph
+        self.network = network
         self.terminals = terminals
         self.edge_weights = edge_weights
         if not meta:
-            self.meta = {"graph_diameter": 8}  # Precomputed.
-            print("Setting the graph_diameter to the precomputed value of 8. "
-                  "Directly specify meta to overwrite this.")
+            self.meta = {"graph_diameter": _estimated_diameter(ppi_graph, network)}
         else:
             self.meta = meta
 
+    @classmethod
+    def from_network(cls, network: CompiledNetwork, terminals: list,
+                     edge_weights=UnitEdgeWeight(), meta=None):
+        """
+        Creates the instance directly from a compiled network without building the
+        networkx-graph.
+        """
+        return cls(None, terminals, edge_weights, meta, network=network)
+
+    @property
+    def ppi_graph(self) -> nx.Graph:
+        if self._ppi_graph is None:
+            self._ppi_graph = self.network.to_networkx()
+        return self._ppi_graph
+
     def compute_cost(self, subgraph: nx.Graph):
         return sum(self.edge_weights[e] for e in subgraph.edges)
 
-    def is_feasible_solution(self, steiner_tree: nx.Graph, percentage_terminals_req_in_solution: int):
+    def is_feasible_solution(self, steiner_tree, percentage_terminals_req_in_solution=1.0):
         """
-        Checks if the solution covers all terminals and is connected.
+        Checks if the solution (networkx graph or SteinerTree) covers at least the given
+        fraction of the terminals and is connected. For a SteinerTree, this only needs
+        set lookups and a union-find over its edges, so it is cheap enough as post-check
+        of every solution (e.g., after repair_tree).
         """
-        #for v in self.terminals:
-        #    if v not in steiner_tree.nodes:
-        #        return False
-        intersection_length = len(set(self.terminals).intersection(set(steiner_tree.nodes)))
-        if intersection_length / len(self.terminals) < percentage_terminals_req_in_solution:
-            return False
+        if self.terminals:
+            covered = sum(1 for v in self.terminals if v in steiner_tree)
+            if covered / len(self.terminals) < percentage_terminals_req_in_solution:
+                return False
+        if hasattr(steiner_tree, "is_connected"):
+            return steiner_tree.is_connected()
         return nx.is_connected(steiner_tree)
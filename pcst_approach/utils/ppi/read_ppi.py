@@ -1,22 +1,23 @@
 import networkx as nx
 
+from .edge_list import read_edge_list
+
+
+def graph_from_edges(labels, edges) -> nx.Graph:
+    """
+    Builds the networkx graph (vertices with label attribute) from labels and an array
+    of label positions.
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from((v, {"label": v}) for v in labels)
+    graph.add_edges_from((labels[u], labels[v]) for u, v in edges.tolist())
+    return graph
+
+
 def read_ppi(file_path: str):
     """
     Reads the PPI-graph from file without any attributes such as weight.
+    The file may be compressed (see read_edge_list).
     """
-    vertices = set()
-    edges = []
-    with open(file_path, "r") as file:
-        file.readline()
-        for line in file:
-            parsed_line = line.split('\t')
-            v = parsed_line[0].strip()
-            w = parsed_line[1].strip()
-            vertices.add(v)
-            vertices.add(w)
-            edges.append((v,w))
-    graph=nx.Graph()
-    for v in vertices:
-        graph.add_node(v, label=str(v))
-    graph.add_edges_from(edges)
-    return graph
\ No newline at end of file
+    labels, edges = read_edge_list(file_path)
+    return graph_from_edges(labels, edges)
@@ -1,6 +1,20 @@
+from .edge_list import open_text
+from .input_error import InputError
+
+
 def read_terminals(path: str):
+    """
+    Reads the seeds, one per line. If the file has more than one (tab-separated)
+    column, only the first one is used. Empty lines are skipped. Raises an InputError
+    if the file is not text.
+    """
     seeds = []
-    with open(path) as file:
-        for line in file:
-            seeds.append(line.strip())
-    return seeds
\ No newline at end of file
+    try:
+        with open_text(path) as file:
+            for line in file:
+                seed = line.split("\t", 1)[0].strip()
+                if seed:
+                    seeds.append(seed)
+    except UnicodeDecodeError as e:
+        raise InputError(f"Cannot read the seeds {path}: {e}") from e
+    return seeds
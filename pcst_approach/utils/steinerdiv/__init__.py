@@ -1,3 +1,17 @@
 from .solution_set import SolutionSet
-from .display_solution_set import display_solution_set
-from .min_max_exponential_reduction import ExpMinMaxDiverseSteinerTreeComputer
\ No newline at end of file
+from .min_max_exponential_reduction import ExpMinMaxDiverseSteinerTreeComputer
+from .write_solution_set import write_solution_set
+from .stopping import StoppingPolicy, TimeBudget, SolveBudget, StableModule, StableRanking, \
+    NearDuplicate
+from .tracing import Tracer
+from .result_cache import ResultCache
+from .checkpoint import Checkpoint
+
+
+def __getattr__(name):
+    # display_solution_set imports matplotlib, which is slow and only needed for plotting.
+    if name == "display_solution_set":
+        from .display_solution_set import display_solution_set
+        globals()[name] = display_solution_set
+        return display_solution_set
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
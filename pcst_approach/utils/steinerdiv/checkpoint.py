@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+import typing
+
+import numpy as np
+
+from ..pcst import PcstInstance, SteinerTree
+from ..ppi import InputError, PpiInstance
+from .result_cache import computation_description, graph_hash
+
+# Increase whenever the layout of the files changes.
+FORMAT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    Saves the state of a diversification chain in a directory, so that a run that was
+    killed can be continued and a finished run can be extended by more trees without
+    recomputing the earlier ones. The continued chain gives exactly the trees of an
+    uninterrupted run. Two files are written:
+    * trees.bin: An append-only log of the trees in the ids of the solved pcst-graph,
+        as int32 records [#vertices, #edges, vertex ids..., edge ids...].
+    * state.npz: The prizes of the solved pcst-graph, how many trees of the log are
+        valid and how many of them are included in the prizes, and the hash of the
+        computation (network, seeds, parameters, version). Replaced atomically.
+    The state is written every `every` trees and when the chain ends (also by an
+    exception such as KeyboardInterrupt), so at most `every` trees are lost if the
+    process is killed.
+    Pass the checkpoint to ExpMinMaxDiverseSteinerTreeComputer: the trees of the
+    checkpoint are returned first, then the chain continues.
+    """
+
+    def __init__(self, directory: str, every=10):
+        self.directory = directory
+        self.every = every
+        os.makedirs(directory, exist_ok=True)
+        self._key = None
+        self._data = None
+        self._pending = []
+        self._n_trees = 0
+        self._n_reduced = 0
+        self._log_bytes = 0
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self.directory, "trees.bin")
+
+    @property
+    def _state_path(self) -> str:
+        return os.path.join(self.directory, "state.npz")
+
+    @staticmethod
+    def _computation_key(engine, ppi_instance: PpiInstance,
+                         pcst_graph: PcstInstance) -> str:
+        description = computation_description(engine, ppi_instance, graph_hash(pcst_graph))
+        description["format"] = FORMAT_VERSION
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def restore(self, engine, data: typing.Dict) -> typing.List[SteinerTree]:
+        """
+        Called by the engine after the setup. Sets the prizes of data["pcst_graph"] to
+        the saved ones and returns the saved trees (in the ids of data["pcst_graph"]);
+        starts a new log if there is no state. The engine has to reduce the prizes for
+        the trees after the first n_reduced(). Raises an InputError (a ValueError) if
+        the state belongs to another computation.
+        """
+        self._key = self._computation_key(engine, data["ppi_instance"],
+                                          data["pcst_graph"])
+        self._data = data
+        self._pending = []
+        if not os.path.exists(self._state_path):
+            with open(self._log_path, "wb"):
+                pass
+            self._n_trees = self._n_reduced = self._log_bytes = 0
+            return []
+        with np.load(self._state_path) as state:
+            if str(state["key"]) != self._key:
+                raise InputError(f"The checkpoint in {self.directory} was written for "
+                                 f"another network, other seeds or other parameters.")
+            prizes = state["prizes"]
+            self._n_trees = int(state["n_trees"])
+            self._n_reduced = int(state["n_reduced"])
+            self._log_bytes = int(state["log_bytes"])
+        if len(prizes) != len(data["pcst_graph"].prizes):
+            raise InputError(f"The checkpoint in {self.directory} does not fit the graph.")
+        data["pcst_graph"].prizes[:] = prizes
+        # Trees appended after the last state (the process was killed in between) are
+        # not part of it.
+        with open(self._log_path, "r+b") as file:
+            file.truncate(self._log_bytes)
+        records = np.fromfile(self._log_path, dtype=np.int32)
+        trees = []
+        position = 0
+        graph = data["pcst_graph"]
+        while position < len(records):
+            n_vertices, n_edges = records[position:position + 2].tolist()
+            position += 2
+            vertex_ids = records[position:position + n_vertices]
+            edge_ids = records[position + n_vertices:position + n_vertices + n_edges]
+            position += n_vertices + n_edges
+            trees.append(SteinerTree(graph, vertex_ids, edge_ids))
+        if len(trees) != self._n_trees:
+            raise InputError(f"The tree log in {self.directory} is corrupted.")
+        return trees
+
+    def n_reduced(self) -> int:
+        """
+        The number of saved trees whose prize reductions are included in the prizes.
+        """
+        return self._n_reduced
+
+    def reduced(self, n_reduced: int):
+        """
+        Called by the engine when the prizes include the reductions of the first
+        n_reduced trees.
+        """
+        self._n_reduced = n_reduced
+
+    def append(self, tree: SteinerTree):
+        """
+        Called by the engine with every new tree (in the ids of the solved pcst-graph)
+        before its prizes are reduced. Writes the state every `every` trees.
+        """
+        self._pending.append(tree)
+        if len(self._pending) >= self.every:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the pending trees to the log and writes the state.
+        """
+        if self._data is None:
+            return
+        if self._pending:
+            records = []
+            for tree in self._pending:
+                records.append(np.array([len(tree.vertex_ids), len(tree.edge_ids)],
+                                        dtype=np.int32))
+                records.append(tree.vertex_ids.astype(np.int32))
+                records.append(tree.edge_ids.astype(np.int32))
+            with open(self._log_path, "ab") as file:
+                file.write(np.concatenate(records).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            self._n_trees += len(self._pending)
+            self._pending = []
+            self._log_bytes = os.path.getsize(self._log_path)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".state-", suffix=".npz")
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, key=np.array(self._key), prizes=self._data["pcst_graph"].prizes,
+                     n_trees=self._n_trees, n_reduced=self._n_reduced,
+                     log_bytes=self._log_bytes)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self._state_path)
+
+    def n_trees(self) -> int:
+        """
+        The number of saved trees (including the pending ones).
+        """
+        return self._n_trees + len(self._pending)
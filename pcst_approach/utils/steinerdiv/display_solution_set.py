@@ -50,6 +50,8 @@ def display_solution_set(solution_set: SolutionSet):
     print("Maximum cost of solution:", solution_set.max_cost())
     color_selector = __VertexColor(solution_set)
     for s in solution_set:
+        if hasattr(s, "to_networkx"):
+            s = s.to_networkx()
         plt.figure(figsize=(20, 20))
         pos = nx.kamada_kawai_layout(s)
         nx.draw_networkx_labels(s, pos)
@@ -1,8 +1,16 @@
+import typing
+from timeit import default_timer as timer
+
 import numpy as np
-import networkx as nx
 
+from .checkpoint import Checkpoint
 from .solution_set import SolutionSet
-from ..pcst import PcstInstance, solve_pcst
+from .stopping import StoppingPolicy
+from .result_cache import ResultCache
+from .tracing import Tracer
+from ..pcst import PcstInstance, SteinerTree, PcstSolver, PcstFastSolver
+from ..pcst.reduce_pcst import is_reduction_safe, reduce_pcst_instance
+from ..pcst.repair_tree import repair_tree
 from ..ppi import PpiInstance
 
 
@@ -20,7 +28,8 @@ class ExpMinMaxDiverseSteinerTreeComputer:
     """
 
     def __init__(self, initial_fraction=0.1, reduction_factor=0.3,
-                 initial_terminal_multiple=2):
+                 initial_terminal_multiple=2, check_trees=False, reduce_graph=False,
+                 repair_trees=False, solver: typing.Optional[PcstSolver] = None):
         """
         initial_fraction: The prize for non-terminals will be
                     initial_fraction*min_edge_costs. A lower value will result in cheaper
@@ -33,54 +42,219 @@ class ExpMinMaxDiverseSteinerTreeComputer:
                     are used the least more attractive.
         initial_terminal_multiple: The prize for the terminals will be this times the
                     diameter of the graph times the maximal edge cost. If it is too low
-                    to force all terminals to be integrated, it will be doubled up to
-                    10 times (2^10) automatically.
+                    to force all terminals to be integrated, use repair_trees.
+        check_trees: Verify that every solution of the PCST solver is a tree. Cheap, but
+                    not necessary in production.
+        reduce_graph: Solve on the graph without the parts that cannot be part of a
+                    solution (see reduce_pcst_instance). Only done if this cannot
+                    change the cost of the solutions, i.e., for initial_fraction < 0.5.
+                    pcst_fast breaks ties by id, so trees of equal cost may differ
+                    from the ones on the full graph.
+        repair_trees: Attach the terminals that pcst_fast left out to every tree by
+                    shortest paths (see repair_tree). Terminals in other connected
+                    components than the tree cannot be attached.
+        solver: The PcstSolver that computes the trees, by default PcstFastSolver. The
+                    ShortestPathSteinerSolver is much faster for large terminal sets.
         """
         self.initial_fraction = initial_fraction
         self.reduction_factor = reduction_factor
         self.initial_terminal_multiple = initial_terminal_multiple
+        self.check_trees = check_trees
+        self.reduce_graph = reduce_graph
+        self.repair_trees = repair_trees
+        self.solver = PcstFastSolver() if solver is None else solver
 
-    def iterate_solutions(self, ppi_instance: PpiInstance):
+    def iterate_solutions(self, ppi_instance: PpiInstance,
+                          pcst_graph: typing.Optional[PcstInstance] = None,
+                          tracer: typing.Optional[Tracer] = None,
+                          checkpoint: typing.Optional[Checkpoint] = None):
+        """
+        Returns an infinite amount of steiner trees as a generator. The trees refer to
+        the full (root) PcstInstance, even if a reduced graph is solved.
+        pcst_graph: An already built PcstInstance for the graph of ppi_instance. Building
+                    it is the expensive part of the setup, so pass it if you run many
+                    terminal sets on the same graph. Its prizes will be overwritten.
+        tracer: Optional Tracer that times the setup, the solves and the prize updates.
+        checkpoint: Optional Checkpoint. Its trees are returned first (without solving),
+                    then the chain continues from its prizes. New trees are saved in it.
         """
-        Returns an infinite amount of steiner trees as a generator.
+        if tracer is not None:
+            yield from self._iterate_traced(ppi_instance, pcst_graph, tracer, checkpoint)
+            return
+        data = self._setup(ppi_instance, pcst_graph)
+        if checkpoint is None:
+            while True:
+                steiner_tree = self._compute_steiner_tree(data)
+                yield steiner_tree.to_root()
+                self._reduce_prizes_of_used_steiner_vertices(data, steiner_tree)
+        try:
+            n_trees = 0
+            for steiner_tree in self._restore(data, checkpoint):
+                n_trees += 1
+                yield steiner_tree.to_root()
+            while True:
+                steiner_tree = self._compute_steiner_tree(data)
+                checkpoint.append(steiner_tree)
+                yield steiner_tree.to_root()
+                self._reduce_prizes_of_used_steiner_vertices(data, steiner_tree)
+                n_trees += 1
+                checkpoint.reduced(n_trees)
+        finally:
+            checkpoint.flush()
+
+    def _restore(self, data, checkpoint: Checkpoint) -> typing.List[SteinerTree]:
         """
+        Restores the prizes and returns the trees of the checkpoint.
+        """
+        trees = checkpoint.restore(self, data)
+        for steiner_tree in trees[checkpoint.n_reduced():]:
+            self._reduce_prizes_of_used_steiner_vertices(data, steiner_tree)
+        checkpoint.reduced(len(trees))
+        return trees
+
+    def _iterate_traced(self, ppi_instance: PpiInstance,
+                        pcst_graph: typing.Optional[PcstInstance], tracer: Tracer,
+                        checkpoint: typing.Optional[Checkpoint]):
+        """
+        iterate_solutions with timing, kept apart so the untraced loop has no overhead.
+        """
+        with tracer.stage("setup"):
+            data = self._setup(ppi_instance, pcst_graph)
+            restored = [] if checkpoint is None else self._restore(data, checkpoint)
+        try:
+            n_trees = 0
+            for steiner_tree in restored:
+                n_trees += 1
+                tracer.begin_iteration(0.0, 0.0)
+                yield steiner_tree.to_root()
+            prize_update_seconds = 0.0
+            while True:
+                start = timer()
+                steiner_tree = self._compute_steiner_tree(data)
+                root_tree = steiner_tree.to_root()
+                solve_seconds = timer() - start
+                tracer.add_stage("solve", start, solve_seconds)
+                if checkpoint is not None:
+                    checkpoint.append(steiner_tree)
+                tracer.begin_iteration(solve_seconds, prize_update_seconds)
+                yield root_tree
+                start = timer()
+                self._reduce_prizes_of_used_steiner_vertices(data, steiner_tree)
+                prize_update_seconds = timer() - start
+                tracer.add_stage("prize_update", start, prize_update_seconds)
+                n_trees += 1
+                if checkpoint is not None:
+                    checkpoint.reduced(n_trees)
+        finally:
+            if checkpoint is not None:
+                checkpoint.flush()
+
+    def _setup(self, ppi_instance: PpiInstance,
+               pcst_graph: typing.Optional[PcstInstance]) -> typing.Dict:
+        """
+        Builds the data of the computation: the pcst-graph with the initial prizes.
+        """
+        if pcst_graph is None:
+            pcst_graph = PcstInstance(ppi_instance)
         data = {
             "ppi_instance": ppi_instance,
-            "pcst_graph": PcstInstance(ppi_instance)
+            "pcst_graph": pcst_graph
         }
         data["min_edge_cost"] = np.min(data["pcst_graph"].costs)
         data["max_edge_cost"] = np.max(data["pcst_graph"].costs)
         self._set_initial_prizes(data)
-        while True:
-            steiner_tree = self._compute_steiner_tree(data)
-            yield steiner_tree
-            self._reduce_prizes_of_used_steiner_vertices(data, steiner_tree)
+        if self.reduce_graph:
+            self._reduce_graph(data)
+        return data
 
-    def __call__(self, ppi_instance: PpiInstance, n=10):
+    def __call__(self, ppi_instance: PpiInstance, n=10,
+                 pcst_graph: typing.Optional[PcstInstance] = None,
+                 stop: typing.Union[StoppingPolicy, typing.List[StoppingPolicy],
+                                    None] = None,
+                 tracer: typing.Optional[Tracer] = None,
+                 cache: typing.Optional[ResultCache] = None,
+                 checkpoint: typing.Optional[Checkpoint] = None):
         """
         Returns a solution set with n steiner trees for the instance.
         Will stop automatically after the first repetition, thus, it may be less than
         n steiner trees.
+        pcst_graph: Optional prebuilt PcstInstance, see iterate_solutions.
+        stop: Stopping policies (see stopping.py) to stop before n trees, e.g., if the
+              module does not change anymore or a time budget is exceeded.
+        The reason for stopping ('n', 'repetition' or the name of the policy) and the
+        number of PCST solves are saved in stop_reason and n_solves of the solution set.
+        tracer: Optional Tracer that records the timings and one record per iteration.
+        cache: Optional ResultCache. The solution set is loaded from it if it was
+               computed before, otherwise computed and saved. Not used together with
+               stopping policies as these may depend on the running time.
+        checkpoint: Optional Checkpoint to continue a killed run or to extend a finished
+               one by calling it again with a larger n. The trees are identical to the
+               ones of an uninterrupted run (see iterate_solutions).
         """
+        if cache is not None and not stop:
+            if pcst_graph is None:
+                pcst_graph = PcstInstance(ppi_instance)
+            key = cache.key(self, ppi_instance, pcst_graph, n)
+            solution_set = cache.load(key, ppi_instance, pcst_graph)
+            if solution_set is None:
+                solution_set = self(ppi_instance, n, pcst_graph, tracer=tracer,
+                                    checkpoint=checkpoint)
+                cache.store(key, solution_set)
+            return solution_set
+        if stop is None:
+            stop = []
+        elif isinstance(stop, StoppingPolicy):
+            stop = [stop]
+        for policy in stop:
+            policy.start()
         solution_set = SolutionSet(ppi_instance)
-        for s in self.iterate_solutions(ppi_instance):
+        n_vertices = 0
+        for s in self.iterate_solutions(ppi_instance, pcst_graph=pcst_graph,
+                                        tracer=tracer, checkpoint=checkpoint):
+            solution_set.n_solves += 1
             if s in solution_set:
+                solution_set.stop_reason = "repetition"
+                if tracer is not None:
+                    tracer.end_iteration(tree_vertices=len(s.vertex_ids),
+                                         tree_edges=len(s.edge_ids), new_vertices=0,
+                                         repetition=True)
                 break
             solution_set.append(s)
+            if tracer is not None:
+                previous, n_vertices = n_vertices, solution_set.number_of_vertices()
+                tracer.end_iteration(tree_vertices=len(s.vertex_ids),
+                                     tree_edges=len(s.edge_ids),
+                                     new_vertices=n_vertices - previous, repetition=False)
             if len(solution_set) > n:
+                solution_set.stop_reason = "n"
+                break
+            # All policies have to see every tree.
+            fired = [p for p in stop if p.should_stop(solution_set, solution_set.n_solves)]
+            if fired:
+                solution_set.stop_reason = fired[0].name
                 break
         return solution_set
 
-    def _reduce_prizes_of_used_steiner_vertices(self, data, steiner_tree: nx.Graph):
+    def _reduce_prizes_of_used_steiner_vertices(self, data, steiner_tree: SteinerTree):
         """
         The prizes of the steiner points in the pcst-graph will be reduced.
         """
-        data["pcst_graph"].update_vertex_prizes(
-            {
-                v: self.reduction_factor * data["pcst_graph"].get_vertex_prize(v)
-                for v in steiner_tree.nodes if v not in data["ppi_instance"].terminals
-            }
-        )
+        vertices = steiner_tree.vertex_ids
+        steiner_vertices = vertices[~data["terminal_mask"][vertices]]
+        data["pcst_graph"].prizes[steiner_vertices] *= self.reduction_factor
+
+    def _reduce_graph(self, data):
+        """
+        Replaces the pcst-graph by the reduced graph (with the initial prizes) if the
+        reduction is exact for the prizes. Done once, the prizes of the steiner vertices
+        only decrease afterwards.
+        """
+        if not is_reduction_safe(data["pcst_graph"], data["terminal_mask"]):
+            return
+        reduced = reduce_pcst_instance(data["pcst_graph"], data["terminal_mask"])
+        if reduced is not data["pcst_graph"]:
+            data["terminal_mask"] = data["terminal_mask"][reduced.vertex_map]
+            data["pcst_graph"] = reduced
 
     def _set_initial_prizes(self, data):
         """
@@ -88,6 +262,10 @@ class ExpMinMaxDiverseSteinerTreeComputer:
         in the constructor of the pcst-graph because we can much more efficiently get
         the min and max edge costs for the numpy representation in the pcst-graph.
         """
+        terminal_mask = np.zeros(len(data["pcst_graph"].prizes), dtype=bool)
+        terminal_mask[data["pcst_graph"].vertex_ids.get_ids(
+            data["ppi_instance"].terminals)] = True
+        data["terminal_mask"] = terminal_mask
         self._set_initial_terminal_prizes(data)
         self._set_initial_steiner_prizes(data)
 
@@ -97,59 +275,32 @@ class ExpMinMaxDiverseSteinerTreeComputer:
         """
         d = data["ppi_instance"].meta["graph_diameter"]
         terminal_prize = self.initial_terminal_multiple * d * data["max_edge_cost"]
-        data["pcst_graph"].update_vertex_prizes(
-            {v: terminal_prize for v in data["ppi_instance"].terminals}
-        )
+        data["pcst_graph"].prizes[data["terminal_mask"]] = terminal_prize
 
     def _double_terminal_prizes(self, data):
         """
         Doubles the prizes of the terminals. Used if it was too low and not all terminals
         are integrated in the prize collecting steiner tree.
         """
-        data["pcst_graph"].update_vertex_prizes(
-            {
-                v: 2 * data["pcst_graph"].get_vertex_prize(v)
-                for v in data["ppi_instance"].terminals
-            }
-        )
+        data["pcst_graph"].prizes[data["terminal_mask"]] *= 2
 
     def _set_initial_steiner_prizes(self, data):
         """
         Sets the prizes of the steiner vertices (non-terminals).
         """
-        ppi_instance: PpiInstance = data["ppi_instance"]
         p = self.initial_fraction * data["min_edge_cost"]
-        data["pcst_graph"].update_vertex_prizes(
-            {
-                v: p
-                for v in ppi_instance.ppi_graph.nodes if
-                v not in ppi_instance.terminals
-            }
-        )
+        data["pcst_graph"].prizes[~data["terminal_mask"]] = p
 
     def _compute_steiner_tree(self, data):
         """
-        Does the expensive computation of the steiner tree including doubling the prizes
-        of the terminals if not all are integrated in the solution.
-        """
-        st = solve_pcst(data["pcst_graph"])
-        # TODO: The following code was actually useless as it did not compute anything.
-        #       The PCST algorithm cannot guarantee to contain all seeds. This would require
-        #       an additional algorithm, possibly based on shortest path. Because the primary
-        #       part of the solution is already complete, one could also try to contract the
-        #       steiner tree and rerun the algorithm.
-        #i_doubled = 0
-        #while not data["ppi_instance"].is_feasible_solution(st, percentage_terminals_req_in_solution):
-        #    self._double_terminal_prizes(data)
-        #    i_doubled += 1
-        #    if i_doubled >= max_nr_of_doublings:
-        #        print(f"Doubled the prizes {max_nr_of_doublings} times and could not find a feasible solution "
-        #              f"with these parameters. Returning current Steiner Tree anyway.")
-        #        return st
-                #raise Exception(
-                #    """
-                #    Could not find a feasible solution even after doubling the prizes
-                #    of the terminals multiple times. Something is odd. Maybe check input?
-                #    """
-                #)
-        return st
\ No newline at end of file
+        Does the expensive computation of the steiner tree including the repair if not
+        all terminals are integrated in the solution (repair_trees).
+        """
+        st = self.solver.solve(data["pcst_graph"], data["terminal_mask"])
+        if self.check_trees:
+            assert st.is_tree(), "Result should be a tree"
+        # pcst_fast cannot guarantee to contain all terminals. Instead of re-solving with
+        # doubled terminal prizes, the missing ones are attached by shortest paths.
+        if self.repair_trees:
+            st = repair_tree(data["pcst_graph"], st, data["terminal_mask"])
+        return st
@@ -0,0 +1,224 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import typing
+import weakref
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, the lock is skipped there.
+    fcntl = None
+
+from ..pcst import PcstInstance, SteinerTree
+from ..ppi import PpiInstance
+from ..ppi.compiled_network import default_cache_dir
+from ..version import __version__
+from .solution_set import SolutionSet
+
+# Increase whenever the layout of the cached files changes.
+FORMAT_VERSION = 1
+# Parameters of the computer that do not change the result.
+_IGNORED_PARAMETERS = {"check_trees"}
+
+
+def graph_hash(pcst_graph: PcstInstance) -> str:
+    """
+    The sha256 of the labels, edges and costs of the PcstInstance.
+    """
+    h = hashlib.sha256()
+    vertex_ids = pcst_graph.vertex_ids
+    h.update("\n".join(str(vertex_ids.get_label(i)) for i in range(len(vertex_ids)))
+             .encode())
+    h.update(np.ascontiguousarray(pcst_graph.edges, dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(pcst_graph.costs, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def computation_description(engine, ppi_instance: PpiInstance,
+                            pcst_graph_hash: str) -> typing.Dict:
+    """
+    Everything the trees of engine for ppi_instance depend on (besides their number):
+    the graph (see graph_hash), the graph diameter, the sorted terminals, the
+    parameters and the solver of the engine and the version of the library.
+    """
+    return {
+        "version": __version__,
+        "graph": pcst_graph_hash,
+        "graph_diameter": ppi_instance.meta["graph_diameter"],
+        "terminals": sorted(str(v) for v in ppi_instance.terminals),
+        "engine": type(engine).__name__,
+        "parameters": {name: value for name, value in sorted(vars(engine).items())
+                       if isinstance(value, (bool, int, float, str))
+                       and name not in _IGNORED_PARAMETERS},
+        "solver": repr(getattr(engine, "solver", None)),
+    }
+
+
+class ResultCache:
+    """
+    A content-addressed cache of solution sets on disk. The key is a hash of the graph
+    (labels, edges and costs of the PcstInstance), the graph diameter, the sorted
+    terminals, the parameters of the computation, the number of trees and the version of
+    the library. An entry stores the vertex and edge ids of the trees as numpy arrays.
+    Entries are written atomically, so concurrent processes can share the cache. If it
+    exceeds max_bytes, the least recently used entries are removed. The hits and misses
+    of all processes are counted in stats.json.
+    """
+
+    def __init__(self, directory: typing.Optional[str] = None, max_bytes=1 << 30):
+        self.directory = os.path.join(directory or default_cache_dir(), "results")
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._graph_hashes = weakref.WeakKeyDictionary()
+
+    def _graph_hash(self, pcst_graph: PcstInstance) -> str:
+        """
+        graph_hash, computed once per PcstInstance (the computation does not change the
+        costs).
+        """
+        if pcst_graph not in self._graph_hashes:
+            self._graph_hashes[pcst_graph] = graph_hash(pcst_graph)
+        return self._graph_hashes[pcst_graph]
+
+    def key(self, engine, ppi_instance: PpiInstance, pcst_graph: PcstInstance,
+            n: int) -> str:
+        """
+        The key of the solution set that engine(ppi_instance, n, pcst_graph) computes.
+        """
+        description = computation_description(engine, ppi_instance,
+                                              self._graph_hash(pcst_graph))
+        description.update({"format": FORMAT_VERSION, "n": n})
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    @contextlib.contextmanager
+    def _lock(self):
+        with open(os.path.join(self.directory, ".lock"), "a") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def _count(self, event: str):
+        with self._lock():
+            self._count_locked(event)
+
+    def _count_locked(self, event: str):
+        stats = self._read_stats()
+        stats[event] = stats.get(event, 0) + 1
+        tmp = os.path.join(self.directory, f".stats-{os.getpid()}")
+        with open(tmp, "w") as file:
+            json.dump(stats, file)
+        os.replace(tmp, os.path.join(self.directory, "stats.json"))
+
+    def _read_stats(self) -> typing.Dict:
+        try:
+            with open(os.path.join(self.directory, "stats.json")) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, key: str, ppi_instance: PpiInstance,
+             pcst_graph: PcstInstance) -> typing.Optional[SolutionSet]:
+        """
+        Returns the cached solution set or None (counted as hit or miss).
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)  # Recently used.
+        except (OSError, ValueError, KeyError):
+            # Missing, evicted meanwhile or unreadable.
+            self._count("misses")
+            return None
+        solution_set = SolutionSet(ppi_instance, pcst_graph)
+        vertex_ids = np.split(arrays["vertex_ids"], arrays["vertex_offsets"][1:-1])
+        edge_ids = np.split(arrays["edge_ids"], arrays["edge_offsets"][1:-1])
+        for vertices, edges in zip(vertex_ids, edge_ids):
+            solution_set.append(SteinerTree(pcst_graph, vertices, edges))
+        solution_set.stop_reason = str(arrays["stop_reason"])
+        solution_set.n_solves = int(arrays["n_solves"])
+        self._count("hits")
+        return solution_set
+
+    def store(self, key: str, solution_set: SolutionSet):
+        """
+        Saves the solution set under key and evicts old entries if necessary.
+        """
+        def offsets(arrays):
+            return np.cumsum([0] + [len(a) for a in arrays])
+
+        trees = list(solution_set)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file,
+                         vertex_ids=np.concatenate([t.vertex_ids for t in trees] +
+                                                   [np.zeros(0, dtype=np.int64)]),
+                         vertex_offsets=offsets([t.vertex_ids for t in trees]),
+                         edge_ids=np.concatenate([t.edge_ids for t in trees] +
+                                                 [np.zeros(0, dtype=np.int64)]),
+                         edge_offsets=offsets([t.edge_ids for t in trees]),
+                         stop_reason=np.array(str(solution_set.stop_reason)),
+                         n_solves=np.array(solution_set.n_solves))
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            return  # Caching is best effort.
+        self._evict()
+
+    def _entries(self) -> typing.List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory)
+                if entry.name.endswith(".npz") and not entry.name.startswith(".")]
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits into max_bytes.
+        """
+        with self._lock():
+            entries = []
+            for entry in self._entries():
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                    self._count_locked("evictions")
+                total -= size
+
+    def stats(self) -> typing.Dict:
+        """
+        The hits, misses and evictions of all processes, the number of entries and
+        their total size in bytes.
+        """
+        stats = {"hits": 0, "misses": 0, "evictions": 0}
+        stats.update(self._read_stats())
+        sizes = []
+        for entry in self._entries():
+            with contextlib.suppress(OSError):
+                sizes.append(entry.stat().st_size)
+        stats.update({"entries": len(sizes), "bytes": sum(sizes)})
+        return stats
+
+    def clear(self):
+        """
+        Removes all entries and the statistics.
+        """
+        with self._lock():
+            for entry in self._entries():
+                with contextlib.suppress(OSError):
+                    os.remove(entry.path)
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.directory, "stats.json"))
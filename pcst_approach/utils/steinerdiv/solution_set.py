@@ -1,17 +1,108 @@
+import typing
+
 import networkx as nx
-import pandas as pd
+import numpy as np
 
+from ..pcst import PcstInstance, SteinerTree
 from ..ppi import PpiInstance
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
 
 class SolutionSet(list):
     """
     A simple class that allows some aggregation functions on the solution set.
+    The solutions are SteinerTrees of the same PcstInstance. The occurrences of the
+    vertices and edges are counted when a tree is appended (a vertex x tree membership
+    matrix, count vectors and the index of the first tree containing a vertex), so all
+    aggregations are vectorized lookups. The fingerprints of the trees (see
+    SteinerTree.fingerprint) are indexed, so `tree in solution_set` takes constant time.
+    Only append and extend are supported to modify the set. A networkx graph can be
+    appended if the PcstInstance is known.
     """
 
-    def __init__(self, ppi_instance: PpiInstance):
+    def __init__(self, ppi_instance: PpiInstance,
+                 pcst_graph: typing.Optional[PcstInstance] = None):
         super().__init__()
         self.ppi_instance = ppi_instance
+        # Set by the computation: why it stopped and how many solves were needed.
+        self.stop_reason = None
+        self.n_solves = 0
+        self._pcst_graph = None
+        if pcst_graph is not None:
+            self._init_counters(pcst_graph)
+
+    def _init_counters(self, pcst_graph: PcstInstance):
+        n_vertices = len(pcst_graph.prizes)
+        self._pcst_graph = pcst_graph
+        self._vertex_counts = np.zeros(n_vertices, dtype=np.int64)
+        self._edge_counts = np.zeros(len(pcst_graph.edges), dtype=np.int64)
+        self._first_tree = np.full(n_vertices, -1, dtype=np.int64)
+        self._membership = np.zeros((n_vertices, 8), dtype=bool)
+        self._sizes = []
+        self._terminal_mask = None
+        # The fingerprint of every vertex set and the index of its first tree.
+        self._fingerprints = {}
+
+    @property
+    def pcst_graph(self) -> typing.Optional[PcstInstance]:
+        return self._pcst_graph
+
+    def append(self, tree: SteinerTree):
+        if self._pcst_graph is None:
+            if not isinstance(tree, SteinerTree):
+                raise TypeError("The first solution has to be a SteinerTree if the "
+                                "SolutionSet was created without a PcstInstance.")
+            self._init_counters(tree.pcst_graph)
+        if not isinstance(tree, SteinerTree):
+            tree = SteinerTree.from_networkx(self._pcst_graph, tree)
+        i = len(self)
+        if i == self._membership.shape[1]:
+            membership = np.zeros((self._membership.shape[0], 2 * i), dtype=bool)
+            membership[:, :i] = self._membership
+            self._membership = membership
+        vertices = tree.vertex_ids
+        self._membership[vertices, i] = True
+        self._vertex_counts[vertices] += 1
+        np.add.at(self._edge_counts, tree.edge_ids, 1)
+        new = vertices[self._first_tree[vertices] < 0]
+        self._first_tree[new] = i
+        self._sizes.append(len(vertices))
+        self._fingerprints.setdefault(tree.fingerprint(), i)
+        super().append(tree)
+
+    def extend(self, trees):
+        for tree in trees:
+            self.append(tree)
+
+    def __iadd__(self, trees):
+        self.extend(trees)
+        return self
+
+    def _vertex_id(self, v) -> typing.Optional[int]:
+        try:
+            return self._pcst_graph.vertex_ids.get_id(v)
+        except KeyError:
+            return None
+
+    def terminal_mask(self) -> np.ndarray:
+        """
+        A boolean array indexed by vertex id that marks the terminals.
+        """
+        if self._terminal_mask is None:
+            mask = np.zeros(len(self._vertex_counts), dtype=bool)
+            ids = [self._vertex_id(v) for v in self.ppi_instance.terminals]
+            mask[[i for i in ids if i is not None]] = True
+            self._terminal_mask = mask
+        return self._terminal_mask
+
+    def labels(self, ids: np.ndarray) -> typing.List[str]:
+        """
+        The labels of the vertex ids.
+        """
+        get_label = self._pcst_graph.vertex_ids.get_label
+        return [get_label(i) for i in ids.tolist()]
 
     def min_cost(self) -> float:
         return min(self.ppi_instance.compute_cost(s) for s in self)
@@ -23,71 +114,221 @@ class SolutionSet(list):
         costs = [self.ppi_instance.compute_cost(s) for s in self]
         return sum(costs) / len(costs)
 
-    def vertices(self, first_n=None):
-        all_vertices = set()
+    def vertex_ids(self, first_n=None) -> np.ndarray:
+        """
+        The sorted ids of the vertices in the first first_n (default: all) solutions.
+        """
+        if not self:
+            return np.zeros(0, dtype=np.int64)
         if first_n is None:
             first_n = len(self)
-        for s in self[0:first_n]:
-            for v in s.nodes:
-                all_vertices.add(v)
-        return all_vertices
+        return np.flatnonzero((self._first_tree >= 0) & (self._first_tree < first_n))
+
+    def vertices(self, first_n=None):
+        return set(self.labels(self.vertex_ids(first_n)))
 
     def number_of_vertices(self) -> int:
-        return len(self.vertices())
+        return len(self.vertex_ids())
 
     def number_of_occurrences(self, v):
-        return sum(v in s.nodes for s in self)
+        i = self._vertex_id(v) if self else None
+        return 0 if i is None else int(self._vertex_counts[i])
+
+    def occurrence_counts(self, first_n=None) -> np.ndarray:
+        """
+        The number of solutions (of the first first_n) containing each vertex, indexed
+        by vertex id.
+        """
+        if first_n is None or first_n >= len(self):
+            return self._vertex_counts
+        return self._membership[:, :first_n].sum(axis=1)
+
+    def edge_occurrence_counts(self) -> np.ndarray:
+        """
+        The number of solutions containing each edge, indexed by edge id.
+        """
+        return self._edge_counts
+
+    def membership(self) -> np.ndarray:
+        """
+        The boolean vertex x solution matrix: membership()[v, i] if vertex id v is in
+        solution i.
+        """
+        return self._membership[:, :len(self)]
+
+    def module(self, threshold: float) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        The sorted vertex ids that occur in at least a threshold fraction of the solutions
+        and the sorted ids of the edges between them that are used by any solution.
+        """
+        if not self:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        ids = np.flatnonzero(self._vertex_counts / len(self) >= threshold)
+        ids = ids[self._vertex_counts[ids] > 0]
+        selected = np.zeros(len(self._vertex_counts), dtype=bool)
+        selected[ids] = True
+        edge_ids = np.flatnonzero(self._edge_counts)
+        endpoints = self._pcst_graph.edges[edge_ids]
+        edge_ids = edge_ids[selected[endpoints[:, 0]] & selected[endpoints[:, 1]]]
+        return ids, edge_ids
 
     def tree_list(self, v):
-        tree_list = []
-        for i in range(len(self)):
-            if v in self[i].nodes:
-                tree_list.append(str(i))
-        return ",".join(tree_list)
+        i = self._vertex_id(v) if self else None
+        if i is None:
+            return ""
+        return ",".join(str(t) for t in np.flatnonzero(self._membership[i, :len(self)]))
 
-    def get_occurrences(self, include_terminals=False, first_n=None) -> pd.DataFrame:
+    def get_occurrences(self, include_terminals=False, first_n=None) -> "pd.DataFrame":
         """
         Returns a pandas data frame with the occurrences of the vertices.
         It has the vertex label as index and the columns
         * #occurrences: The number of occurrences
         * %occurrences: The relative occurences (0.0-1.0)
         * terminal: If it is a terminal (use include_terminals=True to include them).
+        With first_n, only the first first_n solutions are considered, i.e., the result
+        is the same as for a solution set with just these solutions.
         """
-        data = {"vertex": [], "#occurrences": [], "%occurrences": [], "terminal": []}
-        for v in self.vertices(first_n=first_n):
-            if include_terminals or v not in self.ppi_instance.terminals:
-                data["vertex"].append(v)
-                data["#occurrences"].append(self.number_of_occurrences(v))
-                data["%occurrences"].append(self.number_of_occurrences(v) / len(self))
-                data["terminal"].append(v in self.ppi_instance.terminals)
+        import pandas as pd  # Only loaded if data frames are used.
+        columns = ["vertex", "#occurrences", "%occurrences", "terminal"]
+        if not self:
+            return pd.DataFrame(columns=columns).set_index("vertex")
+        ids = self.vertex_ids(first_n=first_n)
+        terminal = self.terminal_mask()[ids]
+        if not include_terminals:
+            ids = ids[~terminal]
+            terminal = terminal[~terminal]
+        counts = self.occurrence_counts(first_n)[ids]
+        n = len(self) if first_n is None else min(first_n, len(self))
+        data = {"vertex": self.labels(ids),
+                "#occurrences": counts,
+                "%occurrences": counts / n,
+                "terminal": terminal}
         return pd.DataFrame(data).sort_values(["#occurrences"], ascending=False,
                                               kind="mergesort").set_index("vertex")
 
+    def get_edge_occurrences(self) -> "pd.DataFrame":
+        """
+        Returns a pandas data frame with the edges used by at least one solution, with
+        the columns source, target, #occurrences and %occurrences.
+        """
+        import pandas as pd  # Only loaded if data frames are used.
+        columns = ["source", "target", "#occurrences", "%occurrences"]
+        if not self:
+            return pd.DataFrame(columns=columns)
+        edge_ids = np.flatnonzero(self._edge_counts)
+        endpoints = self._pcst_graph.edges[edge_ids]
+        counts = self._edge_counts[edge_ids]
+        data = {"source": self.labels(endpoints[:, 0]),
+                "target": self.labels(endpoints[:, 1]),
+                "#occurrences": counts, "%occurrences": counts / len(self)}
+        return pd.DataFrame(data).sort_values(["#occurrences"], ascending=False,
+                                              kind="mergesort")
+
     def get_subgraph(self, threshold=0.5):
         """
-        Returns the induced subgraph
+        Returns the subgraph of the union of all solutions induced by the vertices that
+        occur in at least a threshold fraction of the solutions.
         """
-        import networkx as nx
         G = nx.Graph()
-        for graph in self:
-            for n in graph.nodes:
-                if n not in G.nodes:
-                    is_seed = False
-                    if n in self.ppi_instance.terminals:
-                        is_seed = True
-                    G.add_node(n,
-                               isSeed=is_seed,
-                               significance=self.number_of_occurrences(n) / len(self),
-                               nrOfOccurrences=self.number_of_occurrences(n),
-                               trees=self.tree_list(n))
-            G.add_edges_from(graph.edges)
-        selected_nodes = [n for n,v in G.nodes(data=True) if v['significance'] >= threshold]
-        return G.subgraph(selected_nodes)
-
+        if not self:
+            return G
+        ids, edge_ids = self.module(threshold)
+        terminal = self.terminal_mask()
+        labels = self.labels(ids)
+        for label, i in zip(labels, ids.tolist()):
+            G.add_node(label,
+                       isSeed=bool(terminal[i]),
+                       significance=float(self._vertex_counts[i] / len(self)),
+                       nrOfOccurrences=int(self._vertex_counts[i]),
+                       trees=",".join(str(t) for t in
+                                      np.flatnonzero(self._membership[i, :len(self)])))
+        edges = self._pcst_graph.edges[edge_ids]
+        G.add_edges_from(zip(self.labels(edges[:, 0]), self.labels(edges[:, 1])))
+        return G
 
     def avg_size(self) -> float:
-        return sum(s.number_of_nodes() for s in self) / len(self)
+        return sum(self._sizes) / len(self)
+
+    def jaccard_to(self, tree, first_n=None) -> np.ndarray:
+        """
+        The Jaccard similarities of the vertex set of tree to the ones of the first
+        first_n (default: all) solutions.
+        """
+        if first_n is None:
+            first_n = len(self)
+        if not isinstance(tree, SteinerTree):
+            tree = SteinerTree.from_networkx(self._pcst_graph, tree)
+        vertices = tree.vertex_ids
+        intersections = self._membership[vertices, :first_n].sum(axis=0)
+        unions = len(vertices) + np.array(self._sizes[:first_n]) - intersections
+        return np.where(unions > 0, intersections / np.maximum(unions, 1), 1.0)
+
+    def _jaccard_rows(self, start: int, stop: int, membership: np.ndarray) -> np.ndarray:
+        """
+        The Jaccard similarities of the solutions start..stop-1 to all solutions, from
+        the float32 membership matrix of the vertices that occur (exact up to 2^24
+        vertices).
+        """
+        intersections = membership[:, start:stop].T @ membership
+        sizes = np.array(self._sizes, dtype=np.float64)
+        unions = sizes[start:stop, None] + sizes[None, :] - intersections
+        return np.where(unions > 0, intersections / np.maximum(unions, 1), 1.0)
+
+    def pairwise_jaccard(self) -> np.ndarray:
+        """
+        The matrix of the Jaccard similarities of the vertex sets of all pairs of
+        solutions (quadratic in the number of solutions, see diversity for large sets).
+        """
+        membership = self._membership[self.vertex_ids(), :len(self)].astype(np.float32)
+        return self._jaccard_rows(0, len(self), membership)
+
+    def diversity(self, block=1024) -> typing.Dict:
+        """
+        Statistics of the pairwise Jaccard similarities of the vertex sets: mean,
+        standard deviation, minimum and maximum over all pairs of solutions and the mean
+        similarity of every solution to its most similar other one (near 1 if the set
+        consists of near duplicates). The similarities are computed by matrix products
+        of the membership matrix in blocks of rows, so the memory is block times the
+        number of solutions. The statistics are None for less than two solutions.
+        """
+        n = len(self)
+        result = {"trees": n, "pairs": n * (n - 1) // 2, "mean_jaccard": None,
+                  "std_jaccard": None, "min_jaccard": None, "max_jaccard": None,
+                  "mean_nearest_jaccard": None}
+        if n < 2:
+            return result
+        membership = self._membership[self.vertex_ids(), :n].astype(np.float32)
+        total = square_total = nearest_total = 0.0
+        minimum, maximum = 1.0, 0.0
+        columns = np.arange(n)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            similarities = self._jaccard_rows(start, stop, membership)
+            rows = np.arange(start, stop)
+            upper = similarities[columns[None, :] > rows[:, None]]
+            total += upper.sum()
+            square_total += (upper ** 2).sum()
+            if len(upper):
+                minimum = min(minimum, float(upper.min()))
+                maximum = max(maximum, float(upper.max()))
+            similarities[rows - start, rows] = -np.inf
+            nearest_total += similarities.max(axis=1).sum()
+        mean = total / result["pairs"]
+        result.update({"mean_jaccard": float(mean),
+                       "std_jaccard": float(np.sqrt(max(square_total / result["pairs"] -
+                                                        mean ** 2, 0.0))),
+                       "min_jaccard": minimum, "max_jaccard": maximum,
+                       "mean_nearest_jaccard": float(nearest_total / n)})
+        return result
 
     def __contains__(self, item):
-        vertices = set(item.nodes)
-        return any(vertices == set(g.nodes) for g in self)
+        if not self:
+            return False
+        if not isinstance(item, SteinerTree):
+            # Only the vertices are compared. A graph with vertices that are not in the
+            # instance cannot be one of the solutions.
+            vertices = [self._vertex_id(v) for v in item.nodes]
+            if None in vertices:
+                return False
+            item = SteinerTree(self._pcst_graph, vertices, np.zeros(0, dtype=np.int64))
+        return item.fingerprint() in self._fingerprints
@@ -0,0 +1,135 @@
+import collections
+import functools
+from timeit import default_timer as timer
+
+import numpy as np
+
+
+class StoppingPolicy:
+    """
+    Decides after every new steiner tree if the diversification can stop early.
+    start is called before the first tree, should_stop after every tree with the
+    solution set so far and the number of PCST solves (including repetitions).
+    The name is reported as stop reason if the policy fires.
+    """
+    name = "policy"
+
+    def start(self):
+        pass
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        raise NotImplementedError()
+
+
+class TimeBudget(StoppingPolicy):
+    """
+    Stops as soon as the given number of seconds has passed. A running solve is not
+    interrupted, so the budget can be exceeded by the time of one solve.
+    """
+    name = "time_budget"
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._start = None
+
+    def start(self):
+        self._start = timer()
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        return timer() - self._start >= self.seconds
+
+
+class SolveBudget(StoppingPolicy):
+    """
+    Stops after the given number of PCST solves.
+    """
+    name = "solve_budget"
+
+    def __init__(self, max_solves: int):
+        self.max_solves = max_solves
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        return n_solves >= self.max_solves
+
+
+class _WindowPolicy(StoppingPolicy):
+    """
+    Stops if the observed vertex set was stable for the last window trees, i.e., the
+    intersection of the sets of these trees covers at least min_similarity of their
+    union (Jaccard similarity). The diversification tends to oscillate between a few
+    similar sets, so demanding identical sets (min_similarity=1) rarely stops.
+    """
+
+    def __init__(self, window: int, min_similarity: float):
+        self.window = window
+        self.min_similarity = min_similarity
+        self._history = collections.deque(maxlen=window)
+
+    def start(self):
+        self._history.clear()
+
+    def _observe(self, solution_set) -> np.ndarray:
+        raise NotImplementedError()
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        if not solution_set:
+            return False
+        self._history.append(self._observe(solution_set))
+        if len(self._history) < self.window:
+            return False
+        intersection = functools.reduce(np.intersect1d, self._history)
+        union = functools.reduce(np.union1d, self._history)
+        return len(union) == 0 or len(intersection) / len(union) >= self.min_similarity
+
+
+class StableModule(_WindowPolicy):
+    """
+    Stops if the module, i.e., the vertices occurring in at least a threshold fraction
+    of the trees, was stable for the last window trees.
+    """
+    name = "stable_module"
+
+    def __init__(self, threshold: float, window=5, min_similarity=0.9):
+        super().__init__(window, min_similarity)
+        self.threshold = threshold
+
+    def _observe(self, solution_set) -> np.ndarray:
+        counts = solution_set.occurrence_counts()
+        return np.flatnonzero((counts > 0) &
+                              (counts / len(solution_set) >= self.threshold))
+
+
+class StableRanking(_WindowPolicy):
+    """
+    Stops if the top vertices of the ranking by occurrences (ties broken by id) were
+    stable for the last window trees.
+    """
+    name = "stable_ranking"
+
+    def __init__(self, top=50, window=5, min_similarity=0.9):
+        super().__init__(window, min_similarity)
+        self.top = top
+
+    def _observe(self, solution_set) -> np.ndarray:
+        counts = solution_set.occurrence_counts()
+        ids = np.flatnonzero(counts)
+        return ids[np.argsort(-counts[ids], kind="stable")][:self.top]
+
+
+class NearDuplicate(StoppingPolicy):
+    """
+    Stops if the newest tree nearly repeats an earlier one: the Jaccard similarity of
+    their vertex sets is at least min_similarity. An exact repetition always stops the
+    diversification, this also stops when the trees only differ in a few vertices.
+    The near duplicate itself stays in the solution set.
+    """
+    name = "near_duplicate"
+
+    def __init__(self, min_similarity=0.95):
+        self.min_similarity = min_similarity
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        if len(solution_set) < 2:
+            return False
+        similarities = solution_set.jaccard_to(solution_set[-1], len(solution_set) - 1)
+        return similarities.max() >= self.min_similarity
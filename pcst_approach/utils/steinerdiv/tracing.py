@@ -0,0 +1,95 @@
+import collections
+import contextlib
+import json
+import os
+import typing
+from timeit import default_timer as timer
+
+
+class Tracer:
+    """
+    Collects the timings of a ROBUST run: stages (loading, instance building, solving,
+    prize updates, writing, ...) and one record per diversification iteration with
+    * iteration: The index of the solve (0, 1, ...).
+    * solve_seconds: The time of the PCST solve.
+    * prize_update_seconds: The time of the prize update before this solve (0 for the
+        first one).
+    * tree_vertices, tree_edges: The size of the tree.
+    * new_vertices: The number of vertices that were in none of the previous trees.
+    * repetition: If the tree was already in the solution set (this ends the run).
+    Hooks are called with every iteration record (on_iteration) and with the name and
+    duration of every stage (on_stage), e.g., to feed a dashboard. Everything is only
+    measured if a tracer is passed, so there is no overhead without one.
+    """
+
+    def __init__(self, on_iteration: typing.Optional[typing.Callable] = None,
+                 on_stage: typing.Optional[typing.Callable] = None):
+        self.on_iteration = on_iteration
+        self.on_stage = on_stage
+        self.iterations = []
+        self.events = []
+        self.stage_seconds = collections.defaultdict(float)
+        self._current = None
+        self._start = timer()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **args):
+        """
+        Times the enclosed code as stage. The args are added to the trace event.
+        """
+        start = timer()
+        try:
+            yield
+        finally:
+            self.add_stage(name, start, timer() - start, **args)
+
+    def add_stage(self, name: str, start: float, seconds: float, **args):
+        """
+        Adds a stage that was timed elsewhere (start as returned by default_timer).
+        """
+        self.stage_seconds[name] += seconds
+        self.events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                            "ts": (start - self._start) * 1e6, "dur": seconds * 1e6,
+                            "args": args})
+        if self.on_stage is not None:
+            self.on_stage(name, seconds)
+
+    def begin_iteration(self, solve_seconds: float, prize_update_seconds: float):
+        """
+        Called by the diversification after a solve, see end_iteration.
+        """
+        self._current = {"iteration": len(self.iterations),
+                         "solve_seconds": solve_seconds,
+                         "prize_update_seconds": prize_update_seconds}
+
+    def end_iteration(self, **fields):
+        """
+        Completes the record of the current iteration with the fields that are only
+        known after the tree was compared to the solution set and calls the hook.
+        """
+        record = dict(self._current, **fields)
+        self.iterations.append(record)
+        if self.on_iteration is not None:
+            self.on_iteration(record)
+
+    def summary(self) -> typing.Dict:
+        """
+        The total seconds per stage and the statistics of the solves.
+        """
+        solves = [r["solve_seconds"] for r in self.iterations]
+        return {"stages": dict(self.stage_seconds),
+                "solves": len(solves),
+                "solve_seconds_total": sum(solves),
+                "solve_seconds_max": max(solves, default=0.0),
+                "tree_vertices_max": max((r["tree_vertices"] for r in self.iterations),
+                                         default=0)}
+
+    def write(self, path: str):
+        """
+        Writes the trace as JSON in the Chrome trace format (open it in chrome://tracing
+        or https://ui.perfetto.dev). Besides the trace events, the file contains the
+        summary and the iteration records for other tools.
+        """
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms",
+                       "summary": self.summary(), "iterations": self.iterations}, file)
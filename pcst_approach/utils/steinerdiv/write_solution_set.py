@@ -0,0 +1,171 @@
+import csv
+import typing
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from ..pcst import UnionFind
+from .solution_set import SolutionSet
+
+_GRAPHML_HEADER = """<?xml version='1.0' encoding='utf-8'?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns" \
+xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" \
+xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns \
+http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">
+  <key id="d4" for="node" attr.name="connected_components_id" attr.type="long" />
+  <key id="d3" for="node" attr.name="trees" attr.type="string" />
+  <key id="d2" for="node" attr.name="nrOfOccurrences" attr.type="long" />
+  <key id="d1" for="node" attr.name="significance" attr.type="double" />
+  <key id="d0" for="node" attr.name="isSeed" attr.type="boolean" />
+  <graph edgedefault="undirected">
+"""
+
+
+class _Module:
+    """
+    The disease module, i.e., the vertices that occur in at least a threshold fraction
+    of the solutions and the used edges between them, taken directly from the arrays
+    of the solution set. Vertices are in the order of their ids, edges are pairs of
+    positions in the vertex arrays.
+    """
+
+    def __init__(self, solution_set: SolutionSet, threshold: float):
+        ids, edge_ids = solution_set.module(threshold)
+        self.n_trees = len(solution_set)
+        self.labels = solution_set.labels(ids) if len(ids) else []
+        if solution_set:
+            self.counts = solution_set.occurrence_counts()[ids]
+            self.is_seed = solution_set.terminal_mask()[ids]
+            self.membership = solution_set.membership()[ids]
+            endpoints = solution_set.pcst_graph.edges[edge_ids]
+        else:
+            self.counts = np.zeros(0, dtype=np.int64)
+            self.is_seed = np.zeros(0, dtype=bool)
+            self.membership = np.zeros((0, 0), dtype=bool)
+            endpoints = np.zeros((0, 2), dtype=np.int64)
+        self.significance = self.counts / max(self.n_trees, 1)
+        self.edges = np.searchsorted(ids, endpoints).reshape(-1, 2)
+        self.component = self._components()
+
+    def _components(self) -> np.ndarray:
+        """
+        The id of the connected component of every vertex. Components are numbered by
+        decreasing size, ties by their smallest vertex id (as sorting the components of
+        networkx by size).
+        """
+        union_find = UnionFind(len(self.labels))
+        for u, v in self.edges.tolist():
+            union_find.union(u, v)
+        roots = union_find.components()
+        if len(roots) == 0:
+            return roots
+        _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+        sizes = np.bincount(inverse)
+        component_id = np.empty(len(sizes), dtype=np.int64)
+        component_id[np.lexsort((first, -sizes))] = np.arange(len(sizes))
+        return component_id[inverse]
+
+    def trees(self, i: int) -> str:
+        return ",".join(str(t) for t in np.flatnonzero(self.membership[i]).tolist())
+
+    def edge_labels(self) -> typing.Iterator[typing.Tuple[str, str]]:
+        labels = self.labels
+        for u, v in self.edges.tolist():
+            yield labels[u], labels[v]
+
+
+def _write_graphml(module: _Module, outfile: str):
+    """
+    Writes the module as GraphML with the vertex properties isSeed, significance,
+    nrOfOccurrences, trees and connected_components_id (the same file as
+    networkx.write_graphml would write for get_subgraph).
+    """
+    with open(outfile, "w", encoding="utf-8") as file:
+        file.write(_GRAPHML_HEADER)
+        for i, label in enumerate(module.labels):
+            file.write(f'    <node id={_attribute(label)}>\n'
+                       f'      <data key="d0">{bool(module.is_seed[i])}</data>\n'
+                       f'      <data key="d1">{float(module.significance[i])!r}</data>\n'
+                       f'      <data key="d2">{int(module.counts[i])}</data>\n'
+                       f'      <data key="d3">{module.trees(i)}</data>\n'
+                       f'      <data key="d4">{int(module.component[i])}</data>\n'
+                       f'    </node>\n')
+        for u, v in module.edge_labels():
+            file.write(f'    <edge source={_attribute(u)} target={_attribute(v)} />\n')
+        file.write("  </graph>\n</graphml>\n")
+
+
+def _attribute(value: str) -> str:
+    return '"' + escape(value, {'"': "&quot;", "\n": "&#10;"}) + '"'
+
+
+def _write_csv(module: _Module, outfile: str):
+    """
+    Writes the vertex table (as get_occurrences with terminals) of the module, sorted by
+    decreasing occurrences.
+    """
+    with open(outfile, "w", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(["vertex", "#occurrences", "%occurrences", "terminal"])
+        for i in np.argsort(-module.counts, kind="stable").tolist():
+            writer.writerow([module.labels[i], int(module.counts[i]),
+                             repr(float(module.significance[i])), bool(module.is_seed[i])])
+
+
+def _write_edgelist(module: _Module, outfile: str):
+    """
+    Writes the edges of the module, one per line and separated by a space.
+    """
+    with open(outfile, "w", encoding="utf-8") as file:
+        for u, v in module.edge_labels():
+            file.write(f"{u} {v}\n")
+
+
+def _write_npz(module: _Module, outfile: str):
+    """
+    Writes the module as numpy arrays (np.load gives a dict-like object) for bulk
+    loading: vertex, is_seed, significance, occurrences, component, trees (boolean
+    vertex x tree matrix), source and target (positions in the vertex arrays), n_trees.
+    """
+    np.savez(outfile, vertex=np.array(module.labels, dtype=np.str_),
+             is_seed=module.is_seed, significance=module.significance,
+             occurrences=module.counts, component=module.component,
+             trees=module.membership, source=module.edges[:, 0],
+             target=module.edges[:, 1], n_trees=module.n_trees)
+
+
+# The formats of write_solution_set and their writers.
+FORMATS = {"graphml": _write_graphml, "csv": _write_csv, "edgelist": _write_edgelist,
+           "npz": _write_npz}
+
+
+def format_of(outfile: str) -> str:
+    """
+    The format that write_solution_set chooses by the suffix of outfile.
+    """
+    for suffix in (".csv", ".graphml", ".npz"):
+        if outfile.endswith(suffix):
+            return suffix[1:]
+    return "edgelist"
+
+
+def write_solution_set(solution_set: SolutionSet, outfile: str, threshold: float,
+                       file_format: typing.Optional[str] = None):
+    """
+    Writes the disease module, i.e., all vertices that occur in at least a threshold
+    fraction of the steiner trees, to outfile. The suffix determines the format (unless
+    file_format is given):
+    * .csv: The vertex table of get_occurrences.
+    * .graphml: The module with the vertex properties isSeed, significance,
+        nrOfOccurrences, trees and connected_components_id.
+    * .npz: The same data as numpy arrays, see _write_npz.
+    * everything else: An edge list.
+    The files are written directly from the arrays of the solution set, without
+    building a networkx graph.
+    """
+    if file_format is None:
+        file_format = format_of(outfile)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format {file_format!r}, choose one of "
+                         f"{', '.join(FORMATS)}.")
+    FORMATS[file_format](_Module(solution_set, threshold), outfile)
@@ -0,0 +1,3 @@
+# Increase whenever the computed solutions change, e.g., by a change of the algorithm.
+# It is part of the key of cached results.
+__version__ = "1.1.0"
@@ -1,78 +1,316 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
 import sys
-from pcst_approach.utils.ppi import PpiInstance, read_terminals, UnitEdgeWeight, read_ppi
-from pcst_approach.utils import ExpMinMaxDiverseSteinerTreeComputer
+import tempfile
+from timeit import default_timer as timer
 
+from pcst_approach.utils.ppi import PpiInstance, read_terminals, UnitEdgeWeight, load_network, \
+    InputError
+from pcst_approach.utils.pcst import SOLVERS, get_solver
+from pcst_approach.utils import ExpMinMaxDiverseSteinerTreeComputer, write_solution_set, Tracer, \
+    ResultCache, Checkpoint, SolutionSet, NearDuplicate, __version__
+from pcst_approach.utils.steinerdiv.write_solution_set import FORMATS, format_of
 
-def call_robust(path_to_graph, path_to_seeds, outfile, init, red, numberOfSteinerTrees, threshold):
-    import networkx as nx
+# Exit codes of the command line interface.
+EXIT_OK = 0
+EXIT_ERROR = 1  # unexpected errors
+EXIT_USAGE = 2  # invalid arguments (also used by argparse)
+EXIT_INPUT = 3  # the network, the seeds or the checkpoint cannot be used
+EXIT_OUTPUT = 4  # an output could not be written
+
+# The path of an output that is written to stdout.
+STDOUT = "-"
+
+
+def compute_robust(path_to_graph, path_to_seeds, init, red, numberOfSteinerTrees, stop=None,
+                   tracer=None, cache=None, checkpoint=None, solver=None) -> SolutionSet:
+    # Computes the steiner trees once, see call_robust. Raises an InputError if the
+    # network cannot be parsed, none of the seeds is part of the network or the
+    # checkpoint does not fit.
+    # solver: optional PcstSolver (pcst_approach.utils.pcst.pcst_solver), default pcst_fast
+    if tracer is None:
+        stage = lambda name: contextlib.nullcontext()
+    else:
+        stage = tracer.stage
     # 1. Loading the instance
-    graph = read_ppi(path_to_graph)
-    terminals = read_terminals(path_to_seeds)
-    #kick out terminals not in graph
-    terminals = list(set(terminals).intersection(set(graph.nodes)))
-    #edge_weights = CoVexEdgeWeight(graph, 0.5)
-    edge_weights = UnitEdgeWeight()
-    ppi_instance = PpiInstance(graph, terminals, edge_weights)
+    with stage("load_network"):
+        network = load_network(path_to_graph)
+    with stage("read_terminals"):
+        terminals = read_terminals(path_to_seeds)
+        #kick out terminals not in graph
+        terminals = list(set(terminals).intersection(network.label_to_id()))
+    if not terminals:
+        raise InputError("None of the seeds is part of the network.")
+    with stage("ppi_instance"):
+        #edge_weights = CoVexEdgeWeight(network.to_networkx(), 0.5)
+        edge_weights = UnitEdgeWeight()
+        ppi_instance = PpiInstance.from_network(network, terminals, edge_weights)
 
     # 2. Solving the instance
     engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=init,
-                                                 reduction_factor=red)
+                                                 reduction_factor=red, solver=solver)
     # The most important parameter seems to be initial_fraction.
-    steiner_trees = engine(ppi_instance, n=numberOfSteinerTrees)
-    t = steiner_trees.get_occurrences(include_terminals=True)
-    t = t[t["%occurrences"] >= threshold]
-    subgraph = steiner_trees.get_subgraph(threshold=threshold)
-    comp_idx = 0
-    for comp in sorted(nx.connected_components(subgraph), key=len, reverse=True):
-        for node in comp:
-            subgraph.nodes[node]['connected_components_id'] = comp_idx
-        comp_idx += 1
+    # stop: optional stopping policies (pcst_approach.utils.steinerdiv.stopping)
+    with stage("diversification"):
+        steiner_trees = engine(ppi_instance, n=numberOfSteinerTrees, stop=stop, tracer=tracer,
+                               cache=cache, checkpoint=checkpoint)
+    print(f"Computed {len(steiner_trees)} steiner trees (stopped by: {steiner_trees.stop_reason}).")
+    return steiner_trees
+
+
+def call_robust(path_to_graph, path_to_seeds, outfile, init, red, numberOfSteinerTrees, threshold,
+                stop=None, tracer=None, cache=None, checkpoint=None):
+    # tracer: optional Tracer (pcst_approach.utils.steinerdiv.tracing) for the timings
+    # cache: optional ResultCache (pcst_approach.utils.steinerdiv.result_cache) to reuse
+    #        the steiner trees of earlier runs with the same network, seeds and parameters
+    # checkpoint: optional Checkpoint (pcst_approach.utils.steinerdiv.checkpoint) to
+    #             continue a killed run or to extend a finished one
+    steiner_trees = compute_robust(path_to_graph, path_to_seeds, init, red, numberOfSteinerTrees,
+                                   stop=stop, tracer=tracer, cache=cache, checkpoint=checkpoint)
     print("Writing results...")
-    if outfile.endswith(".csv"):
-        t.to_csv(path_to_outfile)
-    elif outfile.endswith(".graphml"):
-        nx.write_graphml(subgraph, path_to_outfile)
-    else:
-        nx.write_edgelist(subgraph, path_to_outfile, data=False)
+    with (contextlib.nullcontext() if tracer is None else tracer.stage("write")):
+        write_solution_set(steiner_trees, outfile, threshold)
+
+
+def parse_output(value: str):
+    """
+    Parses an output target of the command line: PATH (format by suffix), FORMAT:PATH or
+    - (csv to stdout). Returns (format, path).
+    """
+    file_format, separator, path = value.partition(":")
+    if separator and file_format in FORMATS:
+        return file_format, path
+    if value == STDOUT:
+        return "csv", STDOUT
+    return format_of(value), value
+
+
+def write_outputs(steiner_trees: SolutionSet, outputs, threshold, stdout):
+    # Writes the module in every requested format. Outputs to stdout are written to a
+    # temporary file first, because the writers need a path (npz is written binary).
+    for file_format, path in outputs:
+        if path != STDOUT:
+            write_solution_set(steiner_trees, path, threshold, file_format=file_format)
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            tmp = os.path.join(directory, "module." + file_format)
+            write_solution_set(steiner_trees, tmp, threshold, file_format=file_format)
+            stdout.flush()
+            with open(tmp, "rb") as file:
+                shutil.copyfileobj(file, stdout.buffer)
+            stdout.buffer.flush()
+
+
+def run_summary(args, outputs, steiner_trees, tracer, cache, seconds):
+    # The JSON summary of the run for workflow engines.
+    summary = {
+        "version": __version__,
+        "network": args.network,
+        "seeds_file": args.seeds,
+        "parameters": {"initial_fraction": args.initial_fraction,
+                       "reduction_factor": args.reduction_factor, "trees": args.trees,
+                       "threshold": args.threshold, "solver": args.solver,
+                       "near_duplicate": args.near_duplicate},
+        "outputs": [{"format": f, "path": p} for f, p in outputs],
+        "timings": dict(tracer.summary(), total_seconds=seconds),
+    }
+    if steiner_trees is not None:
+        vertices, edges = steiner_trees.module(args.threshold)
+        summary.update({
+            "seeds": {"given": len(set(read_terminals(args.seeds))),
+                      "in_network": len(steiner_trees.ppi_instance.terminals)},
+            "trees": len(steiner_trees),
+            "stop_reason": steiner_trees.stop_reason,
+            "solves": steiner_trees.n_solves,
+            "module": {"vertices": len(vertices), "edges": len(edges),
+                       "seeds": int(steiner_trees.terminal_mask()[vertices].sum())},
+            "diversity": steiner_trees.diversity(),
+        })
+    if cache is not None:
+        summary["result_cache"] = cache.stats()
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Computes a disease module with ROBUST: a set of diverse steiner trees "
+                    "for the seeds, of which the vertices in at least a threshold fraction "
+                    "of the trees form the module. The trees are computed once and the "
+                    "module is written in every requested format.",
+        epilog=f"Formats: {', '.join(FORMATS)}. Exit codes: {EXIT_OK} success, "
+               f"{EXIT_ERROR} unexpected error, {EXIT_USAGE} invalid arguments, "
+               f"{EXIT_INPUT} unusable network, seeds or checkpoint, {EXIT_OUTPUT} an "
+               f"output could not be written.")
+    parser.add_argument("network", help="file providing the network in the form of an "
+                                        "edgelist (tab-separated table, columns 1 & 2 "
+                                        "will be used)")
+    parser.add_argument("seeds", help="file with the seed genes (if table contains more "
+                                      "than one column they must be tab-separated; the "
+                                      "first column will be used only)")
+    # The positional arguments of earlier versions, the named options are preferred.
+    parser.add_argument("outfile", nargs="?", help="output file, the suffix determines the "
+                                                   "format (same as -o)")
+    parser.add_argument("pos_initial_fraction", nargs="?", type=float,
+                        metavar="initial_fraction", help=argparse.SUPPRESS)
+    parser.add_argument("pos_reduction_factor", nargs="?", type=float,
+                        metavar="reduction_factor", help=argparse.SUPPRESS)
+    parser.add_argument("pos_trees", nargs="?", type=int, metavar="trees",
+                        help=argparse.SUPPRESS)
+    parser.add_argument("pos_threshold", nargs="?", type=float, metavar="threshold",
+                        help=argparse.SUPPRESS)
+    parser.add_argument("pos_checkpoint", nargs="?", metavar="checkpoint",
+                        help=argparse.SUPPRESS)
+    parser.add_argument("-o", "--output", action="append", default=[], type=parse_output,
+                        metavar="[FORMAT:]PATH",
+                        help="output target, repeatable; the format is taken from the "
+                             "suffix of PATH (.graphml, .csv, .npz, else edgelist) unless "
+                             "given as prefix, - writes to stdout (csv unless given, e.g., "
+                             "edgelist:-)")
+    parser.add_argument("--initial-fraction", type=float,
+                        help="initial fraction (alpha, default: 0.25)")
+    parser.add_argument("--reduction-factor", type=float,
+                        help="reduction factor (beta, default: 0.9)")
+    parser.add_argument("--trees", type=int,
+                        help="number of steiner trees to be computed (default: 30)")
+    parser.add_argument("--threshold", type=float, help="threshold (theta, default: 0.1)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="pcst_fast",
+                        help="PCST solver; shortest_path is much faster for large seed "
+                             "sets (default: pcst_fast)")
+    parser.add_argument("--near-duplicate", type=float, metavar="SIMILARITY",
+                        help="stop as soon as a tree has at least this Jaccard similarity "
+                             "to an earlier one (e.g. 0.95; disables --result-cache)")
+    parser.add_argument("--checkpoint", metavar="DIR",
+                        help="save the trees in DIR while they are computed; running again "
+                             "continues a killed run or extends a finished one")
+    parser.add_argument("--result-cache", action="store_true",
+                        default=os.environ.get("ROBUST_RESULT_CACHE", "") not in ("", "0"),
+                        help="reuse the steiner trees of earlier runs (default: set by "
+                             "ROBUST_RESULT_CACHE)")
+    parser.add_argument("--trace", metavar="FILE", default=os.environ.get("ROBUST_TRACE"),
+                        help="write the timings as Chrome trace (JSON) to FILE (default: "
+                             "ROBUST_TRACE)")
+    parser.add_argument("--summary", metavar="FILE",
+                        help="write a JSON summary of the run (parameters, timings, number "
+                             "of trees, module size) to FILE, also if the run fails; - "
+                             "writes to stdout")
+    args = parser.parse_args(argv)
+
+    # Merge the positional arguments into the named ones.
+    for name, default in (("initial_fraction", 0.25), ("reduction_factor", 0.9),
+                          ("trees", 30), ("threshold", 0.1), ("checkpoint", None)):
+        positional = getattr(args, "pos_" + name)
+        if positional is not None and getattr(args, name) is not None:
+            parser.error(f"{name} is given as positional argument and as option.")
+        if getattr(args, name) is None:
+            setattr(args, name, default if positional is None else positional)
+    outputs = ([parse_output(args.outfile)] if args.outfile else []) + args.output
+    if not outputs and args.summary is None:
+        parser.error("no output given, use -o PATH (or - for stdout) or --summary.")
+    for file_format, path in outputs:
+        if file_format not in FORMATS:
+            parser.error(f"unknown format {file_format!r}, choose one of "
+                         f"{', '.join(FORMATS)}.")
+    to_stdout = [path for _, path in outputs if path == STDOUT] + \
+                ([STDOUT] if args.summary == STDOUT else [])
+    if len(to_stdout) > 1:
+        parser.error("only one output can be written to stdout.")
+    if not 0 < args.initial_fraction <= 1 or not 0 < args.reduction_factor <= 1:
+        parser.error("initial fraction and reduction factor have to be in (0, 1].")
+    if args.trees < 1:
+        parser.error("the number of steiner trees has to be at least 1.")
+    if not 0 <= args.threshold <= 1:
+        parser.error("the threshold has to be in [0, 1].")
+    if args.near_duplicate is not None and not 0 < args.near_duplicate <= 1:
+        parser.error("the near duplicate similarity has to be in (0, 1].")
+
+    stdout = sys.stdout
+    start = timer()
+    tracer = Tracer()
+    cache = ResultCache() if args.result_cache else None
+    steiner_trees = None
+    error = None
+    exit_code = EXIT_OK
+    # The messages go to stderr if stdout is an output.
+    with contextlib.redirect_stdout(sys.stderr if to_stdout else stdout):
+        print(f"Computing Steiner Trees with the following parameters: \n "
+              f"graph: {args.network}\n"
+              f"seeds: {args.seeds}\n"
+              f"outputs: {', '.join(f'{p} ({f})' for f, p in outputs)}\n"
+              f"initial fraction: {args.initial_fraction}\n"
+              f"reduction factor: {args.reduction_factor}\n"
+              f"number of steiner trees: {args.trees}\n"
+              f"threshold: {args.threshold}\n"
+              f"solver: {args.solver}"
+              + (f"\nnear duplicate similarity: {args.near_duplicate}"
+                 if args.near_duplicate is not None else "")
+              + (f"\ncheckpoint: {args.checkpoint}" if args.checkpoint else ""))
+        try:
+            checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+            stop = None if args.near_duplicate is None else NearDuplicate(args.near_duplicate)
+            # The engine returns up to n + 1 trees.
+            steiner_trees = compute_robust(args.network, args.seeds, args.initial_fraction,
+                                           args.reduction_factor, args.trees - 1,
+                                           stop=stop, tracer=tracer, cache=cache,
+                                           checkpoint=checkpoint,
+                                           solver=get_solver(args.solver))
+        except (OSError, InputError) as e:
+            error, exit_code = e, EXIT_INPUT
+        except Exception as e:
+            error, exit_code = e, EXIT_ERROR
+        if steiner_trees is not None:
+            print("Writing results...")
+            try:
+                with tracer.stage("write"):
+                    write_outputs(steiner_trees, outputs, args.threshold, stdout)
+            except OSError as e:
+                error, exit_code = e, EXIT_OUTPUT
+        if error is not None:
+            print(f"Error: {error}", file=sys.stderr)
+        if cache is not None:
+            print(f"Result cache: {cache.stats()}")
+        if args.trace:
+            try:
+                tracer.write(args.trace)
+                print(f"Wrote trace to {args.trace}.")
+            except OSError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                if error is None:
+                    error, exit_code = e, EXIT_OUTPUT
+        if args.summary is not None:
+            summary = run_summary(args, outputs, steiner_trees, tracer, cache,
+                                  timer() - start)
+            summary.update({"exit_code": exit_code,
+                            "error": None if error is None else str(error)})
+            try:
+                if args.summary == STDOUT:
+                    json.dump(summary, stdout, indent=2)
+                    stdout.write("\n")
+                else:
+                    with open(args.summary, "w") as file:
+                        json.dump(summary, file, indent=2)
+            except OSError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                exit_code = exit_code or EXIT_OUTPUT
+    return exit_code
 
 
 if __name__ == '__main__':
-    # -----------------------------------------------------
-    # Checking for input from the command line:
-    # -----------------------------------------------------
+    # Earlier versions were called with positional arguments only, which still works:
     #
     # [1] file providing the network in the form of an edgelist
     #     (tab-separated table, columns 1 & 2 will be used)
-    #
     # [2] file with the seed genes (if table contains more than one
     #     column they must be tab-separated; the first column will be
     #     used only)
-    #
     # [3] path to output file
-    #
     # [4] initial fraction
     # [5] reduction factor
     # [6] number of steiner trees to be computed
     # [7] threshold
-    input_list = sys.argv
-    print("Parsing input...")
-    path_to_graph = str(input_list[1])
-    path_to_seeds = str(input_list[2])
-    path_to_outfile = str(input_list[3])
-
-    initial_fraction = float(input_list[4])
-    reduction_factor = float(input_list[5])
-    number_of_steiner_trees = int(input_list[6])
-    threshold = float(input_list[7])
-
-    print(f"Computing Steiner Trees with the following parameters: \n "
-          f"graph: {path_to_graph}\n"
-          f"seeds: {path_to_seeds}\n"
-          f"outfile: {path_to_outfile}\n"
-          f"initial fraction: {initial_fraction}\n"
-          f"reduction factor: {reduction_factor}\n"
-          f"number of steiner trees: {number_of_steiner_trees}\n"
-          f"threshold: {threshold}")
-    number_of_steiner_trees -=1
-    call_robust(path_to_graph, path_to_seeds, path_to_outfile, initial_fraction, reduction_factor,
-                    number_of_steiner_trees, threshold)
+    # [8] optional: checkpoint directory
+    #
+    # See python robust.py --help for the named options.
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import argparse
+import glob
+import os
+import sys
+
+from pcst_approach.utils.pcst import SOLVERS
+from pcst_approach.utils.pipeline import run_batch
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Runs ROBUST for many seed files against one loaded network and "
+                    "writes one result per seed file.")
+    parser.add_argument("network", help="file providing the network in the form of an "
+                                        "edgelist (tab-separated table, columns 1 & 2 "
+                                        "will be used)")
+    parser.add_argument("seeds", nargs="+",
+                        help="seed files or directories containing seed files (*.txt)")
+    parser.add_argument("-o", "--out-dir", required=True,
+                        help="directory for the results and batch_summary.tsv")
+    parser.add_argument("--format", choices=["graphml", "csv", "edgelist"],
+                        default="graphml", help="output format (default: graphml)")
+    parser.add_argument("--initial-fraction", type=float, default=0.25,
+                        help="initial fraction (alpha)")
+    parser.add_argument("--reduction-factor", type=float, default=0.9,
+                        help="reduction factor (beta)")
+    parser.add_argument("--trees", type=int, default=30,
+                        help="number of steiner trees to be computed")
+    parser.add_argument("--threshold", type=float, default=0.1, help="threshold (theta)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="pcst_fast",
+                        help="PCST solver; shortest_path is much faster for large seed "
+                             "sets (default: pcst_fast)")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    seed_files = []
+    for path in args.seeds:
+        if os.path.isdir(path):
+            seed_files.extend(sorted(glob.glob(os.path.join(path, "*.txt"))))
+        else:
+            seed_files.append(path)
+    suffix = {"graphml": ".graphml", "csv": ".csv", "edgelist": ".txt"}[args.format]
+    results = run_batch(args.network, seed_files, args.out_dir,
+                        init=args.initial_fraction, red=args.reduction_factor,
+                        n=args.trees, threshold=args.threshold, suffix=suffix,
+                        processes=args.processes, solver=args.solver)
+    sys.exit(1 if any(r.status != "ok" for r in results) else 0)
@@ -0,0 +1,42 @@
+import argparse
+import sys
+
+from pcst_approach.utils.pipeline import run_replicates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Runs ROBUST several times with the edges of the network in different "
+                    "random orders (pcst_fast depends on the order) and reports how "
+                    "stable every vertex of the module is.")
+    parser.add_argument("network", help="file providing the network in the form of an "
+                                        "edgelist (tab-separated table, columns 1 & 2 "
+                                        "will be used)")
+    parser.add_argument("seeds", help="file with the seed genes")
+    parser.add_argument("-o", "--vertex-table", required=True,
+                        help="csv file with the mean and variance of the occurrences of "
+                             "every vertex over the replicates")
+    parser.add_argument("--summary", help="csv file with one row per replicate")
+    parser.add_argument("-k", "--replicates", type=int, default=10,
+                        help="number of replicates (default: 10)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for the edge orders")
+    parser.add_argument("--initial-fraction", type=float, default=0.25,
+                        help="initial fraction (alpha)")
+    parser.add_argument("--reduction-factor", type=float, default=0.9,
+                        help="reduction factor (beta)")
+    parser.add_argument("--trees", type=int, default=30,
+                        help="number of steiner trees to be computed")
+    parser.add_argument("--threshold", type=float, default=0.1, help="threshold (theta)")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    result = run_replicates(args.network, args.seeds, args.replicates,
+                            init=args.initial_fraction, red=args.reduction_factor,
+                            n=args.trees, threshold=args.threshold, seed=args.seed,
+                            processes=args.processes)
+    result.vertices.to_csv(args.vertex_table, index=False)
+    if args.summary:
+        result.replicates.to_csv(args.summary, index=False)
+    print(f"Mean Jaccard index of the modules: {result.mean_jaccard:.3f}", file=sys.stderr)
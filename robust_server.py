@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from pcst_approach.utils.ppi import read_terminals
+from pcst_approach.utils.pipeline import RobustClient, RobustServer
+
+
+def _network(value: str):
+    name, _, path = value.partition("=")
+    if not path:
+        raise argparse.ArgumentTypeError("expected NAME=PATH")
+    return name, path
+
+
+def _client(args) -> RobustClient:
+    return RobustClient(socket_path=args.socket, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Runs a server that keeps networks loaded and computes ROBUST for "
+                    "submitted seed sets, or talks to such a server.")
+    parser.add_argument("--socket", help="Unix socket of the server (default: use "
+                                         "--host and --port)")
+    parser.add_argument("--host", default="127.0.0.1", help="host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port (default: 8765)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="start the server")
+    serve.add_argument("networks", nargs="+", type=_network, metavar="NAME=PATH",
+                       help="networks to load (edgelists as for robust.py)")
+    serve.add_argument("-j", "--processes", type=int, default=None,
+                       help="number of worker processes (default: number of cpus)")
+
+    submit = commands.add_parser("client", help="submit a seed file and write the result")
+    submit.add_argument("network", help="name of the network on the server")
+    submit.add_argument("seeds", help="file providing the seeds")
+    submit.add_argument("-o", "--out", default="-",
+                        help="output file (default: standard output)")
+    submit.add_argument("--format", choices=["graphml", "csv", "edgelist"],
+                        default="graphml", help="output format (default: graphml)")
+    submit.add_argument("--initial-fraction", type=float, default=0.25,
+                        help="initial fraction (alpha)")
+    submit.add_argument("--reduction-factor", type=float, default=0.9,
+                        help="reduction factor (beta)")
+    submit.add_argument("--trees", type=int, default=30,
+                        help="number of steiner trees to be computed")
+    submit.add_argument("--threshold", type=float, default=0.1, help="threshold (theta)")
+
+    cancel = commands.add_parser("cancel", help="cancel a job")
+    cancel.add_argument("job", type=int, help="id of the job")
+    commands.add_parser("stats", help="print queue depth and latencies")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = RobustServer(dict(args.networks), processes=args.processes)
+        asyncio.run(server.serve(args.socket, host=args.host, port=args.port))
+    elif args.command == "client":
+        client = _client(args)
+        job = client.submit(args.network, read_terminals(args.seeds),
+                            initial_fraction=args.initial_fraction,
+                            reduction_factor=args.reduction_factor, trees=args.trees,
+                            threshold=args.threshold, format=args.format)
+        print(f"Submitted job {job}.", file=sys.stderr)
+        if args.out == "-":
+            result = client.results(sys.stdout)
+        else:
+            with open(args.out, "w") as out:
+                result = client.results(out)
+        client.close()
+        if result["status"] != "done":
+            print(f"Job {job} {result['status']}: {result.get('error', '')}",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"Job {job}: {result['trees']} trees in {result['seconds']:.1f}s.",
+              file=sys.stderr)
+    else:
+        client = _client(args)
+        answer = client.cancel(args.job) if args.command == "cancel" else client.stats()
+        client.close()
+        print(json.dumps(answer, indent=2))
@@ -0,0 +1,51 @@
+import argparse
+import sys
+
+from pcst_approach.utils.pipeline import run_significance
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Runs ROBUST for the seeds and for many random seed sets of the same "
+                    "network (degree-matched by default) and reports an empirical p-value "
+                    "for the occurrences of every vertex, so hubs that occur in the "
+                    "modules of any seed set can be told apart.")
+    parser.add_argument("network", help="file providing the network in the form of an "
+                                        "edgelist (tab-separated table, columns 1 & 2 "
+                                        "will be used)")
+    parser.add_argument("seeds", help="file with the seed genes")
+    parser.add_argument("-o", "--vertex-table", required=True,
+                        help="csv file with the occurrences, the null mean and standard "
+                             "deviation and the p-value of every vertex")
+    parser.add_argument("--null-runs", type=int, default=100,
+                        help="number of random seed sets (default: 100)")
+    parser.add_argument("--matching", choices=["degree", "size"], default="degree",
+                        help="degree: replace every seed by a random vertex of similar "
+                             "degree; size: uniform random sets of the same size, whose "
+                             "cached runs are shared by all seed sets of that size "
+                             "(default: degree)")
+    parser.add_argument("--min-bin-size", type=int, default=50,
+                        help="minimal number of vertices per degree bin (default: 50)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the null seed sets (default: 0)")
+    parser.add_argument("--initial-fraction", type=float, default=0.25,
+                        help="initial fraction (alpha)")
+    parser.add_argument("--reduction-factor", type=float, default=0.9,
+                        help="reduction factor (beta)")
+    parser.add_argument("--trees", type=int, default=30,
+                        help="number of steiner trees to be computed")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="neither load nor save the null runs")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    result = run_significance(args.network, args.seeds, n_null=args.null_runs,
+                              init=args.initial_fraction, red=args.reduction_factor,
+                              n=args.trees, matching=args.matching, seed=args.seed,
+                              min_bin_size=args.min_bin_size, processes=args.processes,
+                              cache=args.cache)
+    result.vertices.to_csv(args.vertex_table, index=False)
+    print(f"{result.n_null} null runs ({result.n_cached} from the cache); "
+          f"{(result.vertices['p_value'] <= 0.05).sum()} vertices with p <= 0.05.",
+          file=sys.stderr)
@@ -0,0 +1,36 @@
+import argparse
+
+from pcst_approach.utils.pipeline import run_sweep
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Runs ROBUST for a grid of parameters. Only one diversification "
+                    "chain per (initial fraction, reduction factor) pair is computed, "
+                    "all numbers of trees and thresholds are derived from it.")
+    parser.add_argument("network", help="file providing the network in the form of an "
+                                        "edgelist (tab-separated table, columns 1 & 2 "
+                                        "will be used)")
+    parser.add_argument("seeds", help="file with the seed genes")
+    parser.add_argument("-o", "--summary", required=True,
+                        help="csv file for the summary table (one row per grid point)")
+    parser.add_argument("--vertex-table",
+                        help="csv file for the vertices of the module of every grid point")
+    parser.add_argument("--initial-fractions", type=float, nargs="+", default=[0.25],
+                        help="initial fractions (alpha)")
+    parser.add_argument("--reduction-factors", type=float, nargs="+", default=[0.9],
+                        help="reduction factors (beta)")
+    parser.add_argument("--trees", type=int, nargs="+", default=[30],
+                        help="numbers of steiner trees (n)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1],
+                        help="thresholds (theta)")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    result = run_sweep(args.network, args.seeds, args.initial_fractions,
+                       args.reduction_factors, args.trees, args.thresholds,
+                       processes=args.processes)
+    result.summary.to_csv(args.summary, index=False)
+    if args.vertex_table:
+        result.vertices.to_csv(args.vertex_table, index=False)
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from pcst_approach.utils import ExpMinMaxDiverseSteinerTreeComputer
+from pcst_approach.utils.ppi import PpiInstance, UnitEdgeWeight, load_network, \
+    read_terminals
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+PATH_TO_GRAPH = os.path.join(DATA, "human_annotated_PPIs_brain.txt")
+MS_SEEDS = os.path.join(DATA, "ms_seeds.txt")
+
+
+@pytest.fixture(scope="session")
+def network():
+    return load_network(PATH_TO_GRAPH)
+
+
+@pytest.fixture(scope="session")
+def ms_instance(network) -> PpiInstance:
+    terminals = sorted(set(read_terminals(MS_SEEDS)).intersection(network.label_to_id()))
+    return PpiInstance.from_network(network, terminals, UnitEdgeWeight())
+
+
+@pytest.fixture(scope="session")
+def engine() -> ExpMinMaxDiverseSteinerTreeComputer:
+    return ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=0.25,
+                                               reduction_factor=0.9)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pcst_approach.utils import ExpMinMaxDiverseSteinerTreeComputer
+from pcst_approach.utils.pcst import PcstFastSolver
+from pcst_approach.utils.steinerdiv import Checkpoint
+from pcst_approach.utils.steinerdiv.stopping import StoppingPolicy
+
+
+class CountingSolver(PcstFastSolver):
+    def __init__(self):
+        super().__init__()
+        self.solves = 0
+
+    def solve(self, *args, **kwargs):
+        self.solves += 1
+        return super().solve(*args, **kwargs)
+
+
+def _counting_engine():
+    return ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=0.25,
+                                               reduction_factor=0.9,
+                                               solver=CountingSolver())
+
+
+class Killed(Exception):
+    pass
+
+
+class KillAfter(StoppingPolicy):
+    """
+    Interrupts the chain after the given number of trees, like a killed process.
+    """
+
+    def __init__(self, n_trees: int):
+        self.n_trees = n_trees
+
+    def should_stop(self, solution_set, n_solves: int) -> bool:
+        if len(solution_set) >= self.n_trees:
+            raise Killed()
+        return False
+
+
+def _assert_same_trees(trees, expected):
+    assert len(trees) == len(expected)
+    for tree, expected_tree in zip(trees, expected):
+        np.testing.assert_array_equal(tree.vertex_ids, expected_tree.vertex_ids)
+        np.testing.assert_array_equal(tree.edge_ids, expected_tree.edge_ids)
+
+
+@pytest.fixture(scope="module")
+def uninterrupted(engine, ms_instance):
+    return engine(ms_instance, n=9)
+
+
+def test_extended_run_matches_uninterrupted(ms_instance, uninterrupted, tmp_path):
+    engine = _counting_engine()
+    first = engine(ms_instance, n=4, checkpoint=Checkpoint(str(tmp_path)))
+    _assert_same_trees(first, uninterrupted[:len(first)])
+    extended = engine(ms_instance, n=9, checkpoint=Checkpoint(str(tmp_path)))
+    _assert_same_trees(extended, uninterrupted)
+    # The trees of the first run are not computed again.
+    assert engine.solver.solves == len(extended)
+
+
+def test_continued_run_matches_uninterrupted(ms_instance, uninterrupted, tmp_path):
+    engine = _counting_engine()
+    with pytest.raises(Killed):
+        engine(ms_instance, n=9, stop=KillAfter(3),
+               checkpoint=Checkpoint(str(tmp_path), every=2))
+    assert engine.solver.solves == 3
+    continued = engine(ms_instance, n=9, checkpoint=Checkpoint(str(tmp_path)))
+    _assert_same_trees(continued, uninterrupted)
+    # The three trees of the killed run are restored, not computed again.
+    assert engine.solver.solves == len(continued)
@@ -0,0 +1,60 @@
+"""
+The plotting stack (matplotlib, pandas) is only imported when it is used, not by a plain
+run of robust.py with edge list output on a compiled network.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN = ["matplotlib", "pandas.plotting"]
+
+# Runs the script given as first argument as __main__ and prints the loaded modules as
+# last line, also if the script exits.
+_RUN_SCRIPT = """
+import json, runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+finally:
+    print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _loaded_modules(args, cache_dir) -> set:
+    env = dict(os.environ, ROBUST_CACHE_DIR=str(cache_dir))
+    env.pop("ROBUST_TRACE", None)
+    env.pop("ROBUST_RESULT_CACHE", None)
+    result = subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_import_does_not_load_plotting(tmp_path):
+    code = "import json, sys; import pcst_approach.utils, robust; " \
+           "print(json.dumps(sorted(sys.modules)))"
+    loaded = _loaded_modules(["-c", code], tmp_path)
+    assert not loaded.intersection(FORBIDDEN + ["pandas"])
+
+
+def test_edge_list_run_does_not_load_plotting(tmp_path):
+    network = tmp_path / "network.txt"
+    # A cycle of 12 vertices with chords.
+    edges = [(f"v{i}", f"v{(i + 1) % 12}") for i in range(12)] + \
+        [(f"v{i}", f"v{i + 6}") for i in range(0, 6, 2)]
+    network.write_text("protein1\tprotein2\n" +
+                       "".join(f"{v}\t{w}\n" for v, w in edges))
+    seeds = tmp_path / "seeds.txt"
+    seeds.write_text("v0\nv3\nv7\n")
+    outfile = tmp_path / "module.txt"
+    args = ["-c", _RUN_SCRIPT, os.path.join(ROOT, "robust.py"), str(network), str(seeds),
+            "-o", str(outfile), "--trees", "3"]
+    # The first run parses and compiles the network (with pandas), the second one loads
+    # the compiled network like every later run.
+    loaded = _loaded_modules(args, tmp_path / "cache")
+    assert "matplotlib" not in loaded
+    loaded = _loaded_modules(args, tmp_path / "cache")
+    assert outfile.exists()
+    assert not loaded.intersection(FORBIDDEN)
@@ -0,0 +1,38 @@
+"""
+Regression test for the prize updates of ExpMinMaxDiverseSteinerTreeComputer: the trees
+and occurrences have to be the same as the ones of the original implementation on
+networkx graphs. tests/data/baseline_trees.json was computed with the original code (on
+an nx.Graph with the vertex order of the compiled network, so the ids are the same) with
+initial_fraction=0.25, reduction_factor=0.9, n=29 and its precomputed diameter of 8.
+"""
+import json
+import os
+
+import pytest
+
+from pcst_approach.utils import ExpMinMaxDiverseSteinerTreeComputer
+from pcst_approach.utils.ppi import PpiInstance, UnitEdgeWeight, read_terminals
+
+from conftest import DATA
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data",
+                        "baseline_trees.json")
+
+with open(BASELINE) as file:
+    BASELINE_TREES = json.load(file)
+
+
+@pytest.mark.parametrize("seed_file", sorted(BASELINE_TREES))
+def test_trees_match_baseline(network, seed_file):
+    terminals = read_terminals(os.path.join(DATA, seed_file))
+    terminals = sorted(set(terminals).intersection(network.label_to_id()))
+    ppi_instance = PpiInstance.from_network(network, terminals, UnitEdgeWeight(),
+                                            meta={"graph_diameter": 8})
+    engine = ExpMinMaxDiverseSteinerTreeComputer(initial_fraction=0.25,
+                                                 reduction_factor=0.9)
+    steiner_trees = engine(ppi_instance, n=29)
+
+    expected = BASELINE_TREES[seed_file]
+    assert [sorted(tree.nodes) for tree in steiner_trees] == expected["trees"]
+    occurrences = steiner_trees.get_occurrences(include_terminals=True)["#occurrences"]
+    assert {v: int(c) for v, c in occurrences.items()} == expected["occurrences"]
@@ -0,0 +1,23 @@
+from pcst_approach.utils.pcst import PcstInstance
+from pcst_approach.utils.steinerdiv import ResultCache
+
+
+def test_second_run_hits_with_identical_trees(engine, ms_instance, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    computed = engine(ms_instance, n=9, cache=cache)
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 0
+
+    # A fresh PcstInstance, as in a new process.
+    loaded = engine(ms_instance, n=9, pcst_graph=PcstInstance(ms_instance), cache=cache)
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    assert [tree.fingerprint() for tree in loaded] == \
+        [tree.fingerprint() for tree in computed]
+    assert loaded.stop_reason == computed.stop_reason
+    assert loaded.n_solves == computed.n_solves
+
+
+def test_other_parameters_miss(engine, ms_instance, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    engine(ms_instance, n=4, cache=cache)
+    engine(ms_instance, n=5, cache=cache)
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 0
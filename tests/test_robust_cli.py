@@ -0,0 +1,73 @@
+import pytest
+
+import robust
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    monkeypatch.setenv("ROBUST_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("ROBUST_TRACE", raising=False)
+    monkeypatch.delenv("ROBUST_RESULT_CACHE", raising=False)
+    network = tmp_path / "network.txt"
+    # A cycle of 12 vertices with chords.
+    edges = [(f"v{i}", f"v{(i + 1) % 12}") for i in range(12)] + \
+        [(f"v{i}", f"v{i + 6}") for i in range(0, 6, 2)]
+    network.write_text("protein1\tprotein2\n" +
+                       "".join(f"{v}\t{w}\n" for v, w in edges))
+    seeds = tmp_path / "seeds.txt"
+    seeds.write_text("v0\nv3\nv7\n")
+    return tmp_path, str(network), str(seeds)
+
+
+def test_ok(inputs):
+    directory, network, seeds = inputs
+    outfile = directory / "module.txt"
+    assert robust.main([network, seeds, "-o", str(outfile), "--trees", "3"]) == \
+        robust.EXIT_OK
+    assert outfile.exists()
+
+
+def test_unparsable_network(inputs):
+    directory, _, seeds = inputs
+    network = directory / "one_column.txt"
+    network.write_text("protein\nv0\nv1\n")
+    assert robust.main([str(network), seeds, "-o", str(directory / "module.txt")]) == \
+        robust.EXIT_INPUT
+
+
+def test_unknown_seeds(inputs):
+    directory, network, _ = inputs
+    seeds = directory / "unknown.txt"
+    seeds.write_text("P05067\n")
+    assert robust.main([network, str(seeds), "-o", str(directory / "module.txt")]) == \
+        robust.EXIT_INPUT
+
+
+def test_checkpoint_of_other_seeds(inputs):
+    directory, network, seeds = inputs
+    checkpoint = str(directory / "checkpoint")
+    outfile = str(directory / "module.txt")
+    assert robust.main([network, seeds, "-o", outfile, "--trees", "3",
+                        "--checkpoint", checkpoint]) == robust.EXIT_OK
+    other_seeds = directory / "other.txt"
+    other_seeds.write_text("v1\nv5\n")
+    assert robust.main([network, str(other_seeds), "-o", outfile, "--trees", "3",
+                        "--checkpoint", checkpoint]) == robust.EXIT_INPUT
+
+
+def test_other_value_error_is_unexpected(inputs, monkeypatch):
+    directory, network, seeds = inputs
+
+    def fail(*args, **kwargs):
+        raise ValueError("array must not contain infs or NaNs")
+
+    monkeypatch.setattr(robust, "compute_robust", fail)
+    assert robust.main([network, seeds, "-o", str(directory / "module.txt")]) == \
+        robust.EXIT_ERROR
+
+
+def test_unwritable_trace(inputs):
+    directory, network, seeds = inputs
+    assert robust.main([network, seeds, "-o", str(directory / "module.txt"), "--trees", "3",
+                        "--trace", str(directory / "missing" / "trace.json")]) == \
+        robust.EXIT_OUTPUT
@@ -0,0 +1,87 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from pcst_approach.utils.pcst import SteinerTree
+from pcst_approach.utils.steinerdiv import NearDuplicate, SolutionSet
+
+
+def _jaccard(a, b) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+@pytest.fixture(scope="module")
+def solution_set(engine, ms_instance):
+    return engine(ms_instance, n=29)
+
+
+@pytest.fixture(scope="module")
+def expected_jaccard(solution_set) -> np.ndarray:
+    """
+    The pairwise Jaccard similarities of the vertex labels, computed with sets.
+    """
+    return np.array([[_jaccard(s.nodes, t.nodes) for t in solution_set]
+                     for s in solution_set])
+
+
+def test_pairwise_jaccard(solution_set, expected_jaccard):
+    np.testing.assert_allclose(solution_set.pairwise_jaccard(), expected_jaccard)
+    for i, tree in enumerate(solution_set):
+        np.testing.assert_allclose(solution_set.jaccard_to(tree, i),
+                                   expected_jaccard[i, :i])
+        np.testing.assert_allclose(solution_set.jaccard_to(tree.to_networkx()),
+                                   expected_jaccard[i])
+
+
+@pytest.mark.parametrize("block", [1, 7, 1024])
+def test_diversity(solution_set, expected_jaccard, block):
+    n = len(solution_set)
+    upper = expected_jaccard[np.triu_indices(n, k=1)]
+    others = expected_jaccard + np.diag(np.full(n, -np.inf))
+    diversity = solution_set.diversity(block=block)
+    assert diversity["trees"] == n and diversity["pairs"] == len(upper)
+    assert diversity["mean_jaccard"] == pytest.approx(upper.mean())
+    assert diversity["std_jaccard"] == pytest.approx(upper.std(), abs=1e-6)
+    assert diversity["min_jaccard"] == pytest.approx(upper.min())
+    assert diversity["max_jaccard"] == pytest.approx(upper.max())
+    assert diversity["mean_nearest_jaccard"] == pytest.approx(others.max(axis=1).mean())
+
+
+def test_contains_matches_vertex_sets(solution_set):
+    for tree in solution_set:
+        assert tree in solution_set
+        assert tree.to_networkx() in solution_set
+    vertex_sets = [set(tree.nodes) for tree in solution_set]
+    first = solution_set[0]
+    # The first tree without one of its leaves.
+    graph = first.to_networkx()
+    leaf = next(v for v in graph.nodes if graph.degree(v) == 1)
+    graph.remove_node(leaf)
+    assert (graph in solution_set) == (set(graph.nodes) in vertex_sets)
+    smaller = SteinerTree.from_networkx(solution_set.pcst_graph, graph)
+    assert (smaller in solution_set) == (set(smaller.nodes) in vertex_sets)
+
+
+def test_near_duplicate_matches_pairwise_jaccard(engine, ms_instance):
+    min_similarity = 0.6
+    solution_set = engine(ms_instance, n=29, stop=NearDuplicate(min_similarity))
+    assert solution_set.stop_reason == "near_duplicate"
+    nearest = [max((_jaccard(s.nodes, t.nodes) for t in solution_set[:i]), default=0.0)
+               for i, s in enumerate(solution_set)]
+    assert all(similarity < min_similarity for similarity in nearest[:-1])
+    assert nearest[-1] >= min_similarity
+
+
+def test_empty_diversity(ms_instance):
+    diversity = SolutionSet(ms_instance).diversity()
+    assert diversity["trees"] == 0 and diversity["mean_jaccard"] is None
+
+
+def test_contains_unknown_vertices(solution_set):
+    # Only the vertices are compared, also if the edges are not in the network.
+    assert nx.path_graph(reversed(solution_set[0].nodes)) in solution_set
+    graph = solution_set[0].to_networkx()
+    graph.add_edge(next(iter(graph.nodes)), "not a protein")
+    assert graph not in solution_set
+    assert nx.path_graph(["not", "a protein"]) not in solution_set
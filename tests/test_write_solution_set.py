@@ -0,0 +1,27 @@
+import networkx as nx
+import pytest
+
+from pcst_approach.utils import write_solution_set
+
+
+@pytest.fixture(scope="module")
+def solution_set(engine, ms_instance):
+    return engine(ms_instance, n=9)
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.5, 0.9])
+def test_component_ids_match_networkx(solution_set, threshold, tmp_path):
+    outfile = str(tmp_path / "module.graphml")
+    write_solution_set(solution_set, outfile, threshold)
+    module = nx.read_graphml(outfile)
+    assert set(module.nodes) == set(solution_set.get_subgraph(threshold).nodes)
+    assert set(map(frozenset, module.edges)) == \
+        set(map(frozenset, solution_set.get_subgraph(threshold).edges))
+
+    # Numbered by decreasing size, ties by the smallest vertex id.
+    get_id = solution_set.pcst_graph.vertex_ids.get_id
+    components = sorted(nx.connected_components(module),
+                        key=lambda c: (-len(c), min(get_id(v) for v in c)))
+    for expected_id, component in enumerate(components):
+        assert {module.nodes[v]["connected_components_id"] for v in component} == \
+            {expected_id}